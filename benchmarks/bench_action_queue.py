@@ -0,0 +1,162 @@
+"""
+Benchmark: Synchronous Webhook Calls vs the Durable Action Queue
+================================================================
+A burst of send_email actions hits a fake n8n webhook that takes 200 ms per
+call. Compares how long the caller (the agent) waits per action when it
+calls the webhook itself versus when it enqueues into shared.action_queue,
+and how long the queue's workers take to drain the burst.
+
+Halfway through, the queue is closed and reopened to show that pending
+actions survive a restart and are delivered once each.
+
+Then two queues (standing in for two processes) drain one file together,
+the second opened while the first is mid-delivery, and a queue takes over
+an action whose lease expired while one still leased elsewhere is left
+alone. Every action must reach n8n exactly once (exits 1 otherwise).
+
+Run from the repository root:
+    python benchmarks/bench_action_queue.py
+"""
+
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from shared.action_queue import ActionQueue
+from shared.webhook import WebhookClient
+from stub_server import StubHandler, start_stub_server
+
+ACTIONS = 50
+WEBHOOK_LATENCY = 0.2
+WORKERS = 4
+SHARED_ACTIONS = 200
+
+
+class CountingWebhookHandler(StubHandler):
+    """Fake n8n webhook that counts deliveries per Idempotency-Key"""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        time.sleep(WEBHOOK_LATENCY)
+        with self.server.lock:
+            self.server.deliveries[self.headers.get("Idempotency-Key")] += 1
+        self.send_json({"status": "success"})
+
+
+def payload(i: int) -> dict:
+    return {"action": "send_email", "recipient_email": f"user{i}@example.com",
+            "subject": "Reminder", "message": "See you tomorrow"}
+
+
+def synchronous(client) -> list:
+    """Every caller thread waits for its own webhook call"""
+    waits = []
+
+    def call(i):
+        start = time.perf_counter()
+        client.post(payload(i))
+        waits.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(ACTIONS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return waits
+
+
+def queued(client, path: str):
+    queue = ActionQueue(path, client, workers=WORKERS)
+    waits = []
+    start = time.perf_counter()
+    for i in range(ACTIONS):
+        enqueue_start = time.perf_counter()
+        queue.enqueue(payload(i), idempotency_key=f"action-{i}")
+        waits.append(time.perf_counter() - enqueue_start)
+
+    # Simulate a restart halfway through the drain
+    time.sleep(ACTIONS * WEBHOOK_LATENCY / WORKERS / 2)
+    queue.close()
+    queue = ActionQueue(path, client, workers=WORKERS)
+    queue.wait_idle()
+    drain = time.perf_counter() - start
+    counts = queue.counts()
+    queue.close()
+    return waits, drain, counts
+
+
+def shared_file(client, path: str, deliveries: Counter) -> bool:
+    """Two queues on one file, plus an expired and a live lease left by other owners"""
+    first = ActionQueue(path, client, workers=WORKERS, batch_size=5)
+    for i in range(SHARED_ACTIONS):
+        first.enqueue(payload(i), idempotency_key=f"shared-{i}")
+    time.sleep(WEBHOOK_LATENCY / 2)         # first queue's workers are mid-delivery
+    second = ActionQueue(path, client, workers=WORKERS, batch_size=5)
+    first.wait_idle()
+    first.close()
+    second.close()
+
+    # A dead process's expired lease is taken over; a live one is left alone
+    now = time.time()
+    db = sqlite3.connect(path, isolation_level=None)
+    for key, expires in (("expired-lease", now - 1), ("live-lease", now + 60)):
+        db.execute("INSERT INTO actions (idempotency_key, payload, status, attempts, next_attempt_at, created_at, "
+                   "updated_at, lease_owner, lease_expires) VALUES (?, ?, 'in_flight', 1, ?, ?, ?, 'other', ?)",
+                   (key, '{"action": "send_email"}', now, now, now, expires))
+    db.close()
+    third = ActionQueue(path, client, workers=WORKERS)
+    deadline = time.monotonic() + 5
+    while deliveries["expired-lease"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    live = third.status("live-lease")["status"]
+    third.close()
+
+    counts = [deliveries[f"shared-{i}"] for i in range(SHARED_ACTIONS)]
+    ok = (all(n == 1 for n in counts) and deliveries["expired-lease"] == 1
+          and deliveries["live-lease"] == 0 and live == "in_flight")
+    print(f"{'✅' if ok else '❌'} two queues, one file: {sum(counts)} deliveries for {SHARED_ACTIONS} actions, "
+          f"{sum(1 for n in counts if n > 1)} twice; expired lease sent {deliveries['expired-lease']}x, "
+          f"live lease sent {deliveries['live-lease']}x (still {live})")
+    return ok
+
+
+def main():
+    server, base_url = start_stub_server(handler=CountingWebhookHandler)
+    server.lock = threading.Lock()
+    server.deliveries = Counter()
+    client = WebhookClient(f"{base_url}/webhook/personal-assistant", pool_size=ACTIONS)
+    try:
+        print(f"{ACTIONS} send_email actions in a burst, fake n8n latency {WEBHOOK_LATENCY * 1000:.0f} ms\n")
+
+        waits = synchronous(client)
+        print(f"synchronous: caller waits p50 {statistics.median(waits) * 1000:7.1f} ms, "
+              f"max {max(waits) * 1000:7.1f} ms, {ACTIONS} threads blocked")
+
+        server.deliveries.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            waits, drain, counts = queued(client, os.path.join(tmp, "actions.db"))
+        print(f"queued:      caller waits p50 {statistics.median(waits) * 1000:7.3f} ms, "
+              f"max {max(waits) * 1000:7.3f} ms, {WORKERS} worker threads")
+        print(f"             drained in {drain:.2f} s across a restart; final counts {counts}")
+        duplicates = sum(1 for n in server.deliveries.values() if n > 1)
+        print(f"             {len(server.deliveries)} actions delivered, {duplicates} delivered more than once "
+              f"(same Idempotency-Key, so n8n can drop the repeats)\n")
+
+        server.deliveries.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            ok = shared_file(client, os.path.join(tmp, "shared.db"), server.deliveries)
+    finally:
+        server.shutdown()
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
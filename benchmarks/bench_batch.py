@@ -0,0 +1,57 @@
+"""
+Benchmark: Sequential vs Concurrent Prompt Sweep
+================================================
+Runs a sweep of prompt variants against a local stub server with simulated
+upstream latency, first one after another and then through
+``shared.batch.run_experiments``.
+
+Run from the repository root:
+    python benchmarks/bench_batch.py
+"""
+
+import os
+import time
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from stub_server import start_stub_server
+
+LATENCY = 0.1
+VARIANTS = 200
+CONCURRENCY = [1, 10, 50]
+
+
+def build_variants() -> list:
+    return [
+        {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": f"Variant {i}: explain what a variable is"}],
+            "temperature": round(0.1 * (i % 10), 1)
+        }
+        for i in range(VARIANTS)
+    ]
+
+
+def main():
+    server, base_url = start_stub_server(latency=LATENCY)
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["HTTP_POOL_SIZE"] = str(max(CONCURRENCY))
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+    from shared.batch import run_experiments
+
+    variants = build_variants()
+    print(f"{VARIANTS} variants, stub latency {LATENCY * 1000:.0f} ms per call\n")
+    try:
+        for concurrency in CONCURRENCY:
+            start = time.perf_counter()
+            results = run_experiments(variants, max_concurrency=concurrency)
+            wall = time.perf_counter() - start
+            errors = sum(1 for result in results if "error" in result)
+            print(f"max_concurrency={concurrency:<4} wall={wall:6.2f}s   "
+                  f"(sum of calls ~{VARIANTS * LATENCY:.1f}s, errors={errors})")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: Completion Cache Hits vs Upstream Calls
+==================================================
+Replays a workload with repeated low-temperature prompts against a local
+stub server (with simulated latency), with and without the completion
+cache, and prints the hit/miss/eviction counters.
+
+First checks that requests differing only in a field that changes the
+answer (max_tokens, response_format, seed, ...) get different cache keys
+(exits 1 otherwise).
+
+Run from the repository root:
+    python benchmarks/bench_cache.py
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from stub_server import start_stub_server
+
+LATENCY = 0.05
+REQUESTS = 400
+DISTINCT_PROMPTS = 50
+
+
+def workload() -> list:
+    rng = random.Random(42)
+    return [
+        {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": f"Explain concept #{rng.randrange(DISTINCT_PROMPTS)}"}],
+            "temperature": 0
+        }
+        for _ in range(REQUESTS)
+    ]
+
+
+# Each changes the answer, so must not share a cache entry with BASE_REQUEST
+KEY_VARIANTS = {
+    "max_tokens": 5, "max_completion_tokens": 5, "response_format": {"type": "json_object"},
+    "top_p": 0.1, "stop": ["\n"], "seed": 7, "n": 2, "presence_penalty": 1.0, "frequency_penalty": 1.0,
+    "logit_bias": {"1234": -100}, "tool_choice": "none", "parallel_tool_calls": False,
+}
+BASE_REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Hi"}], "temperature": 0}
+
+
+def check_keys(cache_key) -> bool:
+    shared = [field for field, value in KEY_VARIANTS.items()
+              if cache_key(dict(BASE_REQUEST, **{field: value})) == cache_key(BASE_REQUEST)]
+    # Fields that do not change the answer still share the entry
+    ignored = cache_key(dict(BASE_REQUEST, user="u1", stream_options={"include_usage": True})) == cache_key(BASE_REQUEST)
+    ok = not shared and ignored
+    print(f"{'✅' if ok else '❌'} cache keys: {len(KEY_VARIANTS) - len(shared)}/{len(KEY_VARIANTS)} "
+          f"answer-changing fields keyed{', shared: ' + ', '.join(shared) if shared else ''}; "
+          f"user/stream_options ignored: {ignored}\n")
+    return ok
+
+
+def run(chat_completion, requests: list) -> float:
+    start = time.perf_counter()
+    for payload in requests:
+        chat_completion(payload)
+    return time.perf_counter() - start
+
+
+def main():
+    server, base_url = start_stub_server(latency=LATENCY)
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+    from shared.cache import CompletionCache, cache_key, set_default_cache
+    from shared.transport import chat_completion
+
+    if not check_keys(cache_key):
+        server.shutdown()
+        sys.exit(1)
+
+    requests = workload()
+    print(f"{REQUESTS} requests over {DISTINCT_PROMPTS} distinct prompts, stub latency {LATENCY * 1000:.0f} ms\n")
+    try:
+        set_default_cache(None)
+        uncached = run(chat_completion, requests)
+        print(f"no cache:              {uncached:6.2f}s")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, cache in [
+                ("memory LRU (64)", CompletionCache(max_entries=64)),
+                ("memory LRU (16)", CompletionCache(max_entries=16)),
+                ("memory (16) + disk", CompletionCache(max_entries=16, disk_path=os.path.join(tmp, "cache.db"))),
+            ]:
+                set_default_cache(cache)
+                seconds = run(chat_completion, requests)
+                print(f"{name:<22} {seconds:6.2f}s   {cache.stats}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
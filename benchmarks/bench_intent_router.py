@@ -0,0 +1,141 @@
+"""
+Benchmark: LLM Iterations per Request with the Local Intent Router
+==================================================================
+A scripted stub model behaves like the real one: it answers a booking or
+email request with an extract_* call, answers an extraction result with
+trigger_n8n_webhook, and confirms once the webhook has run. Vague requests
+get a follow-up question.
+
+Runs the same requests through the OpenRouter agent with and without the
+local router and reports LLM iterations and time per completed request.
+
+First it checks the router's extractions on tricky messages (negations,
+times split around a topic, emails inside a topic): a wrong extraction
+would be sent to n8n as is, so the benchmark exits 1 if one is wrong.
+
+Run from the repository root:
+    python benchmarks/bench_intent_router.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+from script_loader import load_solution
+from stub_server import StubHandler, start_stub_server
+from shared.intent_router import IntentRouter
+
+LATENCY = 0.1       # simulated LLM latency per iteration
+
+REQUESTS = [
+    "Book a meeting with John about project updates on Tuesday at 2pm, his email is john@example.com",
+    "Schedule a call with Maria Lopez to discuss the Q3 budget tomorrow 3pm for 45 minutes, maria@corp.io",
+    'Send an email to sarah@example.com with subject "Agenda" saying "See you Tuesday at 2pm"',
+    'Please write an email to bob@example.com, subject: "Lunch" message: "Are you free on Friday?"',
+    "Book a meeting with John about the roadmap",           # no email or time: the model asks
+]
+
+# (message, expected route(): None, or the extracted fields to compare)
+EXTRACTION_CASES = [
+    ("Book a meeting with John about project updates on Tuesday at 2pm, his email is john@example.com",
+     {"topic": "project updates", "preferred_time": "Tuesday at 2pm"}),
+    # The day and the time are apart: both are kept, the topic is not cut to "the"
+    ("Book a meeting with Ann about the 2pm standup on Friday, ann@example.com", None),
+    ("Book a meeting with ann@example.com about the standup at 2pm on Friday",
+     {"topic": "the standup", "preferred_time": "2pm on Friday"}),
+    # The "." inside the address does not end the topic; "at 9" belongs to the time
+    ("Book a meeting about pricing with lee@x.com tomorrow at 9",
+     {"topic": "pricing", "attendee_email": "lee@x.com", "preferred_time": "tomorrow at 9"}),
+    ("Please don't book a meeting with john@example.com about the roadmap on Tuesday at 2pm", None),
+    ("Do not send an email to bob@example.com with subject \"Hi\" saying \"Hello\"", None),
+    ("Book a meeting with bo@example.com about hiring on Monday or Tuesday at 2pm", None),
+    ("Book a meeting with bo@example.com about hiring at 2pm or 4pm tomorrow", None),
+    # Dates and offsets the rules cannot read: never book just the clock time
+    ("Book a meeting with bo@example.com about hiring on March 3 at 3pm", None),
+    ("Book a meeting with bo@example.com about hiring on 12/03 at 3pm", None),
+    ("Book a meeting with bo@example.com about hiring on the 14th at 3pm", None),
+    ("Book a meeting with bo@example.com about hiring in two weeks at 3pm", None),
+    ("Book a meeting with bo@example.com about hiring on 3rd May, 10am", None),
+]
+
+
+def check_extractions() -> bool:
+    router = IntentRouter()
+    correct = True
+    for message, expected in EXTRACTION_CASES:
+        routed = router.route(message)
+        got = routed[1] if routed else None
+        ok = got is None if expected is None else got is not None and all(
+            got.get(field) == value for field, value in expected.items())
+        correct &= ok
+        shown = "model handles it" if got is None else ", ".join(f"{k}={got.get(k)!r}" for k in expected or {})
+        print(f"  {'✅' if ok else '❌'}  {message[:70]!r}: {shown}")
+    return correct
+
+
+class ScriptedAgentHandler(StubHandler):
+    """Stub model that walks through extract -> webhook -> confirmation"""
+
+    def choose_tool_calls(self, messages: list):
+        self.server.iterations += 1
+        last = messages[-1]
+        if last.get("role") == "user":
+            text = last["content"]
+            if "@" not in text:
+                return None     # missing details: reply with a question
+            if "email" in text.lower() and "subject" in text.lower():
+                return [{"name": "extract_email_intent", "arguments": {
+                    "recipient_email": "sarah@example.com", "subject": "Agenda", "message": "See you"}}]
+            return [{"name": "extract_meeting_intent", "arguments": {
+                "attendee_email": "john@example.com", "topic": "project updates", "preferred_time": "Tuesday 2pm"}}]
+        if last.get("role") == "tool" and '"extracted"' in last.get("content", ""):
+            extracted = json.loads(last["content"])["data"]
+            action = "send_email" if "recipient_email" in extracted else "book_meeting"
+            return [{"name": "trigger_n8n_webhook", "arguments": {"action": action, "data": extracted}}]
+        return None
+
+
+def run(agent_module, server, use_router: bool):
+    server.iterations = 0
+    start = time.perf_counter()
+    for request in REQUESTS:
+        # A fresh agent per request, like a new conversation
+        agent = agent_module.PersonalAssistantAgent()
+        if not use_router:
+            agent.intent_router = None
+        # The agent prints every step; keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent.chat(request)
+    elapsed = time.perf_counter() - start
+    return server.iterations / len(REQUESTS), elapsed / len(REQUESTS)
+
+
+def main():
+    server, base_url = start_stub_server(latency=LATENCY, handler=ScriptedAgentHandler)
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENROUTER_API_KEY"] = "stub-key"
+    os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook/personal-assistant"
+
+    print("Router extractions:")
+    correct = check_extractions()
+    print()
+
+    agent_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+    try:
+        print(f"{len(REQUESTS)} requests ({len(REQUESTS) - 1} complete, 1 vague), "
+              f"LLM latency {LATENCY * 1000:.0f} ms\n")
+        for label, use_router in [("LLM extraction", False), ("local router", True)]:
+            iterations, seconds = run(agent_module, server, use_router)
+            print(f"{label:<15} {iterations:4.1f} LLM iterations per request   {seconds * 1000:6.1f} ms per request")
+    finally:
+        server.shutdown()
+    if not correct:
+        print("\n❌ The router extracted something wrong (see above)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: Request Size per Turn With and Without Memory Policies
+=================================================================
+Drives SimpleChatbot through a long session against a local stub server and
+prints the serialized request size as the conversation grows.
+
+Run from the repository root:
+    python benchmarks/bench_memory_window.py
+"""
+
+import json
+import os
+
+from script_loader import load_solution
+from stub_server import start_stub_server
+from shared.messages import to_wire
+
+TURNS = 200
+REPORT_EVERY = 40
+BUDGET = 2000
+
+
+def request_bytes(chatbot) -> int:
+    # Serialized the way the chatbot sends it (history holds Message objects)
+    return len(json.dumps({"model": chatbot.model, "messages": to_wire(chatbot.conversation_history)}))
+
+
+def main():
+    server, base_url = start_stub_server()
+    server.reply = "Variables are named boxes that hold values. " * 10
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+    chatbot_module = load_solution("day1/solutions/03_chatbot_memory_solution.py")
+    from shared.memory import SlidingWindowMemory, SummarizingMemory
+
+    unbounded = chatbot_module.SimpleChatbot()
+    windowed = chatbot_module.SimpleChatbot(memory=SlidingWindowMemory(max_tokens=BUDGET))
+    summarized = chatbot_module.SimpleChatbot(memory=SummarizingMemory(max_turns=20, summarize_turns=10))
+
+    print(f"{'turn':>5}  {'unbounded bytes':>16}  {'window bytes':>13}  {'summary bytes':>14}")
+    try:
+        for turn in range(1, TURNS + 1):
+            question = f"Question {turn}: can you explain that again with another example?"
+            unbounded.chat(question)
+            windowed.chat(question)
+            summarized.chat(question)
+            if turn % REPORT_EVERY == 0 or turn == 1:
+                print(f"{turn:>5}  {request_bytes(unbounded):>16,}  {request_bytes(windowed):>13,}  "
+                      f"{request_bytes(summarized):>14,}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark: Memory per 1,000 Turns, Dict vs Slotted Messages
+===========================================================
+Builds the same conversation history as plain dicts and as
+``shared.messages.Message`` objects and measures the allocated bytes with
+tracemalloc. Message content strings are shared, so only the per-message
+overhead is compared.
+
+Run from the repository root:
+    python benchmarks/bench_messages.py
+"""
+
+import time
+import tracemalloc
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from shared.messages import Message, ToolCall, to_wire
+
+TURNS = 1000
+USER_TEXT = "Book a meeting with John about project updates, his email is john@example.com"
+ASSISTANT_TEXT = "Done! The meeting is booked for Tuesday at 2pm."
+ARGUMENTS = '{"action": "book_meeting", "data": {"attendee_email": "john@example.com"}}'
+
+
+def dict_history() -> list:
+    history = []
+    for i in range(TURNS):
+        history.append({"role": "user", "content": USER_TEXT})
+        history.append({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": "trigger_n8n_webhook", "arguments": ARGUMENTS}
+            }]
+        })
+        history.append({"role": "tool", "tool_call_id": f"call_{i}", "name": "trigger_n8n_webhook",
+                        "content": '{"status": "ok"}'})
+        history.append({"role": "assistant", "content": ASSISTANT_TEXT})
+    return history
+
+
+def message_history() -> list:
+    history = []
+    for i in range(TURNS):
+        history.append(Message("user", USER_TEXT))
+        history.append(Message("assistant", None,
+                               tool_calls=[ToolCall("trigger_n8n_webhook", ARGUMENTS, id=f"call_{i}")]))
+        history.append(Message("tool", '{"status": "ok"}', name="trigger_n8n_webhook", tool_call_id=f"call_{i}"))
+        history.append(Message("assistant", ASSISTANT_TEXT))
+    return history
+
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    history = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, history
+
+
+def main():
+    dict_bytes, _ = measure(dict_history)
+    message_bytes, messages = measure(message_history)
+
+    start = time.perf_counter()
+    to_wire(messages)
+    wire_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{TURNS:,} agent turns ({TURNS * 4:,} messages, incl. one tool call each)")
+    print(f"  plain dicts:       {dict_bytes / 1024:8.1f} KiB")
+    print(f"  slotted Message:   {message_bytes / 1024:8.1f} KiB   "
+          f"({(1 - message_bytes / dict_bytes) * 100:.0f}% less)")
+    print(f"  to_wire() cost when building one request: {wire_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
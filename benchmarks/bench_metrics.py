@@ -0,0 +1,77 @@
+"""
+Benchmark: LLM Call Instrumentation
+===================================
+1. Overhead: the cost of timer.token() per streamed token and of one
+   tracked call, measured without any network.
+2. Accuracy: streams replies from the stub server with a known delay per
+   chunk through StreamingChatbot and prints the recorded TTFT and
+   inter-token percentiles next to the configured values, then the
+   Prometheus text export.
+
+Run from the repository root:
+    python benchmarks/bench_metrics.py
+"""
+
+import os
+import time
+
+from script_loader import load_solution
+from shared.metrics import LLMMetrics, get_metrics
+from shared.streaming import CallbackSink
+from stub_server import start_stub_server
+
+TOKENS = 100_000
+CALLS = 20_000
+LATENCY = 0.05
+TOKEN_DELAY = 0.01
+TURNS = 10
+
+
+def overhead():
+    metrics = LLMMetrics()
+    start = time.perf_counter()
+    with metrics.track("overhead") as timer:
+        for _ in range(TOKENS):
+            timer.token()
+    per_token = (time.perf_counter() - start) / TOKENS
+
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        with metrics.track("overhead") as timer:
+            timer.headers()
+            timer.token()
+    per_call = (time.perf_counter() - start) / CALLS
+    print(f"Overhead: {per_token * 1e9:,.0f} ns per token (timestamp + histogram), {per_call * 1e6:,.1f} us per tracked call\n")
+
+
+def main():
+    overhead()
+
+    server, base_url = start_stub_server(latency=LATENCY)
+    server.token_delay = TOKEN_DELAY
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    try:
+        chatbot = load_solution("day1/bonus/04_streaming_bonus.py").StreamingChatbot()
+        for turn in range(TURNS):
+            chatbot.chat_streaming(f"Question {turn}", sink=CallbackSink(lambda text: None))
+
+        stats = get_metrics().snapshot()["streaming_chatbot"]
+        print(f"Stub: {LATENCY * 1000:.0f} ms before the headers, then {TOKEN_DELAY * 1000:.0f} ms per chunk\n")
+        for name, expected in [("time_to_headers", LATENCY), ("ttft", LATENCY + TOKEN_DELAY),
+                               ("inter_token", TOKEN_DELAY), ("total", None)]:
+            h = stats[name]
+            note = f"(expected ~{expected * 1000:.0f} ms)" if expected else ""
+            print(f"{name:<16} p50 {h['p50'] * 1000:7.2f} ms   p99 {h['p99'] * 1000:7.2f} ms   "
+                  f"n={h['count']:<4} {note}")
+
+        print("\nPrometheus export (excerpt):")
+        for line in get_metrics().prometheus_text().splitlines():
+            if "streaming_chatbot" in line and ("ttft" in line or "requests" in line):
+                print("  " + line)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
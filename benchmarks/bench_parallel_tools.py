@@ -0,0 +1,92 @@
+"""
+Benchmark: Sequential vs Parallel Tool Calls in the OpenRouter Agent
+====================================================================
+The stub LLM answers the user's message with two trigger_n8n_webhook calls
+(book a meeting + send an email) in one response; the fake n8n webhook adds
+a fixed delay. Compares one agent turn with tools run one after another
+against the ToolRunner running them concurrently.
+
+Also checks that a tool which times out is reported as possibly still
+completing, so the model does not call it again (exits 1 otherwise).
+
+Run from the repository root:
+    python benchmarks/bench_parallel_tools.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+from script_loader import load_solution
+from stub_server import start_stub_server
+from shared.tool_runner import ToolRunner
+
+WEBHOOK_LATENCY = 0.5
+TURNS = 5
+
+TOOL_CALLS = [
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "book_meeting",
+        "data": {"attendee_email": "john@example.com", "topic": "project update", "preferred_time": "Tuesday 2pm"}}},
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "send_email",
+        "data": {"recipient_email": "sarah@example.com", "subject": "Agenda", "message": "See you Tuesday"}}},
+]
+
+
+class SequentialRunner:
+    """The old behaviour: one tool call after another"""
+
+    def __init__(self, execute):
+        self.execute = execute
+
+    def run_all(self, calls):
+        return [self.execute(name, arguments) for name, arguments in calls]
+
+
+def time_turns(agent) -> float:
+    start = time.perf_counter()
+    # The agent prints every step; keep the benchmark output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for turn in range(TURNS):
+            agent.chat(f"Book a meeting with John and email Sarah the agenda ({turn})")
+    return (time.perf_counter() - start) / TURNS
+
+
+def check_timeout() -> bool:
+    """A slow tool must come back as 'may still complete, do not retry', not as a plain error"""
+    runner = ToolRunner(lambda name, arguments: time.sleep(0.2) or "done", default_timeout=0.05)
+    result = json.loads(runner.run_all([("trigger_n8n_webhook", {})])[0])
+    ok = result["status"] == "timeout" and "do not call it again" in result["message"]
+    print(f"{'✅' if ok else '❌'} timed-out tool: {result['message']}")
+    return ok
+
+
+def main():
+    server, base_url = start_stub_server()
+    server.tool_calls = TOOL_CALLS
+    server.webhook_latency = WEBHOOK_LATENCY
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENROUTER_API_KEY"] = "stub-key"
+    os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook/personal-assistant"
+
+    agent_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+    try:
+        sequential = agent_module.PersonalAssistantAgent()
+        sequential.tool_runner = SequentialRunner(sequential.execute_function)
+        parallel = agent_module.PersonalAssistantAgent()
+
+        print(f"2 webhook calls per turn, fake n8n latency {WEBHOOK_LATENCY * 1000:.0f} ms\n")
+        print(f"sequential tools: {time_turns(sequential) * 1000:7.1f} ms per turn")
+        print(f"parallel tools:   {time_turns(parallel) * 1000:7.1f} ms per turn\n")
+    finally:
+        server.shutdown()
+    if not check_timeout():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
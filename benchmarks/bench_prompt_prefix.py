@@ -0,0 +1,134 @@
+"""
+Benchmark: Prompt-Prefix Request Builder
+========================================
+Runs a 20-turn session of the OpenRouter agent against the stub LLM (each
+turn: one response with two webhook calls, then the final reply) and
+records every request body the stub receives.
+
+Reports:
+- bytes JSON-encoded over the session and encoding time: the SDK path
+  (json.dumps of the whole request every call - a lower bound, the SDK also
+  copies the request before encoding) vs PromptPrefixRequest
+- simulated provider prompt caching, OpenAI rules: the prefix shared with
+  the previous request is cached once it is 1024 tokens or more, in
+  128-token steps; about 4 characters per token
+
+Run from the repository root:
+    python benchmarks/bench_prompt_prefix.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import time
+
+from script_loader import load_solution
+from stub_server import StubHandler, start_stub_server
+from shared.memory import estimate_tokens
+from shared.messages import to_wire
+from shared.prompt_prefix import PromptPrefixRequest
+
+TURNS = 20
+REPEATS = 20
+
+TOOL_CALLS = [
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "book_meeting",
+        "data": {"attendee_email": "john@example.com", "topic": "project update", "preferred_time": "Tuesday 2pm"}}},
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "send_email",
+        "data": {"recipient_email": "sarah@example.com", "subject": "Agenda", "message": "See you Tuesday"}}},
+]
+
+# Price of a cached prompt token relative to an uncached one
+CACHED_PRICE = {"OpenAI (50% off)": 0.5, "Anthropic (90% off)": 0.1}
+
+
+class RecordingHandler(StubHandler):
+    """Keeps the raw body of every chat completion request"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.path.startswith("/webhook"):
+            self.server.bodies.append(body)
+        # Hand the body on to StubHandler as if it had not been read
+        self.rfile = io.BytesIO(body)
+        super().do_POST()
+
+
+def cached_tokens(previous: bytes, body: bytes) -> int:
+    """Tokens of body a prefix cache would serve after previous was sent"""
+    shared = len(os.path.commonprefix([previous, body])) if previous else 0
+    tokens = shared // 4
+    return tokens // 128 * 128 if tokens >= 1024 else 0
+
+
+def time_per_session(build, lengths: list) -> float:
+    start = time.perf_counter()
+    for _ in range(REPEATS):
+        build(lengths)
+    return (time.perf_counter() - start) / REPEATS
+
+
+def main():
+    server, base_url = start_stub_server(handler=RecordingHandler)
+    server.tool_calls = TOOL_CALLS
+    server.bodies = []
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENROUTER_API_KEY"] = "stub-key"
+    os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook/personal-assistant"
+
+    agent_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+    try:
+        agent = agent_module.PersonalAssistantAgent()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for turn in range(1, TURNS + 1):
+                agent.chat(f"Book the project meeting with John and email Sarah the agenda ({turn})")
+    finally:
+        server.shutdown()
+
+    bodies = server.bodies
+    history = agent.conversation_history
+    lengths = [len(json.loads(body)["messages"]) for body in bodies]
+    request = agent.prefix_request(agent.tool_selection, agent.router.backends[0])
+    prefix_tokens = estimate_tokens(request.prefix.decode())
+    print(f"{TURNS} turns, {len(bodies)} requests; static prefix (model + tools + system prompt) "
+          f"≈ {prefix_tokens:,} tokens\n")
+
+    # Serialization: the SDK re-encodes everything; the builder encodes each message once.
+    # Both send the tools the agent selected for this session.
+    tools = request.static["tools"]
+
+    def sdk_layout(lengths):
+        for n in lengths:
+            json.dumps({"model": agent.model, "messages": to_wire(history[:n]),
+                        "tools": tools, "tool_choice": "auto"})
+
+    def prefix_layout(lengths):
+        request = PromptPrefixRequest(agent.model, history[0].content, tools=tools, tool_choice="auto")
+        for n in lengths:
+            request.body(history[:n])
+
+    sdk_bytes = sum(len(json.dumps({"model": agent.model, "messages": to_wire(history[:n]),
+                                    "tools": tools, "tool_choice": "auto"})) for n in lengths)
+    encoded = request.encode_messages(history[1:])
+    prefix_bytes = len(request.prefix) + sum(len(data) for data in encoded)
+    sdk_time = time_per_session(sdk_layout, lengths)
+    prefix_time = time_per_session(prefix_layout, lengths)
+    print(f"{'':<22} {'bytes encoded':>14} {'ms per session':>15}")
+    print(f"{'json.dumps per call':<22} {sdk_bytes:>14,} {sdk_time * 1000:>15.2f}")
+    print(f"{'PromptPrefixRequest':<22} {prefix_bytes:>14,} {prefix_time * 1000:>15.2f}")
+    print(f"{'saved / speed-up':<22} {1 - prefix_bytes / sdk_bytes:>14.0%} {sdk_time / prefix_time:>14.1f}x\n")
+
+    # Simulated provider prompt cache over the session
+    prompt = sum(estimate_tokens(body.decode()) for body in bodies)
+    cached = sum(cached_tokens(previous, body) for previous, body in zip([None] + bodies, bodies))
+    print(f"Prompt tokens: {prompt:,}, served from the prompt cache: {cached:,} ({cached / prompt:.0%})")
+    for provider, price in CACHED_PRICE.items():
+        billed = prompt - cached + cached * price
+        print(f"   {provider:<20} billed as {billed:>9,.0f} tokens ({1 - billed / prompt:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
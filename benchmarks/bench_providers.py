@@ -0,0 +1,201 @@
+"""
+Benchmark: Latency-Aware Provider Routing and Hedged Requests
+=============================================================
+Starts three fake OpenAI-compatible servers with different latency profiles:
+
+    spiky   30 ms, but 10% of requests take 400 ms
+    steady  80 ms +/- 10 ms
+    flaky   40 ms, until it starts answering 503 (part 4)
+
+and sends the same sequential requests:
+
+    1. to each backend alone
+    2. through ProviderRouter without hedging (EWMA routing only)
+    3. through ProviderRouter with hedging
+    4. through ProviderRouter while one backend fails: errors seen by the caller
+    5. a request the API rejects (400): raised at once, no failover, no error
+       counted against the backend (exits 1 otherwise)
+    6. a hedge wins while the first backend fails: no failover request may
+       start after the race is won (no servers; exits 1 otherwise)
+
+Run from the repository root:
+    python benchmarks/bench_providers.py
+"""
+
+import random
+import statistics
+import sys
+import threading
+import time
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from stub_server import StubHandler, start_stub_server
+from shared.providers import Backend, ProviderRouter
+
+REQUESTS = 100
+MESSAGES = [{"role": "user", "content": "Say hello"}]
+
+
+class ProfileHandler(StubHandler):
+    """Waits (or fails: True for 503, or an HTTP status) according to server.profile(rng)"""
+
+    def do_POST(self):
+        delay, fail = self.server.profile(self.server.rng)
+        time.sleep(delay)
+        if fail:
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            payload = b'{"error": {"message": "overloaded"}}'
+            self.send_response(503 if fail is True else fail)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        super().do_POST()
+
+
+def spiky(rng):
+    return (0.4 if rng.random() < 0.1 else 0.03), False
+
+
+def steady(rng):
+    return rng.uniform(0.07, 0.09), False
+
+
+def start(profile, seed: int):
+    server, base_url = start_stub_server(handler=ProfileHandler)
+    server.profile = profile
+    server.rng = random.Random(seed)
+    server.failing = False
+    return server, f"{base_url}/api/v1"
+
+
+def run(send, requests: int = REQUESTS, on_request=None) -> dict:
+    latencies, errors = [], 0
+    for i in range(requests):
+        if on_request:
+            on_request(i)
+        start_time = time.perf_counter()
+        try:
+            send()
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start_time)
+    latencies.sort()
+    return {
+        "mean": statistics.mean(latencies) * 1000,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def report(label: str, result: dict, extra: str = ""):
+    print(f"{label:<26} {result['mean']:>7.1f} {result['p50']:>7.1f} {result['p99']:>7.1f} "
+          f"{result['errors']:>6}  {extra}")
+
+
+def backend(name: str, url: str) -> Backend:
+    return Backend(name, url, "stub-key", f"{name}-model", max_retries=0)
+
+
+def shares(router: ProviderRouter) -> str:
+    """Which backend answered, and how many extra requests hedging sent"""
+    backends = router.snapshot()
+    text = ", ".join(f"{b['name']} {b['wins']} wins" for b in backends)
+    hedges = sum(b["hedges"] for b in backends)
+    if hedges:
+        text += f"; {hedges} hedged ({hedges / REQUESTS:.0%} extra requests)"
+    return text
+
+
+def failovers_after_win(trials: int = 300) -> int:
+    """
+    The first attempt fails just as the hedge wins, so both often finish
+    before the router looks. Returns how many third attempts were started.
+    """
+    backends = [Backend(name, "http://127.0.0.1:9/v1", "stub-key", "model", max_retries=0) for name in "abc"]
+    router = ProviderRouter(backends, hedge_after=0.005)
+    late = []
+
+    def wins():
+        return sum(b.stats["wins"] for b in backends)
+
+    for _ in range(trials):
+        lock, calls, before = threading.Lock(), [], wins()
+
+        def request(backend):
+            with lock:
+                calls.append(backend)
+                attempt = len(calls)
+            if attempt == 1:
+                while wins() == before:
+                    pass    # spin, so this failure lands right after the hedge's win
+                raise ConnectionError("connection dropped")
+            if attempt == 3:
+                late.append(backend)
+            return "answer"
+
+        router.call(request)
+    return len(late)
+
+
+def main():
+    servers = {}
+    try:
+        servers["spiky"] = start(spiky, seed=1)
+        servers["steady"] = start(steady, seed=2)
+        servers["flaky"] = start(lambda rng: (0.04, servers["flaky"][0].failing), seed=3)
+        urls = {name: url for name, (_, url) in servers.items()}
+
+        print(f"{REQUESTS} sequential requests per row\n")
+        print(f"{'':<26} {'mean ms':>7} {'p50':>7} {'p99':>7} {'errors':>6}")
+        for name in ("spiky", "steady"):
+            alone = ProviderRouter([backend(name, urls[name])])
+            report(f"{name} alone", run(lambda: alone.create(messages=MESSAGES)))
+
+        for hedging in (False, True):
+            router = ProviderRouter([backend("spiky", urls["spiky"]), backend("steady", urls["steady"])],
+                                    hedging=hedging)
+            label = "router + hedging" if hedging else "router (EWMA only)"
+            report(label, run(lambda: router.create(messages=MESSAGES)), shares(router))
+
+        # Part 4: flaky starts failing a third of the way in
+        router = ProviderRouter([backend("flaky", urls["flaky"]), backend("steady", urls["steady"])])
+
+        def break_flaky(i):
+            servers["flaky"][0].failing = i >= REQUESTS // 3
+
+        report("router, flaky fails at 1/3", run(lambda: router.create(messages=MESSAGES), on_request=break_flaky),
+               shares(router))
+        flaky = router.snapshot()[0]
+        print(f"{'':<26} flaky: {flaky['errors']} failed attempts, error rate EWMA {flaky['error_rate']:.0%}")
+
+        # Part 5: a bad request must not fail over or count as a backend error
+        servers["invalid"] = start(lambda rng: (0.0, 400), seed=4)
+        router = ProviderRouter([backend("invalid", servers["invalid"][1]), backend("steady", urls["steady"])],
+                                hedging=False)
+        try:
+            router.create(messages=MESSAGES)
+            status = None
+        except Exception as e:
+            status = getattr(e, "status_code", None)
+        invalid, fallback = router.snapshot()
+        ok = status == 400 and fallback["requests"] == 0 and invalid["errors"] == 0
+        print(f"\n{'✅' if ok else '❌'} 400 raised: {status}, sent to steady: {fallback['requests']}, "
+              f"counted as backend errors: {invalid['errors']}")
+        if not ok:
+            sys.exit(1)
+
+        # Part 6: a failure next to the winning hedge must not start a failover
+        late = failovers_after_win()
+        print(f"{'✅' if late == 0 else '❌'} failover requests started after the race was won: {late}")
+        if late:
+            sys.exit(1)
+    finally:
+        for server, _ in servers.values():
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Benchmark: Client-Side Rate Limiting and Priorities
+===================================================
+A fake provider with an RPM and TPM limit (metered like a token bucket,
+answering 429 with Retry-After when a request does not fit) gets:
+
+    1. a batch sweep from 16 threads with no client-side limit
+    2. the same sweep through the rate limiter set to the provider's limits
+    3. the sweep again while a user chats (one message every 0.25 s):
+       how long chat messages wait, first come first served vs INTERACTIVE
+       ahead of BATCH
+    4. async callers on one event loop (no provider): the limiter's rate,
+       INTERACTIVE ahead of the queued BATCH calls, and how often waiters
+       re-check the queue, since they sleep until it is their turn instead
+       of polling (exits 1 if any is off)
+
+Run from the repository root:
+    python benchmarks/bench_rate_limiter.py
+"""
+
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from stub_server import StubHandler, start_stub_server
+from shared.rate_limiter import BATCH, INTERACTIVE, RateLimiter, TokenBucket, set_limiter
+
+LATENCY = 0.02
+PROVIDER_RPM = 1200         # 20 requests a second
+PROVIDER_TPM = 120_000      # 2,000 tokens a second
+MAX_TOKENS = 50
+VARIANTS = 150
+CONCURRENCY = 16
+CHAT_MESSAGES = 20
+ASYNC_CALLERS = 100
+
+
+class LimitedHandler(StubHandler):
+    """Answers 429 (with Retry-After) when a request does not fit the server's RPM/TPM buckets"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request = json.loads(body)
+        server = self.server
+        # What the provider counts: the prompt (about 4 characters a token) plus max_tokens
+        tokens = len(json.dumps(request.get("messages", []))) // 4 + (request.get("max_tokens") or 0)
+        with server.lock:
+            now = time.monotonic()
+            wait = max(server.requests.wait_time(1, now), server.tokens.wait_time(tokens, now))
+            if wait == 0:
+                server.requests.take(1)
+                server.tokens.take(tokens)
+            else:
+                server.rejected += 1
+        if wait:
+            payload = json.dumps({"error": {"message": "Rate limit reached", "type": "rate_limit"}}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Retry-After", str(max(1, round(wait))))
+            self.send_header("retry-after-ms", str(int(wait * 1000) + 1))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        # Let the stub read the body it expects, then keep the real stream for the next request
+        stream, self.rfile = self.rfile, io.BytesIO(body)
+        try:
+            super().do_POST()
+        finally:
+            self.rfile = stream
+
+
+def reset_provider(server):
+    server.requests = TokenBucket(PROVIDER_RPM)
+    server.tokens = TokenBucket(PROVIDER_TPM)
+    server.rejected = 0
+
+
+def build_variants() -> list:
+    # Every fourth prompt is long, so TPM binds as well as RPM
+    return [
+        {
+            "model": "gpt-4o-mini",
+            "messages": [{"role": "user", "content": f"Variant {i}: explain variables. " * (30 if i % 4 == 0 else 2)}],
+            "max_tokens": MAX_TOKENS
+        }
+        for i in range(VARIANTS)
+    ]
+
+
+def sweep(server, run_experiments) -> dict:
+    reset_provider(server)
+    start = time.perf_counter()
+    results = run_experiments(build_variants(), max_concurrency=CONCURRENCY)
+    elapsed = time.perf_counter() - start
+    ok = sum("content" in result for result in results)
+    return {"ok": ok, "failed": len(results) - ok, "rejected": server.rejected, "seconds": elapsed}
+
+
+def chat_during_sweep(server, run_experiments, chat_completion, priority: int) -> list:
+    """Seconds each chat message took while the sweep saturates the limit"""
+    reset_provider(server)
+    batch = threading.Thread(target=run_experiments, args=(build_variants(),),
+                             kwargs={"max_concurrency": CONCURRENCY})
+    batch.start()
+    time.sleep(0.5)         # let the sweep fill the queue
+    latencies = []
+    for i in range(CHAT_MESSAGES):
+        start = time.perf_counter()
+        chat_completion({"model": "gpt-4o-mini", "messages": [{"role": "user", "content": f"Hi {i}"}],
+                         "max_tokens": MAX_TOKENS}, priority=priority)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.25)
+    batch.join()
+    return sorted(latencies)
+
+
+async def async_callers() -> dict:
+    """ASYNC_CALLERS BATCH coroutines, plus one INTERACTIVE call once the burst is spent"""
+    limiter = RateLimiter(PROVIDER_RPM)
+    checks = 0
+    grant = limiter._grant
+
+    def counting_grant(*args):
+        nonlocal checks
+        checks += 1
+        return grant(*args)
+
+    limiter._grant = counting_grant
+    order = []
+
+    async def call(name, priority):
+        await limiter.acquire_async(1, priority)
+        order.append(name)
+
+    start = time.perf_counter()
+    batch = [asyncio.create_task(call(i, BATCH)) for i in range(ASYNC_CALLERS)]
+    await asyncio.sleep(0.1)
+    await call("chat", INTERACTIVE)
+    await asyncio.gather(*batch)
+    return {"seconds": time.perf_counter() - start, "checks": checks, "chat_position": order.index("chat")}
+
+
+def check_async() -> bool:
+    result = asyncio.run(async_callers())
+    burst = PROVIDER_RPM / 60           # BURST_SECONDS = 1
+    expected = (ASYNC_CALLERS + 1 - burst) / (PROVIDER_RPM / 60)
+    # The chat call goes after the burst and the few batch calls granted while it queued
+    ok = (abs(result["seconds"] - expected) < 0.15 * expected and result["chat_position"] < burst + 5
+          and result["checks"] < 4 * (ASYNC_CALLERS + 1))
+    print(f"\n{'✅' if ok else '❌'} {ASYNC_CALLERS} async BATCH callers + 1 INTERACTIVE: "
+          f"{result['seconds']:.2f}s (expected {expected:.2f}s), chat granted "
+          f"#{result['chat_position'] + 1}, {result['checks']} queue checks")
+    return ok
+
+
+def main():
+    server, base_url = start_stub_server(latency=LATENCY, handler=LimitedHandler)
+    server.lock = threading.Lock()
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["HTTP_POOL_SIZE"] = str(CONCURRENCY * 2)
+    os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+    os.environ.pop("LLM_BACKENDS", None)
+
+    from shared.batch import run_experiments
+    from shared.transport import chat_completion
+
+    print(f"Provider limits: {PROVIDER_RPM} RPM, {PROVIDER_TPM:,} TPM; "
+          f"{VARIANTS} requests from {CONCURRENCY} threads\n")
+    print(f"{'':<26} {'ok':>5} {'failed':>7} {'429s':>6} {'seconds':>8} {'ok/s':>6}")
+    for label, limiter in (("no client limit", None),
+                           ("rate limiter", RateLimiter(PROVIDER_RPM, PROVIDER_TPM))):
+        set_limiter(limiter)
+        result = sweep(server, run_experiments)
+        print(f"{label:<26} {result['ok']:>5} {result['failed']:>7} {result['rejected']:>6} "
+              f"{result['seconds']:>8.2f} {result['ok'] / result['seconds']:>6.1f}")
+    print(f"{'':<26} limiter: {limiter.stats['waited']} calls waited, "
+          f"{limiter.stats['rate_limited']} paused by a 429")
+
+    print(f"\nChat messages sent during the sweep ({CHAT_MESSAGES}, one every 0.25 s):")
+    print(f"{'':<26} {'p50 ms':>7} {'max ms':>7}")
+    for label, priority in (("first come, first served", BATCH), ("INTERACTIVE first", INTERACTIVE)):
+        set_limiter(RateLimiter(PROVIDER_RPM, PROVIDER_TPM))
+        latencies = chat_during_sweep(server, run_experiments, chat_completion, priority)
+        print(f"{label:<26} {statistics.median(latencies) * 1000:>7.0f} {latencies[-1] * 1000:>7.0f}")
+
+    set_limiter(None)
+    server.shutdown()
+    if not check_async():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark: Semantic Cache Lookup Latency by Index Size
+======================================================
+Fills a SemanticCache with random unit vectors and times lookups of real
+questions at 10k, 100k and 1M entries, and how long an insert waits while
+lookups run. Also shows which tutoring questions are treated as near
+duplicates at the default threshold, and checks that reversed or negated
+questions and follow-ups from another conversation do not hit (exits 1 if
+one does).
+
+Run from the repository root:
+    python benchmarks/bench_semantic_cache.py
+"""
+
+import statistics
+import sys
+import threading
+import time
+
+import numpy as np
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from shared.semantic_cache import HashedNgramVectorizer, SemanticCache
+
+SIZES = [10_000, 100_000, 1_000_000]
+LOOKUPS = 200
+FILL_CHUNK = 50_000
+
+# (question, cached question, should it hit?)
+PAIRS = [
+    ("What is a variable?", "explain variables", True),
+    ("How do I write a for loop in Python?", "how to write for loops in python", True),
+    ("What is a list comprehension?", "explain list comprehensions", True),
+    ("What is a dictionary?", "What is a list?", False),
+    ("What is a variable?", "What is a loop?", False),
+    # Same words, reversed meaning
+    ("convert string to int", "convert int to string", False),
+    ("sort a list by key", "sort key by list", False),
+    # Similar words, opposite meaning
+    ("how to install numpy on windows with pip", "how to uninstall numpy on windows with pip", False),
+    ("why is my loop not working", "why is my loop working", False),
+    ("how do I add an item to a list in python", "how do I remove an item from a list in python", False),
+]
+
+
+def check_context() -> bool:
+    """A follow-up is only answered from the conversation it was asked in"""
+    cache = SemanticCache()
+    system = {"role": "system", "content": "You are a tutor."}
+    about_loops = [system, {"role": "user", "content": "What is a loop?"}, {"role": "assistant", "content": "..."}]
+    about_dicts = [system, {"role": "user", "content": "What is a dict?"}, {"role": "assistant", "content": "..."}]
+    cache.insert("give me an example", "for i in range(3): print(i)",
+                 namespace=cache.context_namespace(system["content"], about_loops))
+    same = cache.lookup("give me an example", namespace=cache.context_namespace(system["content"], about_loops))
+    other = cache.lookup("give me an example", namespace=cache.context_namespace(system["content"], about_dicts))
+    print(f"  follow-up in the same conversation: {'HIT ' if same else 'miss'}; "
+          f"after a different turn: {'HIT ' if other else 'miss'}")
+    return same is not None and other is None
+
+
+def fill(cache: SemanticCache, count: int, rng: np.random.Generator):
+    dim = cache.embed.dim
+    for start in range(0, count, FILL_CHUNK):
+        vectors = rng.standard_normal((min(FILL_CHUNK, count - start), dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        for i, vector in enumerate(vectors):
+            cache.insert(f"q{start + i}", f"a{start + i}", vector=vector)
+
+
+def insert_wait(cache: SemanticCache, questions: list, inserts: int = 50) -> float:
+    """p99 ms an insert takes while another thread keeps looking questions up"""
+    stop = threading.Event()
+
+    def look_up():
+        while not stop.is_set():
+            for question in questions:
+                cache.lookup(question)
+
+    reader = threading.Thread(target=look_up)
+    reader.start()
+    waits = []
+    vector = cache.embed("What is a variable?")
+    for i in range(inserts):
+        start = time.perf_counter()
+        cache.insert(f"extra {i}", "answer", vector=vector)
+        waits.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.002)
+    stop.set()
+    reader.join()
+    waits.sort()
+    return waits[int(len(waits) * 0.99) - 1]
+
+
+def main():
+    vectorizer = HashedNgramVectorizer()
+    print(f"Near-duplicate detection (threshold {SemanticCache().threshold}):")
+    correct = True
+    for a, b, expected in PAIRS:
+        cache = SemanticCache(max_entries=1, embed=vectorizer)
+        cache.insert(b, "answer")
+        hit = cache.lookup(a) is not None
+        similarity = float(vectorizer(a) @ vectorizer(b))
+        correct &= hit == expected
+        print(f"  {similarity:5.2f}  {'HIT ' if hit else 'miss'}  {'✅' if hit == expected else '❌'}  {a!r} ~ {b!r}")
+    correct &= check_context()
+
+    rng = np.random.default_rng(0)
+    questions = [a for a, _, _ in PAIRS] * (LOOKUPS // len(PAIRS))
+    print(f"\nLookup latency (dim={vectorizer.dim}, float32):")
+    for size in SIZES:
+        cache = SemanticCache(max_entries=size, embed=vectorizer)
+        fill(cache, size, rng)
+
+        latencies = []
+        for question in questions:
+            start = time.perf_counter()
+            cache.lookup(question)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"  {size:>9,} entries   p50={statistics.median(latencies):8.3f} ms   "
+              f"p99={latencies[int(len(latencies) * 0.99) - 1]:8.3f} ms   "
+              f"index={size * vectorizer.dim * 4 / 1e6:7.1f} MB   "
+              f"insert during lookups p99={insert_wait(cache, questions[:len(PAIRS)]):8.3f} ms")
+        del cache
+
+    if not correct:
+        print("\n❌ Some questions matched (or missed) when they should not have")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: Many Dormant Sessions in the SQLite Session Store
+============================================================
+Writes many small sessions to a temporary store, then measures RAM that the
+same sessions would take as in-process lists, page-in latency for one
+session, and compaction.
+
+Also checks that a session synced under a sliding window that trims away
+every saved message still stores each message once, in order (exits 1
+otherwise).
+
+Run from the repository root:
+    python benchmarks/bench_session_store.py [sessions]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from shared.memory import SlidingWindowMemory
+from shared.messages import Message
+from shared.session_store import SessionStore
+
+MESSAGES_PER_SESSION = 20
+LOOKUPS = 1000
+
+
+def build_session(i: int) -> list:
+    history = [{"role": "system", "content": "You are a friendly Python programming tutor."}]
+    for turn in range(MESSAGES_PER_SESSION // 2):
+        history.append({"role": "user", "content": f"Session {i} question {turn}: what is a list comprehension?"})
+        history.append({"role": "assistant", "content": "A list comprehension builds a list from an iterable in one expression."})
+    return history
+
+
+def disk_bytes(path: str) -> int:
+    """Database file plus its write-ahead log"""
+    wal = path + "-wal"
+    return os.path.getsize(path) + (os.path.getsize(wal) if os.path.exists(wal) else 0)
+
+
+def check_trimmed_sync(path: str) -> bool:
+    """A window smaller than one turn drops the saved messages before every sync"""
+    store = SessionStore(path)
+    session = store.open("trimmed")
+    memory = SlidingWindowMemory(max_tokens=40)
+    history = [Message("system", "You are a tutor.")]
+    session.sync(history)
+    for turn in range(5):
+        history.append(Message("user", f"Question {turn}: " + "what is a generator? " * 3))
+        history = memory.apply(history)
+        history.append(Message("assistant", f"Answer {turn}: " + "it yields values lazily. " * 3))
+        session.sync(history)
+    roles = [message["role"] for message in store.load("trimmed")]
+    store.close()
+    ok = roles == ["system"] + ["user", "assistant"] * 5
+    print(f"{'✅' if ok else '❌'} sync under a sliding window: {len(roles)} messages stored "
+          f"({', '.join(roles[:5])}, ...)")
+    return ok
+
+
+def main():
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+    tracemalloc.start()
+    in_ram = {f"session-{i}": build_session(i) for i in range(sessions)}
+    ram_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        store = SessionStore(path)
+
+        start = time.perf_counter()
+        for session_id, history in in_ram.items():
+            store.append(session_id, history)
+        write_seconds = time.perf_counter() - start
+        del in_ram
+
+        step = max(1, sessions // LOOKUPS)
+        latencies = []
+        for i in range(0, sessions, step):
+            start = time.perf_counter()
+            store.open(f"session-{i}").load()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        size_before = disk_bytes(path)
+        start = time.perf_counter()
+        removed = store.compact(keep_last=6)
+        compact_seconds = time.perf_counter() - start
+        size_after = disk_bytes(path)
+        store.close()
+
+    print(f"{sessions:,} sessions x {MESSAGES_PER_SESSION + 1} messages")
+    print(f"  as Python lists in RAM:  {ram_bytes / 1e6:8.1f} MB")
+    print(f"  on disk (SQLite WAL):    {size_before / 1e6:8.1f} MB   written in {write_seconds:.1f}s")
+    print(f"  page in one session:     p50={statistics.median(latencies):.3f} ms   "
+          f"max={max(latencies):.3f} ms")
+    print(f"  compact(keep_last=6):    removed {removed:,} messages in {compact_seconds:.1f}s, "
+          f"file {size_after / 1e6:.1f} MB\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not check_trimmed_sync(os.path.join(tmp, "trimmed.db")):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
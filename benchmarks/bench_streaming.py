@@ -0,0 +1,92 @@
+"""
+Benchmark: Printing a 50k-Token Stream
+======================================
+Compares the original streaming loop (``full_response += content`` and a
+flushed print per token) with the chunk buffer + coalescing StdoutSink now
+used by StreamingChatbot, on a synthetic 50,000-token stream written to
+/dev/null. Counts write calls that reach the file.
+
+Then streams a 50,000-token reply from the stub server through
+StreamingChatbot.chat_streaming() end to end.
+
+Run from the repository root:
+    python benchmarks/bench_streaming.py
+"""
+
+import os
+import time
+
+from script_loader import load_solution
+from shared.streaming import StdoutSink
+from stub_server import start_stub_server
+
+TOKENS = 50_000
+WORDS = ["the", " quick", " brown", " fox", " jumps", " over", " a", " lazy", " dog", ",", " and", " then"]
+
+
+class CountingFile:
+    """/dev/null text file that counts the flushes (one write syscall each)"""
+
+    def __init__(self):
+        self.file = open(os.devnull, "w")
+        self.flushes = 0
+
+    def write(self, text):
+        return self.file.write(text)
+
+    def flush(self):
+        self.flushes += 1
+        self.file.flush()
+
+
+def original(tokens, out):
+    full_response = ""
+    print("Chatbot: ", end="", flush=True, file=out)
+    for content in tokens:
+        full_response += content
+        print(content, end="", flush=True, file=out)
+    print(file=out)
+    return full_response
+
+
+def buffered(tokens, out):
+    sink = StdoutSink(stream=out)
+    sink.write("Chatbot: ")
+    parts = []
+    for content in tokens:
+        parts.append(content)
+        sink.write(content)
+    sink.write("\n")
+    sink.close()
+    return "".join(parts)
+
+
+def main():
+    tokens = [WORDS[i % len(WORDS)] for i in range(TOKENS)]
+    print(f"Synthetic stream of {TOKENS:,} tokens to /dev/null\n")
+    for label, run in [("+= and print per token", original), ("buffer + StdoutSink", buffered)]:
+        out = CountingFile()
+        start = time.perf_counter()
+        reply = run(tokens, out)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24} {elapsed * 1000:7.1f} ms   {out.flushes:6,} flushes   {len(reply):,} chars")
+
+    server, base_url = start_stub_server()
+    server.reply = " ".join(tokens).replace("  ", " ")
+    os.environ["OPENAI_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    try:
+        chatbot = load_solution("day1/bonus/04_streaming_bonus.py").StreamingChatbot()
+        out = CountingFile()
+        start = time.perf_counter()
+        reply = chatbot.chat_streaming("Tell me a long story", sink=StdoutSink(stream=out))
+        elapsed = time.perf_counter() - start
+        words = len(reply.split())
+        print(f"\nStreamingChatbot via stub: {words:,} tokens in {elapsed:.2f} s "
+              f"({words / elapsed:,.0f} tokens/s, {out.flushes} flushes)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: Streaming Agent Loop with Early Tool Dispatch
+========================================================
+The stub LLM writes two trigger_n8n_webhook calls at a fixed token rate and
+the fake n8n webhook adds a delay. Compares chat(), which waits for the
+whole completion before running tools, with chat_stream(), which starts
+each webhook as soon as its arguments have streamed in.
+
+Reports time to first action (first webhook request) and time per turn.
+
+Run from the repository root:
+    python benchmarks/bench_streaming_agent.py
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import time
+
+from script_loader import load_solution
+from stub_server import start_stub_server
+
+TOKEN_DELAY = 0.005     # seconds per streamed chunk (about 200 tokens/s)
+WEBHOOK_LATENCY = 0.3
+TURNS = 5
+
+TOOL_CALLS = [
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "book_meeting",
+        "data": {"attendee_email": "john@example.com", "attendee_name": "John", "topic": "project update",
+                 "preferred_time": "Tuesday 2pm", "duration_minutes": 30}}},
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "send_email",
+        "data": {"recipient_email": "sarah@example.com", "subject": "Agenda for Tuesday",
+                 "message": "Hi Sarah, the project update with John is on Tuesday at 2pm."}}},
+]
+
+
+def measure(server, run_turn) -> tuple:
+    first_action, turn_times = [], []
+    for turn in range(TURNS):
+        server.webhook_log = []
+        start = time.perf_counter()
+        # The agent prints every step; keep the benchmark output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_turn(f"Book a meeting with John and email Sarah the agenda ({turn})")
+        turn_times.append(time.perf_counter() - start)
+        first_action.append(server.webhook_log[0] - start)
+    return statistics.median(first_action), statistics.median(turn_times)
+
+
+def main():
+    server, base_url = start_stub_server()
+    server.tool_calls = TOOL_CALLS
+    server.token_delay = TOKEN_DELAY
+    server.webhook_latency = WEBHOOK_LATENCY
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENROUTER_API_KEY"] = "stub-key"
+    os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook/personal-assistant"
+
+    agent_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+    try:
+        agent = agent_module.PersonalAssistantAgent()
+        streaming = agent_module.PersonalAssistantAgent()
+
+        print(f"{TOKEN_DELAY * 1000:.0f} ms per chunk, fake n8n latency {WEBHOOK_LATENCY * 1000:.0f} ms, "
+              f"2 webhook calls per turn (medians of {TURNS} turns)\n")
+        print(f"{'':<14} {'first action':>13} {'turn':>10}")
+        for label, run_turn in [
+            ("chat()", agent.chat),
+            ("chat_stream()", lambda message: "".join(streaming.chat_stream(message))),
+        ]:
+            first_action, turn_time = measure(server, run_turn)
+            print(f"{label:<14} {first_action * 1000:10.1f} ms {turn_time * 1000:7.1f} ms")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: Prompt Tokens with One Assistant Message per Tool-Call Response
+==========================================================================
+Drives the OpenRouter agent against the stub LLM, which answers each user
+message with three tool calls in one response. Compares the prompt size of
+every request when history has one assistant message per tool call (the old
+layout) against one assistant message per model response.
+
+Run from the repository root:
+    python benchmarks/bench_tool_history.py
+"""
+
+import contextlib
+import io
+import json
+import os
+
+from script_loader import load_solution
+from stub_server import start_stub_server
+from shared.memory import estimate_tokens
+from shared.messages import Message, to_wire
+
+TURNS = 5
+
+TOOL_CALLS = [
+    {"name": "extract_meeting_intent", "arguments": {
+        "attendee_email": "john@example.com", "topic": "project update", "preferred_time": "Tuesday 2pm"}},
+    {"name": "extract_email_intent", "arguments": {
+        "recipient_email": "sarah@example.com", "subject": "Agenda", "message": "See you Tuesday"}},
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "send_email",
+        "data": {"recipient_email": "sarah@example.com", "subject": "Agenda", "message": "See you Tuesday"}}},
+]
+
+
+def one_message_per_call(history: list) -> list:
+    """Rebuild the old layout: each tool call in its own assistant message, before its result"""
+    results = {m.tool_call_id: m for m in history if m.role == "tool"}
+    expanded = []
+    for message in history:
+        if message.role == "tool":
+            continue
+        if message.role == "assistant" and message.tool_calls:
+            for tool_call in message.tool_calls:
+                expanded.append(Message("assistant", message.content, tool_calls=[tool_call]))
+                expanded.append(results[tool_call.id])
+        else:
+            expanded.append(message)
+    return expanded
+
+
+def prompt_tokens(messages: list, tools: list) -> int:
+    return estimate_tokens(json.dumps({"messages": to_wire(messages), "tools": tools}))
+
+
+def main():
+    server, base_url = start_stub_server()
+    server.tool_calls = TOOL_CALLS
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENROUTER_API_KEY"] = "stub-key"
+    os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook/personal-assistant"
+
+    agent_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+    try:
+        agent = agent_module.PersonalAssistantAgent()
+        print(f"{len(TOOL_CALLS)} tool calls per response; prompt tokens of the request after each turn's tools\n")
+        print(f"{'turn':>4} {'per call':>10} {'per response':>14} {'saved':>8}")
+        for turn in range(1, TURNS + 1):
+            with contextlib.redirect_stdout(io.StringIO()):
+                agent.chat(f"Book a meeting with John and email Sarah the agenda ({turn})")
+            # The request that sent the tool results back is the history minus the final reply
+            history = agent.conversation_history[:-1]
+            old = prompt_tokens(one_message_per_call(history), agent.tool_registry.schemas())
+            new = prompt_tokens(history, agent.tool_registry.schemas())
+            print(f"{turn:>4} {old:>10,} {new:>14,} {old - new:>7,} ({(old - new) / old:.0%})")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: Tool Registry Dispatch and Schema Generation
+=======================================================
+- dispatch: an if/elif chain of name comparisons (the old execute_function)
+  vs the registry's dict lookup, calling the last tool of 3 and of 50
+- schemas: generating them from type hints and docstrings vs reusing the
+  ones generated at registration
+- async tools: 10 calls to a tool that waits 50 ms, awaited together
+  through acall() vs one after another
+
+Run from the repository root:
+    python benchmarks/bench_tool_registry.py
+"""
+
+import asyncio
+import time
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from shared.assistant_tools import build_assistant_tools
+from shared.tool_registry import ToolRegistry, function_schema
+
+CALLS = 200_000
+
+
+def make_tool(i: int):
+    def tool(value: str, count: int = 1) -> str:
+        """
+        A generated tool.
+
+        Args:
+            value: Any text
+            count: How many times
+        """
+        return value
+    tool.__name__ = f"tool_{i}"
+    return tool
+
+
+def per_call(function, calls: int = CALLS) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    arguments = {"value": "x"}
+    print(f"{'tools':>5} {'if/elif chain':>14} {'registry':>10}")
+    for size in (3, 50):
+        tools = [make_tool(i) for i in range(size)]
+        registry = ToolRegistry()
+        for tool in tools:
+            registry.tool(tool)
+        chain = [(tool.__name__, tool) for tool in tools]
+        last = chain[-1][0]
+
+        def dispatch_chain():
+            # What `if name == "a": ... elif name == "b": ...` does: compare until one matches
+            for name, tool in chain:
+                if name == last:
+                    return tool(**arguments)
+
+        chain_time = per_call(dispatch_chain)
+        registry_time = per_call(lambda: registry.call(last, arguments))
+        print(f"{size:>5} {chain_time * 1e9:>11.0f} ns {registry_time * 1e9:>7.0f} ns")
+
+    assistant = build_assistant_tools(lambda action, data: "{}")
+    functions = [assistant.get(name).func for name in assistant.names()]
+    generate = per_call(lambda: [function_schema(func) for func in functions], 2000)
+    cached = per_call(lambda: assistant.selection().tools, 100_000)
+    print(f"\nAssistant schemas: generated {generate * 1e6:.0f} µs, cached {cached * 1e6:.2f} µs per request")
+
+    registry = ToolRegistry()
+
+    @registry.tool
+    async def lookup(query: str) -> str:
+        """Wait like a slow API would."""
+        await asyncio.sleep(0.05)
+        return query
+
+    async def together():
+        await asyncio.gather(*(registry.acall("lookup", {"query": str(i)}) for i in range(10)))
+
+    start = time.perf_counter()
+    for i in range(10):
+        registry.call("lookup", {"query": str(i)})
+    one_by_one = time.perf_counter() - start
+    start = time.perf_counter()
+    asyncio.run(together())
+    print(f"10 async tool calls: one after another {one_by_one * 1000:.0f} ms, "
+          f"awaited together {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: Tool Schema Compaction and Per-Turn Tool Selection
+=============================================================
+Part 1 classifies a set of labelled user messages locally and shows which
+tools each turn would send with per-turn selection, the schema tokens per
+request and whether the tool the turn needs is included.
+
+Part 2 drives the OpenRouter agent through the conversation (three times
+over, 24 turns) against the stub LLM, once with every minified tool on every
+turn (the default) and once with per-turn selection, and records every
+request body. Reports schema tokens per request, and prompt tokens billed
+with a provider prompt cache (simulated as in bench_prompt_prefix.py):
+every switch of tool subset changes the prefix, so the cache misses on the
+whole conversation that follows it.
+
+Run from the repository root:
+    python benchmarks/bench_tool_selection.py
+"""
+
+import contextlib
+import io
+import os
+import time
+
+from script_loader import load_solution
+from stub_server import start_stub_server
+from bench_prompt_prefix import CACHED_PRICE, RecordingHandler, cached_tokens
+from shared.assistant_tools import build_assistant_tools
+from shared.memory import estimate_tokens
+
+# Times the conversation is repeated in part 2
+ROUNDS = 3
+
+# (message, tool the turn needs, or None for small talk)
+MESSAGES = [
+    ("Book a meeting with John about project updates, his email is john@example.com", "extract_meeting_intent"),
+    ("Tuesday 2pm works", "extract_meeting_intent"),
+    ("Send an email to sarah@example.com about the meeting tomorrow", "extract_email_intent"),
+    ("email Sarah the agenda", "extract_email_intent"),
+    ("Can you schedule a sync with the design team on Friday?", "extract_meeting_intent"),
+    ("Reply to Tom saying the report is ready", "extract_email_intent"),
+    ("Book the project meeting with John and email Sarah the agenda", "extract_email_intent"),
+    ("Hi! What can you do?", None),
+]
+
+TOOL_CALLS = [
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "book_meeting",
+        "data": {"attendee_email": "john@example.com", "topic": "project update", "preferred_time": "Tuesday 2pm"}}},
+]
+
+
+def converse(agent_module, server, registry) -> dict:
+    """Run the conversation with this registry; schema and (cached) prompt tokens over all requests"""
+    agent = agent_module.PersonalAssistantAgent()
+    agent.tool_registry = registry
+    agent.tool_selection = registry.selection()
+    server.bodies = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(ROUNDS):
+            for message, _ in MESSAGES:
+                agent.chat(message)
+    bodies = server.bodies
+    return {
+        "requests": len(bodies),
+        "schema": registry.full_tokens - registry.stats["tokens_saved"] / registry.stats["requests"],
+        "prompt": sum(estimate_tokens(body.decode()) for body in bodies),
+        "cached": sum(cached_tokens(previous, body) for previous, body in zip([None] + bodies, bodies)),
+    }
+
+
+def main():
+    server, base_url = start_stub_server(handler=RecordingHandler)
+    server.tool_calls = TOOL_CALLS
+    server.bodies = []
+    os.environ["OPENROUTER_BASE_URL"] = f"{base_url}/api/v1"
+    os.environ["OPENROUTER_API_KEY"] = "stub-key"
+    os.environ["N8N_WEBHOOK_URL"] = f"{base_url}/webhook/personal-assistant"
+    agent_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+
+    def registry(select_per_turn):
+        return build_assistant_tools(agent_module.trigger_n8n_webhook, select_per_turn=select_per_turn)
+
+    try:
+        selecting = registry(True)
+        print(f"All tools, full schemas: {selecting.full_tokens} tokens per request\n")
+        print(f"{'message':<48} {'tools sent':<66} {'tokens':>6} {'ok':>3}")
+        selection = None
+        for message, needed in MESSAGES:
+            selection = selecting.select(message, selection)
+            ok = "✅" if needed is None or needed in selection.names else "❌"
+            print(f"{message[:47]:<48} {', '.join(selection.names):<66} {selection.tokens:>6} {ok:>3}")
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            for message, _ in MESSAGES:
+                selecting.select(message)
+        per_message = (time.perf_counter() - start) / (1000 * len(MESSAGES))
+        print(f"\nClassifier + selection: {per_message * 1e6:.0f} µs per message\n")
+
+        # Part 2: a real conversation, counting every request (tool rounds included)
+        results = {"all tools (default)": converse(agent_module, server, registry(False)),
+                   "per-turn selection": converse(agent_module, server, registry(True))}
+    finally:
+        server.shutdown()
+
+    first = next(iter(results.values()))
+    print(f"Agent conversation: {len(MESSAGES) * ROUNDS} turns, {first['requests']} requests "
+          f"(full schemas: {selecting.full_tokens} tokens per request)")
+    print(f"{'':<22} {'schema/request':>14} {'prompt tokens':>14} {'cached':>8} "
+          + " ".join(f"{provider.split()[0] + ' billed':>16}" for provider in CACHED_PRICE))
+    for label, result in results.items():
+        billed = [result["prompt"] - result["cached"] * (1 - price) for price in CACHED_PRICE.values()]
+        print(f"{label:<22} {result['schema']:>14.0f} {result['prompt']:>14,} "
+              f"{result['cached'] / result['prompt']:>8.0%} " + " ".join(f"{b:>16,.0f}" for b in billed))
+
+
+if __name__ == "__main__":
+    main()
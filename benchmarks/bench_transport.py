@@ -0,0 +1,66 @@
+"""
+Benchmark: Fresh Connections vs Pooled Keep-Alive Session
+=========================================================
+Sends the same chat completion request to a local stub server, first with a
+bare ``requests.post`` per call (a new TCP connection every time) and then
+through the shared pooled session.
+
+Run from the repository root:
+    python benchmarks/bench_transport.py
+"""
+
+import os
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from shared.transport import create_session
+from stub_server import start_stub_server
+
+REQUESTS = 500
+
+PAYLOAD = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": "Explain what a variable is in programming"}]
+}
+
+
+def measure(post, url: str) -> list:
+    """Time REQUESTS calls of post(url, json=...) and return latencies in ms"""
+    latencies = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        response = post(url, json=PAYLOAD, timeout=10)
+        response.json()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def report(name: str, latencies: list):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<28} p50={p50:7.3f} ms   p99={p99:7.3f} ms   mean={statistics.mean(latencies):7.3f} ms")
+    return p50
+
+
+def main():
+    server, base_url = start_stub_server()
+    url = f"{base_url}/api/v1/chat/completions"
+
+    try:
+        print(f"Sending {REQUESTS} requests to {url}\n")
+        fresh = report("requests.post (no pool)", measure(requests.post, url))
+        session = create_session()
+        pooled = report("shared pooled session", measure(session.post, url))
+        print(f"\nLatency saved per request (p50): {fresh - pooled:.3f} ms")
+        print("Against a remote HTTPS endpoint the saving also includes the TLS handshake.")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
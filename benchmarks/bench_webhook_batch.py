@@ -0,0 +1,102 @@
+"""
+Benchmark: Batched send_email Dispatch
+======================================
+A bulk job sends 200 emails from 20 threads. The fake n8n webhook costs
+100 ms per workflow execution plus 5 ms per email. Compares one webhook
+call per email with shared.webhook_batch.WebhookBatcher, which coalesces
+the emails sent within 50 ms into one send_email_batch call.
+
+Runs twice: with unlimited n8n capacity, and with n8n limited to 4
+concurrent executions (closer to a small self-hosted instance).
+
+Also checks that idempotency keys travel as batch metadata, never inside
+the email items (exits 1 otherwise).
+
+Run from the repository root:
+    python benchmarks/bench_webhook_batch.py
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from shared.webhook import WebhookClient
+from shared.webhook_batch import WebhookBatcher
+from stub_server import start_stub_server
+
+EMAILS = 200
+THREADS = 20
+WINDOW = 0.05
+
+
+def send_all(post) -> float:
+    def send(i):
+        result = post({"action": "send_email", "recipient_email": f"user{i}@example.com",
+                       "subject": "Workshop reminder", "message": "The workshop starts at 10am."})
+        assert result["status"] == "success"
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        list(pool.map(send, range(EMAILS)))
+    return time.perf_counter() - start
+
+
+class RecordingClient:
+    """Stands in for WebhookClient: records each payload and its key, answers success"""
+
+    def __init__(self):
+        self.calls = []
+
+    def post(self, payload: dict, idempotency_key: str = None) -> dict:
+        self.calls.append((payload, idempotency_key))
+        items = payload.get("items") or [payload]
+        return {"status": "success", "results": [{"status": "success"} for _ in items]}
+
+
+def check_keys() -> bool:
+    """Keys go in idempotency_keys (batches) or the header (a batch of one), not in the items"""
+    client = RecordingClient()
+    batcher = WebhookBatcher(client, window=WINDOW)
+    keys = ["email-0", None, "email-2"]
+    with ThreadPoolExecutor(max_workers=len(keys)) as pool:
+        list(pool.map(lambda i: batcher.post({"action": "send_email", "recipient_email": f"user{i}@example.com"},
+                                             idempotency_key=keys[i]), range(len(keys))))
+    batcher.post({"action": "send_email", "recipient_email": "solo@example.com"}, idempotency_key="solo")
+
+    (batch, _), (single, single_key) = client.calls
+    sent_keys = dict(zip((item["recipient_email"] for item in batch["items"]), batch["idempotency_keys"]))
+    ok = (all("idempotency_key" not in item for item in batch["items"])
+          and sent_keys == {f"user{i}@example.com": key for i, key in enumerate(keys)}
+          and "idempotency_key" not in single and single_key == "solo")
+    print(f"{'✅' if ok else '❌'} idempotency keys sent as metadata: batch {batch['idempotency_keys']}, "
+          f"single-item header {single_key!r}\n")
+    return ok
+
+
+def main():
+    if not check_keys():
+        sys.exit(1)
+
+    server, base_url = start_stub_server()
+    server.webhook_latency = 0.1
+    server.webhook_item_latency = 0.005
+    client = WebhookClient(f"{base_url}/webhook/personal-assistant", pool_size=THREADS)
+    batcher = WebhookBatcher(client, window=WINDOW)
+    try:
+        print(f"{EMAILS} emails from {THREADS} threads; fake n8n costs 100 ms per execution + 5 ms per email\n")
+        for capacity in [None, 4]:
+            server.webhook_slots = threading.Semaphore(capacity) if capacity else None
+            print(f"n8n capacity: {capacity or 'unlimited'} concurrent executions")
+            for label, post in [("one call per email", client.post),
+                                (f"batched ({WINDOW * 1000:.0f} ms window)", batcher.post)]:
+                server.webhook_log = []
+                seconds = send_all(post)
+                print(f"  {label:<26} {len(server.webhook_log):4} webhook executions   {seconds:5.2f} s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: Webhook Client Against a Fault-Injecting n8n
+=======================================================
+A stand-in n8n webhook that fails on purpose, in three phases:
+
+1. flaky    - 30% of requests get a 503 or a connection dropped after n8n
+               read the request (so it may have run the action)
+2. hung     - n8n accepts requests but never answers
+3. recovered - n8n is healthy again
+
+Compares the old single-attempt requests.post against shared.webhook's
+WebhookClient (retries, read timeout, circuit breaker). Timeouts are
+scaled down so the run takes seconds, not minutes.
+
+The stand-in counts how often it ran each Idempotency-Key: WebhookClient
+only retries failures where n8n cannot have run the action, so no action may
+run twice (exits 1 otherwise). Dropped connections are therefore reported
+as failures, not retried.
+
+Run from the repository root:
+    python benchmarks/bench_webhook_faults.py
+"""
+
+import random
+import sys
+import time
+from collections import Counter
+
+import requests
+
+from script_loader import REPO_ROOT  # noqa: F401  (puts the repo root on sys.path)
+from shared.webhook import CircuitBreaker, WebhookClient, WebhookError
+from stub_server import StubHandler, start_stub_server
+
+FLAKY_CALLS = 100
+FLAKY_FAILURE_RATE = 0.3
+HUNG_CALLS = 10
+HANG_SECONDS = 3
+OLD_TIMEOUT = 1.5       # stands in for the old timeout=30
+RECOVERED_CALLS = 20
+
+
+class FaultyWebhookHandler(StubHandler):
+    """n8n stand-in whose behaviour depends on server.phase"""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        phase = self.server.phase
+        key = self.headers.get("Idempotency-Key")
+
+        if phase == "hung":
+            time.sleep(HANG_SECONDS)
+            self.close_connection = True
+            return
+        if phase == "flaky" and self.server.random.random() < FLAKY_FAILURE_RATE:
+            if self.server.random.random() < 0.5:
+                # Run the action, then drop the connection without answering
+                self.server.runs[key] += 1
+                self.close_connection = True
+                return
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.server.runs[key] += 1
+        self.send_json({"status": "success"})
+
+
+def old_client(url: str):
+    session = requests.Session()
+
+    def post(payload: dict) -> dict:
+        response = session.post(url, json=payload, timeout=OLD_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+    return post
+
+
+def run_phase(server, phase: str, calls: int, post) -> tuple:
+    server.phase = phase
+    successes = 0
+    start = time.perf_counter()
+    for i in range(calls):
+        try:
+            post({"action": "send_email", "recipient_email": f"user{i}@example.com"})
+            successes += 1
+        except (requests.exceptions.RequestException, WebhookError):
+            pass
+    return successes, time.perf_counter() - start
+
+
+def main():
+    server, base_url = start_stub_server(handler=FaultyWebhookHandler)
+    url = f"{base_url}/webhook/personal-assistant"
+    server.runs = Counter()
+    try:
+        client = WebhookClient(url, read_timeout=0.5, backoff_base=0.01,
+                               breaker=CircuitBreaker(failure_threshold=5, reset_timeout=1))
+        clients = [("requests.post", old_client(url)), ("WebhookClient", client.post)]
+
+        print(f"{'phase':<10} {'client':<14} {'succeeded':>10} {'time blocked':>13}")
+        for phase, calls in [("flaky", FLAKY_CALLS), ("hung", HUNG_CALLS), ("recovered", RECOVERED_CALLS)]:
+            if phase == "recovered":
+                # Give the circuit breaker time to let a trial call through
+                time.sleep(client.breaker.reset_timeout)
+            for label, post in clients:
+                server.random = random.Random(42)
+                successes, seconds = run_phase(server, phase, calls, post)
+                print(f"{phase:<10} {label:<14} {successes:>5}/{calls:<4} {seconds:11.2f} s")
+
+        print(f"\nWebhookClient stats: {client.stats}")
+        print(f"Circuit breaker state: {client.breaker.state}")
+    finally:
+        server.shutdown()
+
+    # The old client sends no Idempotency-Key (None); every WebhookClient call has its own
+    twice = sum(1 for key, runs in server.runs.items() if key is not None and runs > 1)
+    print(f"{'✅' if twice == 0 else '❌'} WebhookClient actions n8n ran more than once: {twice}")
+    if twice:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Load Test: FastAPI Chatbot & Agent Service
+==========================================
+Starts the local stub LLM and the API service (day3/api/main.py) in their
+own processes, then drives /chat, /chat/stream and /agent with 1, 8 and 64
+concurrent client workers, each on its own session. Reports requests per
+second and latency percentiles.
+
+Run from the repository root:
+    python benchmarks/load_api.py
+"""
+
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from script_loader import REPO_ROOT
+
+LATENCY = 0.02          # simulated upstream latency per LLM call (seconds)
+DURATION = 5            # seconds per (endpoint, workers) run
+WORKERS = [1, 8, 64]
+ENDPOINTS = ["/chat", "/chat/stream", "/agent"]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"nothing listening on port {port}")
+
+
+def start_processes():
+    stub_port, api_port = free_port(), free_port()
+    env = dict(os.environ)
+    env.update({
+        "OPENROUTER_BASE_URL": f"http://127.0.0.1:{stub_port}/api/v1",
+        "OPENAI_API_KEY": "stub-key",
+        "OPENROUTER_API_KEY": "stub-key",
+    })
+    stub = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "benchmarks", "stub_server.py"),
+         "--port", str(stub_port), "--latency", str(LATENCY)],
+        stdout=subprocess.DEVNULL
+    )
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", os.path.join(REPO_ROOT, "day3", "api"),
+         "--port", str(api_port), "--log-level", "warning"],
+        env=env, stdout=subprocess.DEVNULL
+    )
+    wait_for_port(stub_port)
+    wait_for_port(api_port)
+    return [stub, api], f"http://127.0.0.1:{api_port}"
+
+
+def worker(base_url: str, endpoint: str, session_id: str, deadline: float, latencies: list):
+    session = requests.Session()
+    turn = 0
+    while time.perf_counter() < deadline:
+        turn += 1
+        body = {"session_id": session_id, "message": f"Question {turn}: what is a variable?"}
+        start = time.perf_counter()
+        response = session.post(base_url + endpoint, json=body, timeout=30)
+        response.content  # read the whole body (the full SSE stream for /chat/stream)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+def run(base_url: str, endpoint: str, workers: int):
+    latencies = []
+    deadline = time.perf_counter() + DURATION
+    threads = [
+        threading.Thread(target=worker, args=(base_url, endpoint, f"{endpoint}-{workers}-{i}", deadline, latencies))
+        for i in range(workers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000
+    print(f"{endpoint:<13} workers={workers:<3} rps={len(latencies) / wall:8.1f}   "
+          f"p50={statistics.median(latencies) * 1000:7.1f} ms   p99={p99:7.1f} ms")
+
+
+def main():
+    processes, base_url = start_processes()
+    try:
+        print(f"Stub LLM latency {LATENCY * 1000:.0f} ms, {DURATION}s per run\n")
+        for endpoint in ENDPOINTS:
+            for workers in WORKERS:
+                run(base_url, endpoint, workers)
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
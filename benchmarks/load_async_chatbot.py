@@ -0,0 +1,90 @@
+"""
+Load Test: AsyncSimpleChatbot on One Event Loop
+===============================================
+Runs many conversations concurrently against a local stub completions
+server (started in a separate process so it does not steal client CPU) and
+reports how many concurrent conversations one core can drive.
+
+Run from the repository root:
+    python benchmarks/load_async_chatbot.py
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from script_loader import REPO_ROOT, load_solution
+
+LATENCY = 0.05          # simulated upstream latency per request (seconds)
+TURNS = 3               # turns per conversation
+CONCURRENCY = [10, 100, 500, 1000]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("stub server did not start")
+
+
+async def run_conversation(chatbot_cls):
+    chatbot = chatbot_cls(system_prompt="You are a friendly Python programming tutor.")
+    for turn in range(TURNS):
+        await chatbot.chat(f"Question number {turn}")
+    return len(chatbot.get_history())
+
+
+async def run_level(chatbot_cls, concurrency: int):
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    await asyncio.gather(*(run_conversation(chatbot_cls) for _ in range(concurrency)))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    turns = concurrency * TURNS
+    # Little's law: requests one fully busy core could keep in flight at this latency
+    per_core = turns / cpu * LATENCY if cpu else float("inf")
+    print(f"{concurrency:>6} convs   wall={wall:6.2f}s   turns/s={turns / wall:8.1f}   "
+          f"cpu={cpu / wall * 100:5.1f}%   ~{per_core:6.0f} concurrent convs per core")
+
+
+async def main_async(chatbot_cls):
+    for concurrency in CONCURRENCY:
+        await run_level(chatbot_cls, concurrency)
+
+
+def main():
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "benchmarks", "stub_server.py"),
+         "--port", str(port), "--latency", str(LATENCY)],
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(port)
+        os.environ["OPENROUTER_BASE_URL"] = f"http://127.0.0.1:{port}/api/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "stub-key")
+
+        chatbot_module = load_solution("day1/solutions/03_chatbot_memory_solution.py")
+        print(f"Stub latency {LATENCY * 1000:.0f} ms, {TURNS} turns per conversation\n")
+        asyncio.run(main_async(chatbot_module.AsyncSimpleChatbot))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Offline Benchmark Suite (Regression Gate)
+=========================================
+Drives every chatbot and agent through fixed scenarios against the
+deterministic fake OpenRouter + n8n server (stub_server.py, in its own
+process so it does not share our CPU or tracemalloc):
+
+    simple_chatbot      SimpleChatbot.chat, 30 turns
+    streaming_chatbot   StreamingChatbot.chat_streaming, 30 turns
+    agent_functions     PersonalAssistantAgent (functions API), 10 requests
+    agent_tools         PersonalAssistantAgent (OpenRouter tools API), 10 requests
+    agent_tools_stream  the same agent through chat_stream(), 10 requests
+
+Each agent request makes the model call two webhooks, then answer.
+
+Reports throughput, latency percentiles per operation, and memory (peak and
+retained per operation, from a separate tracemalloc pass).
+
+Each scenario is timed REPEATS times from a fresh setup. Throughput and p50
+are the medians over those passes, so one slow pass (a GC pause, a busy
+machine) does not move them; --compare gates only on these and on peak
+memory. p99 comes from all passes together and is reported, not gated: with
+a few dozen samples it is one or two single requests, and identical code
+moves it by 30% from run to run.
+
+Run from the repository root:
+    python benchmarks/run_suite.py                          # print results
+    python benchmarks/run_suite.py --save baseline.json     # record a baseline
+    python benchmarks/run_suite.py --compare baseline.json  # exit 1 on regressions
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from load_api import free_port, wait_for_port
+from script_loader import REPO_ROOT, load_solution
+from shared.streaming import CallbackSink
+
+LATENCY = 0.02          # fake model latency before the first token
+TOKEN_RATE = 1000       # fake model output speed, chunks per second
+WEBHOOK_LATENCY = 0.05  # fake n8n execution time
+REPLY = " ".join(["Here is a short, deterministic answer from the fake model."] * 5)
+TOOL_CALLS = [
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "book_meeting",
+        "data": {"attendee_email": "john@example.com", "topic": "project update", "preferred_time": "Tuesday 2pm"}}},
+    {"name": "trigger_n8n_webhook", "arguments": {
+        "action": "send_email",
+        "data": {"recipient_email": "sarah@example.com", "subject": "Agenda", "message": "See you Tuesday"}}},
+]
+# Timed passes per scenario (--repeats)
+REPEATS = 5
+# Metrics compared by --compare, and whether higher is better (p99 is too noisy to gate)
+GATED = {"ops_per_sec": True, "p50_ms": False, "peak_kib": False}
+
+
+def start_stub():
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "benchmarks", "stub_server.py"),
+         "--port", str(port), "--latency", str(LATENCY), "--token-rate", str(TOKEN_RATE),
+         "--reply", REPLY, "--tool-calls", json.dumps(TOOL_CALLS),
+         "--webhook-latency", str(WEBHOOK_LATENCY)],
+        stdout=subprocess.DEVNULL
+    )
+    wait_for_port(port)
+    os.environ.update({
+        "OPENROUTER_BASE_URL": f"{base_url}/api/v1",
+        "OPENAI_BASE_URL": f"{base_url}/api/v1",
+        "OPENAI_API_KEY": "stub-key",
+        "OPENROUTER_API_KEY": "stub-key",
+        "N8N_WEBHOOK_URL": f"{base_url}/webhook/personal-assistant",
+    })
+    return process
+
+
+def scenarios() -> dict:
+    """{name: (operations, setup)}; setup() returns a function run(i) for one operation"""
+    chatbot_module = load_solution("day1/solutions/03_chatbot_memory_solution.py")
+    streaming_module = load_solution("day1/bonus/04_streaming_bonus.py")
+    functions_module = load_solution("day3/solutions/personal_assistant_agent_solution.py")
+    tools_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+
+    def simple_chatbot():
+        chatbot = chatbot_module.SimpleChatbot(system_prompt="You are a friendly Python tutor.")
+        return lambda i: chatbot.chat(f"Question {i}: what is a list comprehension?")
+
+    def streaming_chatbot():
+        chatbot = streaming_module.StreamingChatbot()
+        sink = CallbackSink(lambda text: None)
+        return lambda i: chatbot.chat_streaming(f"Question {i}: explain generators", sink=sink)
+
+    def agent(module, streaming=False):
+        def setup():
+            assistant = module.PersonalAssistantAgent()
+            if streaming:
+                return lambda i: "".join(assistant.chat_stream(f"Book the project meeting and email Sarah ({i})"))
+            return lambda i: assistant.chat(f"Book the project meeting and email Sarah ({i})")
+        return setup
+
+    return {
+        "simple_chatbot": (30, simple_chatbot),
+        "streaming_chatbot": (30, streaming_chatbot),
+        "agent_functions": (10, agent(functions_module)),
+        "agent_tools": (10, agent(tools_module)),
+        "agent_tools_stream": (10, agent(tools_module, streaming=True)),
+    }
+
+
+def measure(operations: int, setup, repeats: int = REPEATS) -> dict:
+    # The solutions print every step; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        rates, medians, latencies = [], [], []
+        for _ in range(repeats):
+            run = setup()
+            times = []
+            start = time.perf_counter()
+            for i in range(operations):
+                op_start = time.perf_counter()
+                run(i)
+                times.append(time.perf_counter() - op_start)
+            rates.append(operations / (time.perf_counter() - start))
+            medians.append(statistics.median(times))
+            latencies.extend(times)
+
+        # Separate pass: tracemalloc slows everything down, so it must not touch the timings
+        run = setup()
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for i in range(operations):
+            run(i)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "ops_per_sec": statistics.median(rates),
+        "p50_ms": statistics.median(medians) * 1000,
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)] * 1000,
+        "peak_kib": (peak - baseline) / 1024,
+        "retained_kib_per_op": (current - baseline) / 1024 / operations,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Names of metrics that got worse than the baseline by more than tolerance"""
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        for metric, higher_is_better in GATED.items():
+            old, new = baseline[name][metric], metrics[metric]
+            if not old:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{name}.{metric}: {old:.2f} -> {new:.2f} ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression (default 15%%)")
+    parser.add_argument("--only", nargs="*", help="run only these scenarios")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help=f"timed passes per scenario (default {REPEATS})")
+    args = parser.parse_args()
+
+    stub = start_stub()
+    try:
+        print(f"Fake model: {LATENCY * 1000:.0f} ms latency, {TOKEN_RATE} chunks/s; "
+              f"fake n8n: {WEBHOOK_LATENCY * 1000:.0f} ms\n")
+        print(f"Median of {args.repeats} passes per scenario; p99 over all of them (not gated)\n")
+        print(f"{'scenario':<20} {'ops/s':>7} {'p50 ms':>8} {'p99 ms':>8} {'peak KiB':>9} {'KiB/op kept':>12}")
+        results = {}
+        for name, (operations, setup) in scenarios().items():
+            if args.only and name not in args.only:
+                continue
+            r = results[name] = measure(operations, setup, args.repeats)
+            print(f"{name:<20} {r['ops_per_sec']:7.2f} {r['p50_ms']:8.1f} {r['p99_ms']:8.1f} "
+                  f"{r['peak_kib']:9.1f} {r['retained_kib_per_op']:12.2f}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n❌ Regressions beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Benchmark Imports
+=================
+Puts the repository root on ``sys.path`` so benchmarks can import
+``shared``, and re-exports the solution script loader.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")))
+
+from shared.solutions import REPO_ROOT, load_solution  # noqa: E402,F401
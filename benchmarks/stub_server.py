@@ -0,0 +1,280 @@
+"""
+Local Stub Server for Benchmarks
+================================
+A tiny, deterministic fake of OpenRouter's /api/v1/chat/completions (and of
+the n8n webhook) that runs in a background thread or as its own process.
+Benchmarks point the shared transport at it so nothing leaves the machine
+and no API credits are spent.
+
+- plain and streamed (SSE) replies, with an optional delay per chunk
+- tool calls (tools API) and function_call (functions API), as scripted
+  by ``tool_calls`` or an overridden choose_tool_calls()
+- deterministic usage counts, also on streams with include_usage
+- /webhook/... acts as n8n, including send_email_batch payloads
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_completion(content: str, model: str = "stub-model", tool_calls: list = None,
+                    usage: dict = None, legacy_functions: bool = False) -> dict:
+    """
+    Build a minimal chat completion response body.
+
+    With legacy_functions (a request that sent "functions" rather than
+    "tools") the first tool call is returned as message.function_call.
+    """
+    message = {"role": "assistant", "content": content}
+    finish_reason = "stop"
+    if tool_calls and legacy_functions:
+        call = tool_calls[0]
+        message["function_call"] = {"name": call["name"], "arguments": json.dumps(call["arguments"])}
+        finish_reason = "function_call"
+    elif tool_calls:
+        message["tool_calls"] = [
+            {
+                "id": f"call_{i}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])}
+            }
+            for i, call in enumerate(tool_calls)
+        ]
+        finish_reason = "tool_calls"
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": finish_reason
+            }
+        ],
+        "usage": usage or {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+    }
+
+
+def make_usage(request: dict, completion_tokens: int) -> dict:
+    """Deterministic usage: about 4 characters per prompt token"""
+    prompt_tokens = len(json.dumps(request.get("messages", []))) // 4 + 1
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def make_chunk(content: str = None, finish_reason: str = None, model: str = "stub-model",
+               tool_calls: list = None) -> dict:
+    """Build one streamed chat.completion.chunk (tool_calls: list of tool-call deltas)"""
+    delta = {"content": content} if content is not None else {}
+    if tool_calls:
+        delta["tool_calls"] = tool_calls
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+    }
+
+
+class StubHTTPServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog big enough for load tests"""
+
+    daemon_threads = True
+    request_queue_size = 1024
+    latency = 0.0
+    reply = "Hello from the stub!"
+    # Tool calls ({"name", "arguments"}) to answer every user message with;
+    # once the tool results come back, the stub replies with text
+    tool_calls = None
+    # Seconds per streamed chunk; non-streamed replies wait for all chunks
+    token_delay = 0.0
+    # Extra delay for POSTs to /webhook/... (the fake n8n endpoint): per execution and per item
+    webhook_latency = 0.0
+    webhook_item_latency = 0.0
+    # Optional threading.Semaphore limiting concurrent webhook executions
+    webhook_slots = None
+    # perf_counter() arrival time of every webhook call, for time-to-first-action
+    webhook_log = None
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Answers POSTs with a canned completion (streamed as SSE if asked).
+    POSTs to /webhook/... act as a fake n8n webhook.
+    """
+
+    # HTTP/1.1 so clients can keep the connection alive between requests
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; avoid Nagle + delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        request = json.loads(body) if body else {}
+
+        if self.path.startswith("/webhook"):
+            if self.server.webhook_log is not None:
+                self.server.webhook_log.append(time.perf_counter())
+            items = request.get("items")
+            delay = self.server.webhook_latency + self.server.webhook_item_latency * len(items or [request])
+            if self.server.webhook_slots is not None:
+                # Limited n8n capacity: wait for a free execution slot
+                with self.server.webhook_slots:
+                    time.sleep(delay)
+            elif delay:
+                time.sleep(delay)
+            if items is None:
+                self.send_json({"status": "success", "action": request.get("action")})
+            else:
+                # Batch action: one result per item, like the workflow's batch branch
+                self.send_json({
+                    "status": "success",
+                    "action": request.get("action"),
+                    "results": [{"status": "success", "index": i} for i in range(len(items))]
+                })
+            return
+
+        latency = self.server.latency
+        if latency:
+            time.sleep(latency)
+
+        model = request.get("model", "stub-model")
+        # Only requests that offer tools (or functions) get tool calls back
+        offers_tools = "tools" in request or "functions" in request
+        tool_calls = self.choose_tool_calls(request.get("messages") or [{}]) if offers_tools else None
+        legacy_functions = "functions" in request and "tools" not in request
+        if legacy_functions and tool_calls:
+            # The functions API returns one call per response
+            tool_calls = tool_calls[:1]
+        events = self.reply_events(model, tool_calls)
+        usage = make_usage(request, len(events) - 1)
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage")
+            self.stream_reply(events, usage if include_usage else None)
+            return
+
+        if self.server.token_delay:
+            time.sleep(self.server.token_delay * len(events))
+        content = None if tool_calls else self.server.reply
+        self.send_json(make_completion(content, model, tool_calls=tool_calls, usage=usage,
+                                       legacy_functions=legacy_functions))
+
+    def choose_tool_calls(self, messages: list):
+        """Tool calls to answer with (None for a text reply); override to script an agent"""
+        if messages[-1].get("role") == "user":
+            return self.server.tool_calls
+        return None
+
+    def send_json(self, data: dict):
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def reply_events(self, model: str, tool_calls: list = None) -> list:
+        """
+        The streamed chunks for a reply: the text word by word, or each tool
+        call's id and name followed by its arguments in small fragments.
+        """
+        if not tool_calls:
+            words = self.server.reply.split(" ")
+            tokens = [word if i == 0 else " " + word for i, word in enumerate(words)]
+            events = [make_chunk(token, model=model) for token in tokens]
+            events.append(make_chunk(finish_reason="stop", model=model))
+            return events
+
+        events = []
+        for index, call in enumerate(tool_calls):
+            events.append(make_chunk(model=model, tool_calls=[{
+                "index": index,
+                "id": f"call_{index}",
+                "type": "function",
+                "function": {"name": call["name"], "arguments": ""}
+            }]))
+            arguments = json.dumps(call["arguments"])
+            for start in range(0, len(arguments), 8):
+                events.append(make_chunk(model=model, tool_calls=[{
+                    "index": index,
+                    "function": {"arguments": arguments[start:start + 8]}
+                }]))
+        events.append(make_chunk(finish_reason="tool_calls", model=model))
+        return events
+
+    def stream_reply(self, events: list, usage: dict = None):
+        """
+        Send the chunks as server-sent events (chunked encoding), plus a
+        final usage-only chunk when the request asked for include_usage.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        token_delay = self.server.token_delay
+        for event in events:
+            if token_delay:
+                time.sleep(token_delay)
+            self.write_chunk(f"data: {json.dumps(event)}\n\n".encode())
+        if usage is not None:
+            final = dict(events[-1], choices=[], usage=usage)
+            self.write_chunk(f"data: {json.dumps(final)}\n\n".encode())
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        pass
+
+
+def start_stub_server(latency: float = 0.0, handler=StubHandler):
+    """
+    Start a stub server on a free localhost port.
+
+    Args:
+        latency: Seconds to sleep before answering each request
+        handler: Request handler class to serve with
+
+    Returns:
+        Tuple of (server, base_url). Call server.shutdown() when done.
+    """
+    server = StubHTTPServer(("127.0.0.1", 0), handler)
+    server.latency = latency
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"
+
+
+if __name__ == "__main__":
+    # Run standalone so load tests can keep the server off the client's CPU:
+    #   python benchmarks/stub_server.py --port 8765 --latency 0.05
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each reply starts")
+    parser.add_argument("--token-rate", type=float, default=0.0, help="streamed chunks per second (0 = no limit)")
+    parser.add_argument("--reply", default=StubHTTPServer.reply, help="text of every reply")
+    parser.add_argument("--tool-calls", help='JSON list of {"name", "arguments"} to answer user messages with')
+    parser.add_argument("--webhook-latency", type=float, default=0.0, help="seconds per fake n8n execution")
+    args = parser.parse_args()
+
+    server = StubHTTPServer(("127.0.0.1", args.port), StubHandler)
+    server.latency = args.latency
+    server.token_delay = 1 / args.token_rate if args.token_rate else 0.0
+    server.reply = args.reply
+    server.tool_calls = json.loads(args.tool_calls) if args.tool_calls else None
+    server.webhook_latency = args.webhook_latency
+    print(f"Stub server on http://127.0.0.1:{args.port} (latency {args.latency}s)")
+    server.serve_forever()
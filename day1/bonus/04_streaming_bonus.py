@@ -8,65 +8,151 @@ This creates a better user experience for longer responses.
 
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+import sys
+
+# Make the shared/ package at the repository root importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.session_store import SessionStore
+from shared.messages import Message, to_wire
+from shared.streaming import StdoutSink
+from shared.metrics import get_metrics
 
 load_dotenv()
 
 class StreamingChatbot:
     """A chatbot that streams responses in real-time"""
     
-    def __init__(self, system_prompt="You are a helpful assistant."):
+    def __init__(self, system_prompt="You are a helpful assistant.", session=None):
         self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.async_client = None    # created on first astream()
         self.model = "gpt-4o-mini"
         self.conversation_history = [
-            {"role": "system", "content": system_prompt}
+            Message("system", system_prompt)
         ]
+        
+        # Optional StoredSession: resume the stored conversation and save each turn
+        self.session = session
+        if session is not None:
+            self.conversation_history = session.load() or self.conversation_history
+            session.sync(self.conversation_history)
     
-    def chat_streaming(self, user_message):
-        """Send a message and stream the response"""
+    def stream(self, user_message):
+        """
+        Send a message and yield the response piece by piece as it arrives.
         
+        Use this to consume tokens yourself (a web page, a GUI, a file)
+        instead of printing them.
+        """
         # Add user message to history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
-        
-        # Create streaming request (note: stream=True)
-        stream = self.client.chat.completions.create(
-            model=self.model,
-            messages=self.conversation_history,
-            stream=True  # Enable streaming!
-        )
-        
-        # Collect the full response while streaming
-        full_response = ""
+        self.conversation_history.append(Message("user", user_message))
         
-        print("Chatbot: ", end="", flush=True)
-        
-        # Process each chunk as it arrives
-        for chunk in stream:
-            # Extract content from chunk
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
-                full_response += content
-                print(content, end="", flush=True)
+        # Collect the pieces and join once at the end: `full_response += content`
+        # would copy the whole response again for every token
+        parts = []
+        try:
+            # Records time to first token, gaps between tokens and token counts
+            with get_metrics().track("streaming_chatbot") as timer:
+                # Create streaming request (note: stream=True)
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=to_wire(self.conversation_history),
+                    stream=True,  # Enable streaming!
+                    stream_options={"include_usage": True}  # token counts in the last chunk
+                )
+                timer.headers()
+                
+                for chunk in stream:
+                    # Extract content from chunk
+                    if chunk.choices and chunk.choices[0].delta.content is not None:
+                        content = chunk.choices[0].delta.content
+                        timer.token()
+                        parts.append(content)
+                        yield content
+                    elif chunk.usage is not None:
+                        timer.usage(chunk.usage)
+        finally:
+            # Runs even if the caller stops early, so history keeps what was shown
+            self.finish_turn(parts)
+    
+    async def astream(self, user_message):
+        """Async version of stream(): `async for token in chatbot.astream(...)`"""
+        if self.async_client is None:
+            self.async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.conversation_history.append(Message("user", user_message))
         
-        print()  # New line after response
+        parts = []
+        try:
+            with get_metrics().track("streaming_chatbot") as timer:
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=to_wire(self.conversation_history),
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                timer.headers()
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content is not None:
+                        timer.token()
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+                    elif chunk.usage is not None:
+                        timer.usage(chunk.usage)
+        finally:
+            self.finish_turn(parts)
+    
+    def chat_streaming(self, user_message, sink=None):
+        """
+        Send a message and stream the response to a sink.
         
-        # Add complete response to history
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": full_response
-        })
+        Args:
+            user_message: The user's message
+            sink: Where tokens go (default: StdoutSink, which prints them in
+                small batches instead of one write per token)
         
-        return full_response
-
+        Returns:
+            The full response
+        """
+        sink = sink or StdoutSink()
+        sink.write("Chatbot: ")
+        parts = []
+        try:
+            for content in self.stream(user_message):
+                parts.append(content)
+                sink.write(content)
+            sink.write("\n")  # New line after response
+        finally:
+            sink.close()
+        return "".join(parts)
+    
+    def finish_turn(self, parts):
+        """
+        Save what was streamed, even if the stream stopped early. If nothing
+        arrived (the request failed), drop the unanswered user message
+        instead of saving an empty reply.
+        """
+        if parts:
+            self.save_response("".join(parts))
+        else:
+            self.conversation_history.pop()
+    
+    def save_response(self, full_response):
+        """Add the complete response to history (and the session, if any)"""
+        self.conversation_history.append(Message("assistant", full_response))
+        if self.session is not None:
+            self.session.sync(self.conversation_history)
 
 def main():
     """Run the streaming chatbot"""
     
+    # Optional: set CHAT_SESSION_DB=sessions.db to keep the conversation across restarts
+    session = None
+    if os.getenv("CHAT_SESSION_DB"):
+        session = SessionStore(os.getenv("CHAT_SESSION_DB")).open("streaming")
+    
     chatbot = StreamingChatbot(
-        system_prompt="You are a helpful assistant who explains things clearly."
+        system_prompt="You are a helpful assistant who explains things clearly.",
+        session=session
     )
     
     print("Streaming Chatbot Ready! Watch responses appear in real-time.")
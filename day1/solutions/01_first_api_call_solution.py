@@ -7,8 +7,12 @@ This is the complete solution for making your first API call.
 import os
 from dotenv import load_dotenv
 from openai import OpenAI
-import requests
-import json
+import sys
+
+# Make the shared/ package at the repository root importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.transport import chat_completion
+from shared.metrics import get_metrics
 
 # Load environment variables from .env file
 load_dotenv()
@@ -38,32 +42,35 @@ def first_api_call():
     #     ]
     # )
 
-    response = requests.post(
-    url="https://openrouter.ai/api/v1/chat/completions",
-    headers={
-        "Authorization": f"Bearer {api_key}",
-    },
-    data=json.dumps({
+    # Reuses a pooled keep-alive connection instead of a fresh handshake
+    response = chat_completion({
         "model": "openai/gpt-4o-mini-2024-07-18", # Optional
         "messages": [
-        {
-            "role": "user",
-            "content": "Say hello and introduce yourself in one sentence!"
-        }
+            {
+                "role": "user",
+                "content": "Say hello and introduce yourself in one sentence!"
+            }
         ]
-    })
-    )
+    }, api_key=api_key)
     
     # Extract and print the response
     #ai_message = response.choices[0].message.content
-    ai_message = response.json()["choices"][0]["message"]["content"]
+    ai_message = response["choices"][0]["message"]["content"]
     print("AI Response:", ai_message)
     
     # Bonus: Print some metadata
     #print(f"\nTokens used: {response.usage.total_tokens}")
-    print(f"\nTokens used: {response.json()['usage']['total_tokens']}")
+    print(f"\nTokens used: {response['usage']['total_tokens']}")
     #print(f"Model: {response.model}")
-    print(f"Model: {response.json()['model']}")
+    print(f"Model: {response['model']}")
+    
+    # Where the time went (recorded by chat_completion for every call)
+    timing = get_metrics().last
+    if timing is not None and timing['time_to_headers'] is not None:
+        print(f"Latency: {timing['total'] * 1000:.0f} ms "
+              f"({timing['time_to_headers'] * 1000:.0f} ms until the response headers)")
+    elif timing is not None:
+        print(f"Latency: {timing['total'] * 1000:.0f} ms")
 
 
 if __name__ == "__main__":
@@ -7,11 +7,67 @@ Different techniques to improve prompt quality and control outputs.
 import os
 from dotenv import load_dotenv
 from openai import OpenAI
-import requests
-import json
+import sys
+
+# Make the shared/ package at the repository root importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.transport import chat_completion
+from shared.batch import run_experiments
+from shared.cache import get_default_cache
 
 load_dotenv()
 
+# Request bodies for each experiment, shared by the single-run functions
+# and by run_all_experiments()
+BASIC_PROMPT = {
+    "model": "gpt-4o-mini",
+    "messages": [
+        {"role": "user", "content": "Explain what a variable is in programming"}
+    ]
+}
+
+CONTEXT_PROMPT = {
+    "model": "gpt-4o-mini",
+    "messages": [
+        {"role": "system", "content": "You are a friendly teacher explaining programming concepts to beginners. Use simple language and real-world analogies."},
+        {"role": "user", "content": "Explain what a variable is in programming"}
+    ]
+}
+
+FEW_SHOT_PROMPT = {
+    "model": "gpt-4o-mini",
+    "messages": [
+        {"role": "system", "content": "You explain programming concepts using creative analogies."},
+        {"role": "user", "content": "What is a function?"},
+        {"role": "assistant", "content": "A function is like a recipe in a cookbook. You give it ingredients (inputs), it follows a set of instructions, and produces a dish (output). Just like you can use the same recipe multiple times with different ingredients, you can call a function multiple times with different inputs."},
+        {"role": "user", "content": "What is a loop?"}
+    ]
+}
+
+SCI_FI_PROMPT = "Write a creative opening line for a sci-fi story"
+
+# Low temperature (more deterministic, focused)
+LOW_TEMPERATURE_PROMPT = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": SCI_FI_PROMPT}],
+    "temperature": 0.2
+}
+
+# High temperature (more creative, random)
+HIGH_TEMPERATURE_PROMPT = {
+    "model": "gpt-4o-mini",
+    "messages": [{"role": "user", "content": SCI_FI_PROMPT}],
+    "temperature": 1.5
+}
+
+STRUCTURED_PROMPT = {
+    "model": "gpt-4o-mini",
+    "messages": [
+        {"role": "system", "content": "You provide responses in JSON format."},
+        {"role": "user", "content": "List 3 benefits of using functions in programming. Format as JSON with 'benefits' array."}
+    ]
+}
+
 def basic_prompt():
     """Basic prompt without much context"""
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
@@ -22,19 +78,8 @@ def basic_prompt():
     #         {"role": "user", "content": "Explain what a variable is in programming"}
     #     ]
     # )
-    response = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-        },
-        data=json.dumps({
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "user", "content": "Explain what a variable is in programming"}
-            ]
-        })
-    )
-    response = response.json()["choices"][0]["message"]["content"]    
+    response = chat_completion(BASIC_PROMPT)
+    response = response["choices"][0]["message"]["content"]    
     print("=== Basic Prompt ===")
     print(response)
     print("\n")
@@ -51,21 +96,9 @@ def prompt_with_context():
     #         {"role": "user", "content": "Explain what a variable is in programming"}
     #     ]
     # )
-    response = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-        },
-        data=json.dumps({
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "system", "content": "You are a friendly teacher explaining programming concepts to beginners. Use simple language and real-world analogies."},
-                {"role": "user", "content": "Explain what a variable is in programming"}
-            ]
-        })
-    )
+    response = chat_completion(CONTEXT_PROMPT)
     print("=== Prompt with Context ===")
-    print(response.json()["choices"][0]["message"]["content"])
+    print(response["choices"][0]["message"]["content"])
     print("\n")
 
 
@@ -83,23 +116,9 @@ def prompt_with_examples():
     #     ]
     # )
     
-    response = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-        },
-        data=json.dumps({
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "system", "content": "You explain programming concepts using creative analogies."},
-                {"role": "user", "content": "What is a function?"},
-                {"role": "assistant", "content": "A function is like a recipe in a cookbook. You give it ingredients (inputs), it follows a set of instructions, and produces a dish (output). Just like you can use the same recipe multiple times with different ingredients, you can call a function multiple times with different inputs."},
-                {"role": "user", "content": "What is a loop?"}
-            ]
-        })
-    )
+    response = chat_completion(FEW_SHOT_PROMPT)
     print("=== Prompt with Examples (Few-shot) ===")
-    print(response.json()["choices"][0]["message"]["content"])
+    print(response["choices"][0]["message"]["content"])
     print("\n")
 
 
@@ -107,49 +126,27 @@ def temperature_experiment():
     """Experiment with temperature parameter"""
     client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
     
-    prompt = "Write a creative opening line for a sci-fi story"
-    
     # Low temperature (more deterministic, focused)
     # response_low = client.chat.completions.create(
     #     model="gpt-4o-mini",
-    #     messages=[{"role": "user", "content": prompt}],
+    #     messages=[{"role": "user", "content": SCI_FI_PROMPT}],
     #     temperature=0.2
     # )
     
     # # High temperature (more creative, random)
     # response_high = client.chat.completions.create(
     #     model="gpt-4o-mini",
-    #     messages=[{"role": "user", "content": prompt}],
+    #     messages=[{"role": "user", "content": SCI_FI_PROMPT}],
     #     temperature=1.5
     # )
 
-    response_low = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-        },
-        data=json.dumps({
-            "model": "gpt-4o-mini",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2
-        })
-    )
-    response_high = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-        },
-        data=json.dumps({
-            "model": "gpt-4o-mini",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 1.5
-        })
-    )
+    response_low = chat_completion(LOW_TEMPERATURE_PROMPT)
+    response_high = chat_completion(HIGH_TEMPERATURE_PROMPT)
     print("=== Temperature Experiment ===")
     print("Low temperature (0.2) - More focused:")
-    print(response_low.json()["choices"][0]["message"]["content"])
+    print(response_low["choices"][0]["message"]["content"])
     print("\nHigh temperature (1.5) - More creative:")
-    print(response_high.json()["choices"][0]["message"]["content"])
+    print(response_high["choices"][0]["message"]["content"])
     print("\n")
 
 
@@ -165,29 +162,38 @@ def structured_output_example():
     #     ]
     # )
 
-    response = requests.post(
-        url="https://openrouter.ai/api/v1/chat/completions",
-        headers={
-            "Authorization": f"Bearer {os.getenv('OPENAI_API_KEY')}",
-        },
-        data=json.dumps({
-            "model": "gpt-4o-mini",
-            "messages": [
-                {"role": "system", "content": "You provide responses in JSON format."},
-                {"role": "user", "content": "List 3 benefits of using functions in programming. Format as JSON with 'benefits' array."}
-            ]
-        })
-    )
+    response = chat_completion(STRUCTURED_PROMPT)
     print("=== Structured Output ===")
-    print(response.json()["choices"][0]["message"]["content"])
+    print(response["choices"][0]["message"]["content"])
     print("\n")
 
 
+def run_all_experiments():
+    """Run every experiment concurrently and print the results in order"""
+    experiments = [
+        ("Basic Prompt", BASIC_PROMPT),
+        ("Prompt with Context", CONTEXT_PROMPT),
+        ("Prompt with Examples (Few-shot)", FEW_SHOT_PROMPT),
+        ("Temperature Experiment: Low temperature (0.2) - More focused", LOW_TEMPERATURE_PROMPT),
+        ("Temperature Experiment: High temperature (1.5) - More creative", HIGH_TEMPERATURE_PROMPT),
+        ("Structured Output", STRUCTURED_PROMPT),
+    ]
+    
+    # All six calls are in flight at once, so this takes about as long as the slowest one
+    results = run_experiments([variant for _, variant in experiments])
+    
+    for (title, _), result in zip(experiments, results):
+        print(f"=== {title} ===")
+        print(result.get("content") or f"Error: {result['error']}")
+        print("\n")
+    
+    # Set COMPLETION_CACHE=memory to serve repeated low-temperature prompts from a cache
+    cache = get_default_cache()
+    if cache is not None:
+        print(f"Cache stats: {cache.stats}")
+
+
 if __name__ == "__main__":
     print("Running prompt engineering examples...\n")
-    basic_prompt()
-    prompt_with_context()
-    prompt_with_examples()
-    temperature_experiment()
-    structured_output_example()
+    run_all_experiments()
 
@@ -7,33 +7,91 @@ A complete chatbot implementation with conversation memory.
 import os
 from dotenv import load_dotenv
 from openai import OpenAI
-import requests
-import json
+import sys
+
+# Make the shared/ package at the repository root importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.transport import chat_completion
+from shared.async_client import async_chat_completion, async_chat_completion_stream
+from shared.memory import SummarizingMemory
+from shared.session_store import SessionStore
+from shared.messages import Message, to_wire
 
 load_dotenv()
 
 class SimpleChatbot:
     """A simple chatbot with conversation memory"""
     
-    def __init__(self, system_prompt="You are a helpful assistant."):
-        """Initialize the chatbot with a system prompt"""
+    def __init__(self, system_prompt="You are a helpful assistant.", memory=None, session=None,
+                 semantic_cache=None):
+        """
+        Initialize the chatbot with a system prompt.
+        
+        memory is an optional policy (SlidingWindowMemory or SummarizingMemory
+        from shared.memory) that keeps the history bounded; without it
+        history grows forever.
+        
+        session is an optional StoredSession (SessionStore(...).open(id) from
+        shared.session_store). History is loaded from it and saved after
+        every turn, so the conversation survives a restart.
+        
+        semantic_cache is an optional SemanticCache (shared.semantic_cache).
+        Near-duplicates of questions answered before are answered from it
+        without calling the API.
+        """
         # self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.model = "gpt-4o-mini"
         self.api_key = os.getenv("OPENAI_API_KEY")
         
         # Initialize conversation history with system message
         self.conversation_history = [
-            {"role": "system", "content": system_prompt}
+            Message("system", system_prompt)
         ]
+        self.system_prompt = system_prompt
+        self.memory = memory
+        self.semantic_cache = semantic_cache
+        
+        # Resume a stored conversation, or start storing this one
+        self.session = session
+        if session is not None:
+            self.conversation_history = session.load() or self.conversation_history
+            session.sync(self.conversation_history)
+    
+    def apply_memory(self):
+        """Trim the history with the memory policy, if one is set"""
+        if self.memory is not None:
+            self.conversation_history = self.memory.apply(self.conversation_history)
+    
+    def save_history(self):
+        """Persist new messages to the session store, if one is set"""
+        if self.session is not None:
+            self.session.sync(self.conversation_history)
+    
+    def cache_namespace(self):
+        """Semantic cache namespace: the system prompt plus the turns before the latest message"""
+        return self.semantic_cache.context_namespace(self.system_prompt, self.conversation_history[:-1])
+    
+    def cached_answer(self, user_message):
+        """Return the cached answer to a near-duplicate question, or None"""
+        if self.semantic_cache is None:
+            return None
+        # A follow-up ("give me an example") only matches in the same conversation context
+        hit = self.semantic_cache.lookup(user_message, namespace=self.cache_namespace())
+        return hit[0] if hit else None
+    
+    def remember_answer(self, user_message, assistant_message):
+        """Add a fresh answer to the semantic cache, if one is set"""
+        if self.semantic_cache is not None:
+            self.semantic_cache.insert(user_message, assistant_message, namespace=self.cache_namespace())
     
     def chat(self, user_message):
         """Send a message and get a response"""
         
         # Add user message to conversation history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
+        self.conversation_history.append(Message("user", user_message))
+        
+        # Keep the request inside the token budget
+        self.apply_memory()
         
         # Send conversation history to API
         # response = self.client.chat.completions.create(
@@ -41,24 +99,20 @@ class SimpleChatbot:
         #     messages=self.conversation_history
         # )
         
-        response = requests.post(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {self.api_key}",
-            },
-            data=json.dumps({
+        # A near-duplicate of an earlier question needs no API call
+        assistant_message = self.cached_answer(user_message)
+        if assistant_message is None:
+            response = chat_completion({
                 "model": self.model,
-                "messages": self.conversation_history
-            })
-        )
-        # Extract assistant's response
-        assistant_message = response.json()["choices"][0]["message"]["content"]
+                "messages": to_wire(self.conversation_history)
+            }, api_key=self.api_key)
+            # Extract assistant's response
+            assistant_message = response["choices"][0]["message"]["content"]
+            self.remember_answer(user_message, assistant_message)
         
         # Add assistant's response to conversation history
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": assistant_message
-        })
+        self.conversation_history.append(Message("assistant", assistant_message))
+        self.save_history()
         
         return assistant_message
     
@@ -73,14 +127,77 @@ class SimpleChatbot:
             self.conversation_history = [system_msg]
         else:
             self.conversation_history = []
+        
+        if self.session is not None:
+            self.session.clear()
+            self.save_history()
+
+
+class AsyncSimpleChatbot(SimpleChatbot):
+    """
+    Same chatbot, but chat() is a coroutine.
+
+    While one conversation waits for the API, the event loop serves the
+    others, so a single process can drive thousands of conversations.
+    """
+    
+    async def chat(self, user_message):
+        """Send a message and await the response"""
+        self.conversation_history.append(Message("user", user_message))
+        self.apply_memory()
+        
+        assistant_message = self.cached_answer(user_message)
+        if assistant_message is None:
+            response = await async_chat_completion({
+                "model": self.model,
+                "messages": to_wire(self.conversation_history)
+            }, api_key=self.api_key)
+            assistant_message = response["choices"][0]["message"]["content"]
+            self.remember_answer(user_message, assistant_message)
+        
+        self.conversation_history.append(Message("assistant", assistant_message))
+        self.save_history()
+        
+        return assistant_message
+    
+    async def chat_stream(self, user_message):
+        """Send a message and yield the response piece by piece as it arrives"""
+        self.conversation_history.append(Message("user", user_message))
+        self.apply_memory()
+        
+        assistant_message = self.cached_answer(user_message)
+        if assistant_message is not None:
+            yield assistant_message
+        else:
+            # Collect the pieces and join once at the end (no repeated string copies)
+            parts = []
+            async for piece in async_chat_completion_stream({
+                "model": self.model,
+                "messages": to_wire(self.conversation_history)
+            }, api_key=self.api_key):
+                parts.append(piece)
+                yield piece
+            assistant_message = "".join(parts)
+            self.remember_answer(user_message, assistant_message)
+        
+        self.conversation_history.append(Message("assistant", assistant_message))
+        self.save_history()
 
 
 def main():
     """Run the chatbot in a loop"""
     
+    # Optional: set CHAT_SESSION_DB=sessions.db to keep the conversation across restarts
+    session = None
+    if os.getenv("CHAT_SESSION_DB"):
+        session = SessionStore(os.getenv("CHAT_SESSION_DB")).open("tutor")
+    
     # Create a chatbot with a custom personality
     chatbot = SimpleChatbot(
-        system_prompt="You are a friendly Python programming tutor. Keep responses concise and encouraging."
+        system_prompt="You are a friendly Python programming tutor. Keep responses concise and encouraging.",
+        # Long tutoring sessions: fold old turns into a summary in the background
+        memory=SummarizingMemory(max_turns=20, summarize_turns=10),
+        session=session
     )
     
     print("Chatbot: Hello! I'm your Python tutor. Ask me anything about Python!")
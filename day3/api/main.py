@@ -0,0 +1,190 @@
+"""
+Chatbot & Agent API - Production Service
+========================================
+An async FastAPI app that serves the Day 1 chatbot and the Day 3 personal
+assistant agent over HTTP, with one conversation per session_id.
+
+Run:
+    cd day3/api
+    uvicorn main:app --workers 1
+
+Conversations live in the worker's memory, so run ONE worker per session
+space: with several workers, requests for the same session_id would land
+on different workers and see different histories. The app is async, so
+one worker already serves many sessions at once; to scale out, run more
+instances behind a proxy that routes each session_id to the same one.
+
+Endpoints:
+    POST /chat         {"session_id": "...", "message": "..."} -> {"session_id", "reply"}
+    POST /chat/stream  same body, reply streamed as server-sent events
+    POST /agent        {"session_id": "...", "message": "..."} -> {"session_id", "reply"}
+    GET  /health
+    GET  /metrics      LLM latency (TTFT, inter-token, total) and token counts, Prometheus text
+"""
+
+import asyncio
+import json
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+# Make the shared/ package at the repository root importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.memory import SlidingWindowMemory
+from shared.metrics import get_metrics
+from shared.session_store import SessionStore
+from shared.solutions import load_solution
+
+load_dotenv()
+
+chatbot_module = load_solution("day1/solutions/03_chatbot_memory_solution.py")
+agent_module = load_solution("day3/solutions/personal_assistant_agent_solution_openrouter.py")
+
+SYSTEM_PROMPT = os.getenv(
+    "CHAT_SYSTEM_PROMPT",
+    "You are a friendly Python programming tutor. Keep responses concise and encouraging."
+)
+
+# Sessions kept in RAM; the least recently used are dropped beyond this
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", 10_000))
+
+# Token budget per chat request, so long sessions do not slow down
+CHAT_MEMORY_TOKENS = int(os.getenv("CHAT_MEMORY_TOKENS", 4000))
+
+# Token budget per agent request, tool calls and results included
+AGENT_MEMORY_TOKENS = int(os.getenv("AGENT_MEMORY_TOKENS", 4000))
+
+# Tool calls running at once across all agent sessions
+AGENT_TOOL_WORKERS = int(os.getenv("AGENT_TOOL_WORKERS", 64))
+
+
+class ChatRequest(BaseModel):
+    session_id: str
+    message: str
+
+
+class ChatResponse(BaseModel):
+    session_id: str
+    reply: str
+
+
+class SessionPool:
+    """
+    Per-session state: one conversation object and one lock per session_id.
+
+    The lock keeps two requests for the same session from interleaving their
+    turns; different sessions never wait on each other.
+    """
+
+    def __init__(self, factory, max_sessions: int = MAX_SESSIONS):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()     # session_id -> [conversation, asyncio.Lock, requests using it]
+
+    @asynccontextmanager
+    async def use(self, session_id: str):
+        """Hold the session's lock for one turn: `async with pool.use(id) as conversation:`"""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            # Built in a worker thread, so a slow factory never holds up other sessions
+            conversation = await asyncio.get_running_loop().run_in_executor(None, self.factory, session_id)
+            # Another request may have created the session while this one was being built
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = self._sessions[session_id] = [conversation, asyncio.Lock(), 0]
+        self._sessions.move_to_end(session_id)
+        # Counted before the lock is awaited, so a session with a waiting request is not evicted either
+        entry[2] += 1
+        self.evict()
+        try:
+            async with entry[1]:
+                yield entry[0]
+        finally:
+            entry[2] -= 1
+
+    def evict(self):
+        """Drop the least recently used sessions beyond max_sessions, skipping any in use"""
+        excess = len(self._sessions) - self.max_sessions
+        if excess <= 0:
+            return
+        idle = [session_id for session_id, entry in self._sessions.items() if entry[2] == 0][:excess]
+        for session_id in idle:
+            del self._sessions[session_id]
+
+
+# Optional: CHAT_SESSION_DB=sessions.db keeps chat sessions across restarts
+store = SessionStore(os.getenv("CHAT_SESSION_DB")) if os.getenv("CHAT_SESSION_DB") else None
+
+
+def new_chatbot(session_id: str):
+    return chatbot_module.AsyncSimpleChatbot(
+        system_prompt=SYSTEM_PROMPT,
+        memory=SlidingWindowMemory(max_tokens=CHAT_MEMORY_TOKENS),
+        session=store.open(session_id) if store is not None else None
+    )
+
+
+# One LLM router (with its HTTP client) and one tool thread pool for every agent session
+agent_router = agent_module.build_router()
+agent_tools = ThreadPoolExecutor(max_workers=AGENT_TOOL_WORKERS, thread_name_prefix="tool")
+
+
+def new_agent(session_id: str):
+    return agent_module.PersonalAssistantAgent(
+        router=agent_router,
+        memory=SlidingWindowMemory(max_tokens=AGENT_MEMORY_TOKENS),
+        tool_executor=agent_tools
+    )
+
+
+chatbots = SessionPool(new_chatbot)
+agents = SessionPool(new_agent)
+
+app = FastAPI(title="Workshop Chatbot & Agent API")
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Metrics of the LLM calls made by this worker process"""
+    return get_metrics().prometheus_text()
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatRequest):
+    """One chatbot turn; the upstream call is awaited, never blocking other requests"""
+    async with chatbots.use(request.session_id) as chatbot:
+        reply = await chatbot.chat(request.message)
+    return ChatResponse(session_id=request.session_id, reply=reply)
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """One chatbot turn streamed as server-sent events, ending with `data: [DONE]`"""
+    async def events():
+        async with chatbots.use(request.session_id) as chatbot:
+            async for piece in chatbot.chat_stream(request.message):
+                yield f"data: {json.dumps({'token': piece})}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.post("/agent", response_model=ChatResponse)
+async def agent(request: ChatRequest):
+    """One agent turn. The agent is synchronous, so it runs in the thread pool."""
+    async with agents.use(request.session_id) as assistant:
+        reply = await run_in_threadpool(assistant.chat, request.message)
+    return ChatResponse(session_id=request.session_id, reply=reply)
@@ -6,66 +6,43 @@ Complete solution for the personal assistant agent that integrates with n8n.
 
 import os
 import json
-import requests
+import sys
 from dotenv import load_dotenv
-from openai import OpenAI
 
-load_dotenv()
-
-# n8n webhook URL - configure this after setting up n8n workflow
-N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL", "https://your-n8n-instance.com/webhook/personal-assistant")
+# Make the shared/ package at the repository root importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.messages import Message, ToolCall
+from shared.cache import get_default_cache
+from shared.prompt_prefix import PromptPrefixRequest
+from shared.providers import router_or_default
+from shared.assistant_tools import build_assistant_tools
+from shared.intent_router import IntentRouter
+# Delivers actions to n8n: webhook client, optional queue and batcher, built on first use
+from shared.n8n import trigger_n8n_webhook
 
+load_dotenv()
 
-def trigger_n8n_webhook(action: str, data: dict) -> str:
-    """
-    Trigger an n8n workflow via webhook.
-    
-    Args:
-        action: The action type ("book_meeting" or "send_email")
-        data: Structured data for the action
-    
-    Returns:
-        JSON string with the result from n8n
-    """
-    try:
-        # Combine action and data into flat payload
-        payload = {
-            "action": action,
-            **data  # Spread data fields at top level
-        }
-        
-        print(f"📤 Sending to n8n: {json.dumps(payload, indent=2)}")
-        
-        response = requests.post(
-            N8N_WEBHOOK_URL,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
-        response.raise_for_status()
-        result = response.json()
-        print(f"📥 Response from n8n: {json.dumps(result, indent=2)}")
-        return json.dumps(result)
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Failed to call n8n: {str(e)}"
-        print(f"❌ Error: {error_msg}")
-        return json.dumps({"status": "error", "message": error_msg})
-    except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Error: {error_msg}")
-        return json.dumps({"status": "error", "message": error_msg})
+# The agent's tools, with schemas generated once from their type hints and docstrings
+# (shared/assistant_tools.py); calls are dispatched by name with one dict lookup
+tool_registry = build_assistant_tools(trigger_n8n_webhook)
 
 
 class PersonalAssistantAgent:
     """An AI agent that can book meetings and send emails via n8n"""
     
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.model = "gpt-4o-mini"
+        # OpenAI (OPENAI_BASE_URL if set); with LLM_BACKENDS set, each request goes to the
+        # fastest healthy backend instead (shared/providers.py)
+        self.router = router_or_default("openai", os.getenv("OPENAI_BASE_URL"), os.getenv("OPENAI_API_KEY"), self.model)
+        # Opt-in response cache for low-temperature requests (COMPLETION_CACHE in .env)
+        self.cache = get_default_cache()
+        
+        # Fills extract_* details locally when a request is complete (None to always ask the LLM)
+        self.intent_router = IntentRouter()
+        
         self.conversation_history = [
-            {
-                "role": "system",
-                "content": """You are a helpful personal assistant that can book meetings and send emails.
+            Message("system", """You are a helpful personal assistant that can book meetings and send emails.
                 
 When users ask to book a meeting:
 - Extract: attendee name, email, topic/subject, preferred time, duration
@@ -81,130 +58,79 @@ When users ask to send an email:
 - IMPORTANT: When calling trigger_n8n_webhook, the 'data' parameter must be a flat object containing all email details:
   Example: {"action": "send_email", "data": {"recipient_email": "sarah@example.com", "subject": "Meeting tomorrow", "message": "Don't forget our meeting at 2pm"}}
 
-Be friendly, ask for missing information clearly, and confirm actions before executing."""
-            }
+Be friendly, ask for missing information clearly, and confirm actions before executing.""")
         ]
         
-        # Define functions for the agent
-        self.functions = [
-            {
-                "name": "extract_meeting_intent",
-                "description": "Extract meeting booking details from user query. Use this when user wants to schedule or book a meeting.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "attendee_name": {
-                            "type": "string",
-                            "description": "Name of the person to meet with"
-                        },
-                        "attendee_email": {
-                            "type": "string",
-                            "description": "Email address of the attendee"
-                        },
-                        "topic": {
-                            "type": "string",
-                            "description": "Subject or topic of the meeting"
-                        },
-                        "preferred_time": {
-                            "type": "string",
-                            "description": "Preferred time for the meeting (e.g., 'Tuesday 2pm', 'next week Monday', 'tomorrow at 3pm'). Leave as null if not specified."
-                        },
-                        "duration_minutes": {
-                            "type": "integer",
-                            "description": "Duration of the meeting in minutes. Default to 30 if not specified.",
-                            "default": 30
-                        }
-                    },
-                    "required": ["attendee_email", "topic"]
-                }
-            },
-            {
-                "name": "extract_email_intent",
-                "description": "Extract email sending details from user query. Use this when user wants to send an email.",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "recipient_email": {
-                            "type": "string",
-                            "description": "Email address of the recipient"
-                        },
-                        "subject": {
-                            "type": "string",
-                            "description": "Subject line of the email"
-                        },
-                        "message": {
-                            "type": "string",
-                            "description": "Body/content of the email message"
-                        }
-                    },
-                    "required": ["recipient_email", "subject", "message"]
-                }
-            },
-            {
-                "name": "trigger_n8n_webhook",
-                "description": "Trigger an n8n automation workflow to execute an action (book meeting or send email). Use this after extracting all required information. IMPORTANT: The 'data' parameter must contain all the meeting or email details as a flat object (not nested).",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "action": {
-                            "type": "string",
-                            "enum": ["book_meeting", "send_email"],
-                            "description": "The action to perform: 'book_meeting' or 'send_email'"
-                        },
-                        "data": {
-                            "type": "object",
-                            "description": "Structured data for the action. For book_meeting: MUST include attendee_email, topic, and preferred_time. Optionally include attendee_name and duration_minutes. For send_email: MUST include recipient_email, subject, and message. Pass all fields as a flat object, e.g. {'attendee_email': 'john@example.com', 'topic': 'meeting', 'preferred_time': 'Tuesday 2pm'}",
-                            "properties": {
-                                "attendee_email": {"type": "string", "description": "Email of meeting attendee (for book_meeting)"},
-                                "attendee_name": {"type": "string", "description": "Name of meeting attendee (for book_meeting)"},
-                                "topic": {"type": "string", "description": "Meeting topic/subject (for book_meeting)"},
-                                "preferred_time": {"type": "string", "description": "Preferred meeting time (for book_meeting)"},
-                                "duration_minutes": {"type": "integer", "description": "Meeting duration in minutes (for book_meeting)"},
-                                "recipient_email": {"type": "string", "description": "Email recipient (for send_email)"},
-                                "subject": {"type": "string", "description": "Email subject (for send_email)"},
-                                "message": {"type": "string", "description": "Email message body (for send_email)"}
-                            }
-                        }
-                    },
-                    "required": ["action", "data"]
-                }
-            }
-        ]
+        # Minified schemas; every function on every turn, so the prompt prefix never changes
+        # (build_assistant_tools(..., select_per_turn=True) sends only the functions a request needs)
+        self.tool_registry = tool_registry
+        self.tool_selection = self.tool_registry.selection()
+        
+        # Model, functions and system prompt serialized once per subset and backend, always
+        # first and byte-identical, so the provider can serve them from its prompt cache
+        self.prefix_requests = {}
+    
+    def prefix_request(self, selection, backend) -> PromptPrefixRequest:
+        """The request builder for a function selection on a backend (built once per pair)"""
+        key = (selection.names, backend.name)
+        request = self.prefix_requests.get(key)
+        if request is None:
+            request = self.prefix_requests[key] = PromptPrefixRequest(
+                backend.model,
+                self.conversation_history[0].content,
+                functions=selection.functions,
+                function_call="auto"
+            )
+        return request
+    
+    def select_tools(self, user_message: str):
+        """Choose this turn's functions (all of them unless the registry selects per turn)"""
+        self.tool_selection = self.tool_registry.select(user_message, self.tool_selection)
+        print(f"🧰 Functions: {', '.join(self.tool_selection.names)} "
+              f"(~{self.tool_selection.tokens_saved} prompt tokens saved per request)")
     
     def execute_function(self, function_name: str, arguments: dict) -> str:
         """Execute a function and return the result"""
-        if function_name == "trigger_n8n_webhook":
-            # Extract action and data from arguments
-            action = arguments.get("action")
-            data = arguments.get("data", {})
-            
-            # If data is empty or None, log warning
-            if not data:
-                print(f"⚠️  Warning: No data provided for action {action}")
-                print(f"   Full arguments: {json.dumps(arguments, indent=2)}")
-            
-            print(f"🔗 Calling n8n webhook: action={action}")
-            print(f"   Data: {json.dumps(data, indent=2)}")
-            
-            # Call n8n webhook
-            result = trigger_n8n_webhook(action, data)
-            return result
-        elif function_name == "extract_meeting_intent":
-            # Just return the extracted data - agent will decide if it needs to call n8n
-            return json.dumps({"status": "extracted", "data": arguments})
-        elif function_name == "extract_email_intent":
-            # Just return the extracted data - agent will decide if it needs to call n8n
-            return json.dumps({"status": "extracted", "data": arguments})
-        else:
+        if function_name not in self.tool_registry:
             return json.dumps({"status": "error", "message": f"Unknown function: {function_name}"})
+        try:
+            return self.tool_registry.call(function_name, arguments)
+        except TypeError as e:
+            # Missing or misnamed arguments: tell the model so it can try again
+            return json.dumps({"status": "error", "message": str(e)})
+    
+    def prefill_intent(self, user_message: str):
+        """
+        If the local router can extract the whole request, record the
+        extract_* call and its result as if the model had made it. The model
+        then goes straight to trigger_n8n_webhook, saving one LLM round trip.
+        """
+        if self.intent_router is None:
+            return
+        routed = self.intent_router.route(user_message)
+        if routed is None:
+            return
+        function_name, function_args = routed
+        print(f"⚡ Extracted locally: {function_name}")
+        print(f"   Arguments: {json.dumps(function_args, indent=2)}")
+        
+        self.conversation_history.append(Message(
+            "assistant",
+            None,
+            function_call=ToolCall(function_name, json.dumps(function_args))
+        ))
+        self.conversation_history.append(Message(
+            "function",
+            self.execute_function(function_name, function_args),
+            name=function_name
+        ))
     
     def chat(self, user_message: str) -> str:
         """Process user message and handle function calls"""
         # Add user message to conversation history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
+        self.conversation_history.append(Message("user", user_message))
+        self.select_tools(user_message)
+        self.prefill_intent(user_message)
         
         max_iterations = 5
         iteration = 0
@@ -213,13 +139,12 @@ Be friendly, ask for missing information clearly, and confirm actions before exe
             iteration += 1
             print(f"\n--- Agent Iteration {iteration} ---")
             
-            # Make API call with functions
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=self.conversation_history,
-                functions=self.functions,
-                function_call="auto"
-            )
+            # Make API call with functions; only the messages added since the last call are serialized
+            selection = self.tool_selection
+            self.tool_registry.record(selection)
+            response = self.router.call(lambda backend: self.prefix_request(selection, backend).create(
+                backend.client, self.conversation_history, cache=self.cache
+            ))
             
             message = response.choices[0].message
             
@@ -237,31 +162,21 @@ Be friendly, ask for missing information clearly, and confirm actions before exe
                 print(f"   Result: {function_result[:200]}...")
                 
                 # Add assistant's function call to history
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": None,
-                    "function_call": {
-                        "name": function_name,
-                        "arguments": message.function_call.arguments
-                    }
-                })
+                self.conversation_history.append(Message(
+                    "assistant",
+                    None,
+                    function_call=ToolCall(function_name, message.function_call.arguments)
+                ))
                 
                 # Add function result to history
-                self.conversation_history.append({
-                    "role": "function",
-                    "name": function_name,
-                    "content": function_result
-                })
+                self.conversation_history.append(Message("function", function_result, name=function_name))
                 
                 # Continue loop to let AI process the result
                 continue
             else:
                 # AI has the final response
                 assistant_message = message.content
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": assistant_message
-                })
+                self.conversation_history.append(Message("assistant", assistant_message))
                 return assistant_message
         
         return "I reached the maximum number of iterations. Please try again with a simpler request."
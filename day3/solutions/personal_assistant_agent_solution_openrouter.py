@@ -7,74 +7,80 @@ This version uses OpenRouter AI instead of OpenAI.
 
 import os
 import json
-import requests
+import sys
 from dotenv import load_dotenv
-from openai import OpenAI
+
+# Make the shared/ package at the repository root importable
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from shared.transport import api_base_url
+from shared.messages import Message, ToolCall
+from shared.cache import get_default_cache
+from shared.prompt_prefix import PromptPrefixRequest
+from shared.providers import router_or_default
+from shared.assistant_tools import build_assistant_tools
+from shared.intent_router import IntentRouter
+# Delivers actions to n8n: webhook client, optional queue and batcher, built on first use
+from shared.n8n import trigger_n8n_webhook
+from shared.tool_runner import ToolRunner
+from shared.tool_stream import StreamedToolCalls
+from shared.metrics import get_metrics
 
 load_dotenv()
 
-# n8n webhook URL - configure this after setting up n8n workflow
-N8N_WEBHOOK_URL = os.getenv("N8N_WEBHOOK_URL", "https://your-n8n-instance.com/webhook/personal-assistant")
+# The agent's tools, with schemas generated once from their type hints and docstrings
+# (shared/assistant_tools.py); calls are dispatched by name with one dict lookup
+tool_registry = build_assistant_tools(trigger_n8n_webhook)
+
+
+def agent_model() -> str:
+    """The model this agent asks for"""
+    # You can use any model available on OpenRouter
+    # Examples: "openai/gpt-4o-mini", "anthropic/claude-3-haiku", "google/gemini-pro"
+    return os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
 
 
-def trigger_n8n_webhook(action: str, data: dict) -> str:
+def build_router():
     """
-    Trigger an n8n workflow via webhook.
-    
-    Args:
-        action: The action type ("book_meeting" or "send_email")
-        data: Structured data for the action
-    
-    Returns:
-        JSON string with the result from n8n
+    The LLM router for this agent. Building one creates an HTTP client (about
+    50 ms), so a server with many agents builds it once and shares it.
     """
-    try:
-        # Combine action and data into flat payload
-        payload = {
-            "action": action,
-            **data  # Spread data fields at top level
-        }
-        
-        print(f"📤 Sending to n8n: {json.dumps(payload, indent=2)}")
-        
-        response = requests.post(
-            N8N_WEBHOOK_URL,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=30
-        )
-        response.raise_for_status()
-        result = response.json()
-        print(f"📥 Response from n8n: {json.dumps(result, indent=2)}")
-        return json.dumps(result)
-    except requests.exceptions.RequestException as e:
-        error_msg = f"Failed to call n8n: {str(e)}"
-        print(f"❌ Error: {error_msg}")
-        return json.dumps({"status": "error", "message": error_msg})
-    except Exception as e:
-        error_msg = str(e)
-        print(f"❌ Error: {error_msg}")
-        return json.dumps({"status": "error", "message": error_msg})
+    # OpenRouter uses OpenAI-compatible API with custom base_url
+    # (https://openrouter.ai/api/v1 unless OPENROUTER_BASE_URL is set). With LLM_BACKENDS set,
+    # each request goes to the fastest healthy backend instead (shared/providers.py)
+    return router_or_default("openrouter", api_base_url(), os.getenv("OPENROUTER_API_KEY"), agent_model())
 
 
 class PersonalAssistantAgent:
     """An AI agent that can book meetings and send emails via n8n"""
     
-    def __init__(self):
-        # Initialize OpenRouter client
-        # OpenRouter uses OpenAI-compatible API with custom base_url
-        self.client = OpenAI(
-            api_key=os.getenv("OPENROUTER_API_KEY"),
-            base_url="https://openrouter.ai/api/v1"
+    def __init__(self, router=None, memory=None, tool_executor=None):
+        """
+        Args:
+            router: Shared ProviderRouter (default: a new one from build_router())
+            memory: Optional policy (SlidingWindowMemory from shared.memory) that
+                keeps the history bounded; without it the history grows every turn
+            tool_executor: Shared thread pool for tool calls (default: the agent's own)
+        """
+        self.model = agent_model()
+        self.router = router or build_router()
+        self.memory = memory
+        
+        # Opt-in response cache for low-temperature requests (COMPLETION_CACHE in .env)
+        self.cache = get_default_cache()
+        
+        # Fills extract_* details locally when a request is complete (None to always ask the LLM)
+        self.intent_router = IntentRouter()
+        self.local_calls = 0
+        
+        # Runs the tool calls of one response in parallel, each with its own timeout
+        self.tool_runner = ToolRunner(
+            self.execute_function,
+            timeouts={"trigger_n8n_webhook": 35, "extract_meeting_intent": 5, "extract_email_intent": 5},
+            executor=tool_executor
         )
-        # You can use any model available on OpenRouter
-        # Examples: "openai/gpt-4o-mini", "anthropic/claude-3-haiku", "google/gemini-pro"
-        self.model = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
         
         self.conversation_history = [
-            {
-                "role": "system",
-                "content": """You are a helpful personal assistant that can book meetings and send emails.
+            Message("system", """You are a helpful personal assistant that can book meetings and send emails.
                 
 When users ask to book a meeting:
 - Extract: attendee name, email, topic/subject, preferred time, duration
@@ -90,139 +96,89 @@ When users ask to send an email:
 - IMPORTANT: When calling trigger_n8n_webhook, the 'data' parameter must be a flat object containing all email details:
   Example: {"action": "send_email", "data": {"recipient_email": "sarah@example.com", "subject": "Meeting tomorrow", "message": "Don't forget our meeting at 2pm"}}
 
-Be friendly, ask for missing information clearly, and confirm actions before executing."""
-            }
+Be friendly, ask for missing information clearly, and confirm actions before executing.""")
         ]
         
-        # Define tools for the agent (OpenRouter uses 'tools' format instead of 'functions')
-        self.tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "extract_meeting_intent",
-                    "description": "Extract meeting booking details from user query. Use this when user wants to schedule or book a meeting.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "attendee_name": {
-                                "type": "string",
-                                "description": "Name of the person to meet with"
-                            },
-                            "attendee_email": {
-                                "type": "string",
-                                "description": "Email address of the attendee"
-                            },
-                            "topic": {
-                                "type": "string",
-                                "description": "Subject or topic of the meeting"
-                            },
-                            "preferred_time": {
-                                "type": "string",
-                                "description": "Preferred time for the meeting (e.g., 'Tuesday 2pm', 'next week Monday', 'tomorrow at 3pm'). Leave as null if not specified."
-                            },
-                            "duration_minutes": {
-                                "type": "integer",
-                                "description": "Duration of the meeting in minutes. Default to 30 if not specified.",
-                                "default": 30
-                            }
-                        },
-                        "required": ["attendee_email", "topic"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "extract_email_intent",
-                    "description": "Extract email sending details from user query. Use this when user wants to send an email.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "recipient_email": {
-                                "type": "string",
-                                "description": "Email address of the recipient"
-                            },
-                            "subject": {
-                                "type": "string",
-                                "description": "Subject line of the email"
-                            },
-                            "message": {
-                                "type": "string",
-                                "description": "Body/content of the email message"
-                            }
-                        },
-                        "required": ["recipient_email", "subject", "message"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "trigger_n8n_webhook",
-                    "description": "Trigger an n8n automation workflow to execute an action (book meeting or send email). Use this after extracting all required information. IMPORTANT: The 'data' parameter must contain all the meeting or email details as a flat object (not nested).",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "action": {
-                                "type": "string",
-                                "enum": ["book_meeting", "send_email"],
-                                "description": "The action to perform: 'book_meeting' or 'send_email'"
-                            },
-                            "data": {
-                                "type": "object",
-                                "description": "Structured data for the action. For book_meeting: MUST include attendee_email, topic, and preferred_time. Optionally include attendee_name and duration_minutes. For send_email: MUST include recipient_email, subject, and message. Pass all fields as a flat object, e.g. {'attendee_email': 'john@example.com', 'topic': 'meeting', 'preferred_time': 'Tuesday 2pm'}",
-                                "properties": {
-                                    "attendee_email": {"type": "string", "description": "Email of meeting attendee (for book_meeting)"},
-                                    "attendee_name": {"type": "string", "description": "Name of meeting attendee (for book_meeting)"},
-                                    "topic": {"type": "string", "description": "Meeting topic/subject (for book_meeting)"},
-                                    "preferred_time": {"type": "string", "description": "Preferred meeting time (for book_meeting)"},
-                                    "duration_minutes": {"type": "integer", "description": "Meeting duration in minutes (for book_meeting)"},
-                                    "recipient_email": {"type": "string", "description": "Email recipient (for send_email)"},
-                                    "subject": {"type": "string", "description": "Email subject (for send_email)"},
-                                    "message": {"type": "string", "description": "Email message body (for send_email)"}
-                                }
-                            }
-                        },
-                        "required": ["action", "data"]
-                    }
-                }
-            }
-        ]
+        # Minified schemas; every tool on every turn, so the prompt prefix never changes
+        # (build_assistant_tools(..., select_per_turn=True) sends only the tools a request needs)
+        self.tool_registry = tool_registry
+        self.tool_selection = self.tool_registry.selection()
+        
+        # Model, tools and system prompt serialized once per tool subset and backend, always
+        # first and byte-identical, so the provider can serve them from its prompt cache
+        self.prefix_requests = {}
+    
+    def prefix_request(self, selection, backend) -> PromptPrefixRequest:
+        """The request builder for a tool selection on a backend (built once per pair)"""
+        key = (selection.names, backend.name)
+        request = self.prefix_requests.get(key)
+        if request is None:
+            request = self.prefix_requests[key] = PromptPrefixRequest(
+                backend.model,
+                self.conversation_history[0].content,
+                tools=selection.tools,
+                tool_choice="auto"  # OpenRouter uses 'tool_choice' instead of 'function_call'
+            )
+        return request
+    
+    def select_tools(self, user_message: str):
+        """Choose this turn's tools (all of them unless the registry selects per turn)"""
+        self.tool_selection = self.tool_registry.select(user_message, self.tool_selection)
+        print(f"🧰 Tools: {', '.join(self.tool_selection.names)} "
+              f"(~{self.tool_selection.tokens_saved} prompt tokens saved per request)")
+    
+    def apply_memory(self):
+        """Trim the history with the memory policy, if one is set"""
+        if self.memory is not None:
+            self.conversation_history = self.memory.apply(self.conversation_history)
     
     def execute_function(self, function_name: str, arguments: dict) -> str:
         """Execute a function and return the result"""
-        if function_name == "trigger_n8n_webhook":
-            # Extract action and data from arguments
-            action = arguments.get("action")
-            data = arguments.get("data", {})
-            
-            # If data is empty or None, log warning
-            if not data:
-                print(f"⚠️  Warning: No data provided for action {action}")
-                print(f"   Full arguments: {json.dumps(arguments, indent=2)}")
-            
-            print(f"🔗 Calling n8n webhook: action={action}")
-            print(f"   Data: {json.dumps(data, indent=2)}")
-            
-            # Call n8n webhook
-            result = trigger_n8n_webhook(action, data)
-            return result
-        elif function_name == "extract_meeting_intent":
-            # Just return the extracted data - agent will decide if it needs to call n8n
-            return json.dumps({"status": "extracted", "data": arguments})
-        elif function_name == "extract_email_intent":
-            # Just return the extracted data - agent will decide if it needs to call n8n
-            return json.dumps({"status": "extracted", "data": arguments})
-        else:
+        if function_name not in self.tool_registry:
             return json.dumps({"status": "error", "message": f"Unknown function: {function_name}"})
+        try:
+            return self.tool_registry.call(function_name, arguments)
+        except TypeError as e:
+            # Missing or misnamed arguments: tell the model so it can try again
+            return json.dumps({"status": "error", "message": str(e)})
+    
+    def prefill_intent(self, user_message: str):
+        """
+        If the local router can extract the whole request, record the
+        extract_* tool call and its result as if the model had made it. The
+        model then goes straight to trigger_n8n_webhook, saving one LLM round trip.
+        """
+        if self.intent_router is None:
+            return
+        routed = self.intent_router.route(user_message)
+        if routed is None:
+            return
+        function_name, function_args = routed
+        print(f"⚡ Extracted locally: {function_name}")
+        print(f"   Arguments: {json.dumps(function_args, indent=2)}")
+        
+        # Counted, not taken from the history length: a trimmed history could repeat an id
+        self.local_calls += 1
+        tool_call_id = f"call_local_{self.local_calls}"
+        self.conversation_history.append(Message(
+            "assistant",
+            None,
+            tool_calls=[ToolCall(function_name, json.dumps(function_args), id=tool_call_id)]
+        ))
+        self.conversation_history.append(Message(
+            "tool",
+            self.execute_function(function_name, function_args),
+            name=function_name,
+            tool_call_id=tool_call_id
+        ))
     
     def chat(self, user_message: str) -> str:
         """Process user message and handle tool calls"""
         # Add user message to conversation history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
+        self.conversation_history.append(Message("user", user_message))
+        self.apply_memory()
+        self.select_tools(user_message)
+        self.prefill_intent(user_message)
         
         max_iterations = 5
         iteration = 0
@@ -231,73 +187,138 @@ Be friendly, ask for missing information clearly, and confirm actions before exe
             iteration += 1
             print(f"\n--- Agent Iteration {iteration} ---")
             
-            # Make API call with tools (OpenRouter uses 'tools' instead of 'functions')
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=self.conversation_history,
-                tools=self.tools,
-                tool_choice="auto"  # OpenRouter uses 'tool_choice' instead of 'function_call'
-            )
+            # Make API call with tools (OpenRouter uses 'tools' instead of 'functions');
+            # only the messages added since the last call are serialized
+            selection = self.tool_selection
+            self.tool_registry.record(selection)
+            response = self.router.call(lambda backend: self.prefix_request(selection, backend).create(
+                backend.client, self.conversation_history, cache=self.cache
+            ))
             
             message = response.choices[0].message
             
             # Check if AI wants to call a tool (OpenRouter uses 'tool_calls' instead of 'function_call')
             if message.tool_calls:
-                # OpenRouter returns tool_calls as a list, so we need to handle each one
+                # OpenRouter returns tool_calls as a list; they are independent,
+                # so run them all at once (e.g. book a meeting AND send an email)
+                calls = []
                 for tool_call in message.tool_calls:
-                    # Extract function name and arguments
                     function_name = tool_call.function.name
                     function_args = json.loads(tool_call.function.arguments)
-                    tool_call_id = tool_call.id
-                    
                     print(f"🔧 Agent calling function: {function_name}")
                     print(f"   Arguments: {json.dumps(function_args, indent=2)}")
-                    
-                    # Execute the function
-                    function_result = self.execute_function(function_name, function_args)
-                    print(f"   Result: {function_result[:200]}...")
-                    
-                    # Add assistant's tool call to history (OpenRouter format)
-                    self.conversation_history.append({
-                        "role": "assistant",
-                        "content": message.content,
-                        "tool_calls": [
-                            {
-                                "id": tool_call_id,
-                                "type": "function",
-                                "function": {
-                                    "name": function_name,
-                                    "arguments": tool_call.function.arguments
-                                }
-                            }
-                        ]
-                    })
+                    calls.append((function_name, function_args))
+                
+                # Execute the functions concurrently; results come back in call order
+                function_results = self.tool_runner.run_all(calls)
+                
+                # One assistant message carries every tool call of this response
+                # (OpenRouter format), so later iterations re-send it only once
+                self.conversation_history.append(Message(
+                    "assistant",
+                    message.content,
+                    tool_calls=[
+                        ToolCall(tool_call.function.name, tool_call.function.arguments, id=tool_call.id)
+                        for tool_call in message.tool_calls
+                    ]
+                ))
+                
+                for tool_call, function_result in zip(message.tool_calls, function_results):
+                    function_name = tool_call.function.name
+                    print(f"   Result ({function_name}): {function_result[:200]}...")
                     
                     # Add tool result to history (OpenRouter uses 'tool' role instead of 'function')
-                    self.conversation_history.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call_id,
-                        "name": function_name,
-                        "content": function_result
-                    })
+                    self.conversation_history.append(Message(
+                        "tool",
+                        function_result,
+                        name=function_name,
+                        tool_call_id=tool_call.id
+                    ))
                 
                 # Continue loop to let AI process the result
                 continue
             else:
                 # AI has the final response
                 assistant_message = message.content
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": assistant_message
-                })
+                self.conversation_history.append(Message("assistant", assistant_message))
                 return assistant_message
         
         return "I reached the maximum number of iterations. Please try again with a simpler request."
+    
+    def chat_stream(self, user_message: str):
+        """
+        Streaming version of chat(): yields the reply token by token.
+        
+        Each tool call is started as soon as its arguments have streamed in,
+        while the model is still writing the rest of the response, so the
+        n8n webhook runs in parallel with generation.
+        """
+        self.conversation_history.append(Message("user", user_message))
+        self.apply_memory()
+        self.select_tools(user_message)
+        self.prefill_intent(user_message)
+        
+        max_iterations = 5
+        for iteration in range(1, max_iterations + 1):
+            print(f"\n--- Agent Iteration {iteration} (streaming) ---")
+            
+            assembler = StreamedToolCalls()
+            handles = {}            # ToolCall -> tool_runner handle
+            content_parts = []
+            selection = self.tool_selection
+            self.tool_registry.record(selection)
+            with get_metrics().track("agent_stream") as timer:
+                stream = self.router.call(lambda backend: self.prefix_request(selection, backend).create(
+                    backend.client,
+                    self.conversation_history,
+                    stream=True,
+                    stream_options={"include_usage": True}
+                ))
+                timer.headers()
+                for chunk in stream:
+                    if not chunk.choices:
+                        timer.usage(chunk.usage)
+                        continue
+                    timer.token()
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield delta.content
+                    if delta.tool_calls:
+                        for tool_call, function_args in assembler.feed(delta.tool_calls):
+                            print(f"🔧 Agent calling function: {tool_call.name}")
+                            handles[tool_call] = self.tool_runner.submit(tool_call.name, function_args)
+            for tool_call, function_args in assembler.finish():
+                print(f"🔧 Agent calling function: {tool_call.name}")
+                handles[tool_call] = self.tool_runner.submit(tool_call.name, function_args)
+            
+            content = "".join(content_parts) or None
+            tool_calls = assembler.tool_calls()
+            if not tool_calls:
+                # AI has the final response (already streamed to the caller)
+                self.conversation_history.append(Message("assistant", content))
+                return
+            
+            # Same history layout as chat(): one assistant message, then the results in call order
+            self.conversation_history.append(Message("assistant", content, tool_calls=tool_calls))
+            for tool_call in tool_calls:
+                function_result = self.tool_runner.result(handles[tool_call])
+                print(f"   Result ({tool_call.name}): {function_result[:200]}...")
+                self.conversation_history.append(Message(
+                    "tool",
+                    function_result,
+                    name=tool_call.name,
+                    tool_call_id=tool_call.id
+                ))
+        
+        yield "I reached the maximum number of iterations. Please try again with a simpler request."
 
 
 def main():
     """Run the personal assistant agent"""
     agent = PersonalAssistantAgent()
+    # AGENT_STREAM=1 streams replies and starts tools while the model is still writing
+    streaming = os.getenv("AGENT_STREAM", "").lower() in ("1", "true", "yes")
     
     print("=" * 60)
     print("Personal Assistant Agent (OpenRouter)")
@@ -324,8 +345,14 @@ def main():
             continue
         
         try:
-            response = agent.chat(user_input)
-            print(f"\nPersonal Assistant: {response}\n")
+            if streaming:
+                print("\nPersonal Assistant: ", end="", flush=True)
+                for token in agent.chat_stream(user_input):
+                    print(token, end="", flush=True)
+                print("\n")
+            else:
+                response = agent.chat(user_input)
+                print(f"\nPersonal Assistant: {response}\n")
         except Exception as e:
             print(f"Error: {e}\n")
 
@@ -0,0 +1,6 @@
+"""
+Shared helpers used by the workshop solutions.
+==============================================
+Scripts in day1/ and day3/ add the repository root to ``sys.path`` and import
+from here, so every call site shares the same plumbing.
+"""
@@ -0,0 +1,240 @@
+"""
+Durable Action Queue
+====================
+Puts n8n actions (book a meeting, send an email) in a local SQLite queue and
+returns a ticket right away, so the agent can answer the user without
+waiting for Google Calendar or Gmail. A small pool of worker threads drains
+the queue in the background.
+
+- Durable: actions are committed to disk before enqueue() returns.
+- Leased: a worker claims actions with one UPDATE ... RETURNING inside
+  BEGIN IMMEDIATE, leasing them to its queue for lease_seconds. Several
+  queues (threads or processes) can share one file without claiming the
+  same action. An action whose lease ran out without a result (its process
+  died mid-delivery) is claimed and sent again.
+- Idempotent: every action has an idempotency key. Enqueueing the same key
+  twice is a no-op, and the key goes out as the Idempotency-Key header on
+  every delivery attempt, so n8n can drop duplicates.
+- At most once after an ambiguous failure: only failures where n8n cannot
+  have run the action (no connection, 429, 503, circuit open) are retried.
+  After a timeout, a dropped connection, a 5xx or an unreadable answer the
+  email may already be sent or the meeting booked, so the action is marked
+  failed instead of sent again. Check those by hand.
+- Batched: workers claim up to batch_size actions per transaction and
+  record their results in one transaction.
+- Smoothed: a burst of actions waits in the queue instead of piling up as
+  blocked threads; at most `workers` webhook calls run at once.
+"""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+from shared.webhook import WebhookError, WebhookNotSentError
+
+
+class ActionQueue:
+    """SQLite-backed queue of webhook payloads with a background worker pool"""
+
+    def __init__(self, path: str, client, workers: int = 4, batch_size: int = 5,
+                 max_attempts: int = 5, retry_delay: float = 5, poll_interval: float = 1,
+                 lease_seconds: float = 300):
+        """
+        Args:
+            path: SQLite file for the queue (":memory:" for a throwaway queue)
+            client: Object with post(payload, idempotency_key=...), e.g. a WebhookClient
+            workers: Worker threads, i.e. most webhook calls in flight at once
+            batch_size: Most actions a worker claims per transaction
+            max_attempts: Deliveries tried before an action is marked failed
+            retry_delay: Base seconds before a failed action is tried again (grows per attempt)
+            poll_interval: Seconds an idle worker sleeps before checking for due retries
+            lease_seconds: How long a claimed batch belongs to this queue; must be longer
+                than delivering batch_size actions takes (the webhook's total timeout each)
+        """
+        self.client = client
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.owner = uuid.uuid4().hex       # identifies this queue's leases
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS actions ("
+            "id INTEGER PRIMARY KEY, idempotency_key TEXT UNIQUE, payload TEXT, "
+            "status TEXT, attempts INTEGER DEFAULT 0, next_attempt_at REAL, "
+            "created_at REAL, updated_at REAL, result TEXT, lease_owner TEXT, lease_expires REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(actions)")}
+        for column, kind in (("lease_owner", "TEXT"), ("lease_expires", "REAL")):
+            if column not in columns:
+                # A queue file from before leases
+                self._db.execute(f"ALTER TABLE actions ADD COLUMN {column} {kind}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS actions_due ON actions (status, next_attempt_at)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS actions_lease ON actions (status, lease_expires)")
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"action-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def enqueue(self, payload: dict, idempotency_key: str = None) -> dict:
+        """
+        Queue one payload for delivery.
+
+        Returns:
+            {"status": "accepted", "ticket": idempotency_key}
+        """
+        key = idempotency_key or uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO actions (idempotency_key, payload, status, next_attempt_at, "
+                "created_at, updated_at) VALUES (?, ?, 'pending', ?, ?, ?)",
+                (key, json.dumps(payload), now, now, now)
+            )
+            self._wakeup.notify()
+        return {"status": "accepted", "ticket": key}
+
+    def status(self, ticket: str):
+        """
+        Returns:
+            {"status", "attempts", "result"} for a ticket, or None if unknown
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, attempts, result FROM actions WHERE idempotency_key = ?", (ticket,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"status": row[0], "attempts": row[1], "result": json.loads(row[2]) if row[2] else None}
+
+    def counts(self) -> dict:
+        """Number of actions per status (pending, in_flight, done, failed)"""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM actions GROUP BY status").fetchall()
+        return dict(rows)
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Block until no action is pending or in flight; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            counts = self.counts()
+            if not counts.get("pending") and not counts.get("in_flight"):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+
+    def close(self):
+        """Stop the workers after their current batch; queued actions stay on disk"""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._db.close()
+
+    def _claim(self) -> list:
+        """
+        Lease up to batch_size due actions to this queue and return them (lock held).
+
+        Due means pending and past next_attempt_at, or in flight with an
+        expired lease. BEGIN IMMEDIATE takes the file's write lock before
+        the rows are chosen, so no other queue can choose them too.
+        """
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = self._db.execute(
+                "UPDATE actions SET status = 'in_flight', lease_owner = ?, lease_expires = ?, updated_at = ? "
+                "WHERE id IN (SELECT id FROM actions "
+                "WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'in_flight' AND lease_expires <= ?) "
+                "ORDER BY id LIMIT ?) "
+                "RETURNING id, idempotency_key, payload, attempts",
+                (self.owner, now + self.lease_seconds, now, now, now, self.batch_size)
+            ).fetchall()
+            self._db.execute("COMMIT")
+        except BaseException:
+            if self._db.in_transaction:
+                self._db.execute("ROLLBACK")
+            raise
+        return sorted(rows)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                batch = []
+                while not self._stopping:
+                    try:
+                        batch = self._claim()
+                    except Exception:
+                        print("❌ Action queue: could not claim actions")
+                        traceback.print_exc()
+                    if batch:
+                        break
+                    self._wakeup.wait(self.poll_interval)
+                if not batch:
+                    return
+
+            updates = [self._deliver(*row) for row in batch]
+            self._record(updates)
+
+    def _deliver(self, action_id: int, key: str, payload: str, attempts: int) -> tuple:
+        """Send one action; returns its (status, attempts, next_attempt_at, result, id) update"""
+        attempts += 1
+        try:
+            result = self.client.post(json.loads(payload), idempotency_key=key)
+            return "done", attempts, None, json.dumps(result), action_id
+        except WebhookNotSentError as e:
+            # n8n never ran it: safe to send again later
+            result = json.dumps({"status": "error", "message": str(e)})
+            if attempts >= self.max_attempts:
+                return "failed", attempts, None, result, action_id
+            retry_at = time.time() + random.uniform(0.5, 1.0) * self.retry_delay * 2 ** (attempts - 1)
+            return "pending", attempts, retry_at, result, action_id
+        except Exception as e:
+            if not isinstance(e, WebhookError):
+                print(f"❌ Action queue: unexpected error delivering action {action_id}")
+                traceback.print_exc()
+            # n8n may already have sent the email or booked the meeting: do not send it again
+            result = json.dumps({"status": "error", "message": f"{e} (may have been delivered; not retried)"})
+            return "failed", attempts, None, result, action_id
+
+    def _record(self, updates: list, tries: int = 3):
+        """
+        Store a batch's results; a failing write is retried, then left for the lease to expire.
+
+        Only rows still leased to this queue are updated: if the lease ran
+        out, another queue has claimed the action and its result counts.
+        """
+        for attempt in range(1, tries + 1):
+            with self._lock:
+                try:
+                    self._db.execute("BEGIN IMMEDIATE")
+                    now = time.time()
+                    self._db.executemany(
+                        "UPDATE actions SET status = ?, attempts = ?, next_attempt_at = ?, result = ?, "
+                        "updated_at = ? WHERE id = ? AND lease_owner = ? AND status = 'in_flight'",
+                        [update[:4] + (now,) + update[4:] + (self.owner,) for update in updates]
+                    )
+                    self._db.execute("COMMIT")
+                    return
+                except Exception:
+                    if self._db.in_transaction:
+                        self._db.execute("ROLLBACK")
+                    print(f"❌ Action queue: could not record results (try {attempt} of {tries})")
+                    traceback.print_exc()
+            time.sleep(self.poll_interval)
@@ -0,0 +1,111 @@
+"""
+Personal Assistant Tools
+========================
+The three tools of the day 3 personal assistant agent, written once for
+both versions (OpenAI functions API and OpenRouter tools API). Their
+schemas are generated from the type hints and docstrings below (see
+shared/tool_registry.py).
+
+The agent scripts build the registry with their own n8n sender:
+
+    tool_registry = build_assistant_tools(trigger_n8n_webhook)
+    tool_registry.call("extract_email_intent", {...})
+"""
+
+import json
+from typing import Annotated, Literal, TypedDict
+
+from shared.tool_registry import ToolRegistry
+
+# Tools each kind of request needs, for per-turn selection (select_per_turn=True)
+TOOL_INTENTS = {
+    "meeting": ["extract_meeting_intent", "trigger_n8n_webhook"],
+    "email": ["extract_email_intent", "trigger_n8n_webhook"],
+}
+
+
+class ActionData(TypedDict, total=False):
+    """The flat details object passed to n8n"""
+    attendee_email: Annotated[str, "Email of meeting attendee (for book_meeting)"]
+    attendee_name: Annotated[str, "Name of meeting attendee (for book_meeting)"]
+    topic: Annotated[str, "Meeting topic/subject (for book_meeting)"]
+    preferred_time: Annotated[str, "Preferred meeting time (for book_meeting)"]
+    duration_minutes: Annotated[int, "Meeting duration in minutes (for book_meeting)"]
+    recipient_email: Annotated[str, "Email recipient (for send_email)"]
+    subject: Annotated[str, "Email subject (for send_email)"]
+    message: Annotated[str, "Email message body (for send_email)"]
+
+
+def build_assistant_tools(send_action, minify: bool = True, select_per_turn: bool = False) -> ToolRegistry:
+    """
+    Register the assistant's tools.
+
+    Args:
+        send_action: Function (action, data) -> JSON string that delivers an action to n8n
+        minify: Send minified schemas (see ToolRegistry)
+        select_per_turn: Send only the tools of the intents each message mentions. Off by
+            default: every change of tool list breaks the provider's prompt cache, which
+            costs more than the schema tokens it saves (see bench_tool_selection.py)
+
+    Returns:
+        A ToolRegistry with extract_meeting_intent, extract_email_intent and trigger_n8n_webhook
+    """
+    registry = ToolRegistry(intents=TOOL_INTENTS if select_per_turn else None, minify=minify)
+
+    @registry.tool
+    def extract_meeting_intent(attendee_email: str, topic: str, attendee_name: str = None,
+                               preferred_time: str = None, duration_minutes: int = 30) -> str:
+        """
+        Extract meeting booking details from user query. Use this when user wants to schedule or book a meeting.
+
+        Args:
+            attendee_email: Email address of the attendee
+            topic: Subject or topic of the meeting
+            attendee_name: Name of the person to meet with
+            preferred_time: Preferred time for the meeting (e.g., 'Tuesday 2pm', 'next week Monday',
+                'tomorrow at 3pm'). Leave as null if not specified.
+            duration_minutes: Duration of the meeting in minutes. Default to 30 if not specified.
+        """
+        # Just return the extracted data - agent will decide if it needs to call n8n
+        details = {"attendee_email": attendee_email, "attendee_name": attendee_name, "topic": topic,
+                   "preferred_time": preferred_time, "duration_minutes": duration_minutes}
+        return json.dumps({"status": "extracted", "data": {k: v for k, v in details.items() if v is not None}})
+
+    @registry.tool
+    def extract_email_intent(recipient_email: str, subject: str, message: str) -> str:
+        """
+        Extract email sending details from user query. Use this when user wants to send an email.
+
+        Args:
+            recipient_email: Email address of the recipient
+            subject: Subject line of the email
+            message: Body/content of the email message
+        """
+        # Just return the extracted data - agent will decide if it needs to call n8n
+        return json.dumps({"status": "extracted", "data": {
+            "recipient_email": recipient_email, "subject": subject, "message": message
+        }})
+
+    @registry.tool
+    def trigger_n8n_webhook(action: Literal["book_meeting", "send_email"], data: ActionData) -> str:
+        """
+        Trigger an n8n automation workflow to execute an action (book meeting or send email). Use this
+        after extracting all required information. IMPORTANT: The 'data' parameter must contain all the
+        meeting or email details as a flat object (not nested).
+
+        Args:
+            action: The action to perform: 'book_meeting' or 'send_email'
+            data: Structured data for the action. For book_meeting: MUST include attendee_email, topic,
+                and preferred_time. Optionally include attendee_name and duration_minutes. For
+                send_email: MUST include recipient_email, subject, and message. Pass all fields as a flat
+                object, e.g. {'attendee_email': 'john@example.com', 'topic': 'meeting', 'preferred_time':
+                'Tuesday 2pm'}
+        """
+        if not data:
+            print(f"⚠️  Warning: No data provided for action {action}")
+
+        print(f"🔗 Calling n8n webhook: action={action}")
+        print(f"   Data: {json.dumps(data, indent=2)}")
+        return send_action(action, data)
+
+    return registry
@@ -0,0 +1,105 @@
+"""
+Async Chat Completion Client
+============================
+Non-blocking counterpart to ``shared.transport.chat_completion``. One event
+loop can keep thousands of requests in flight while it waits on the network.
+
+It does not use the provider router: requests go to api_base_url() with
+one key and model even when LLM_BACKENDS is set, so there is no latency
+routing, hedging or failover here.
+"""
+
+import os
+
+from openai import AsyncOpenAI
+
+from shared.cache import get_default_cache
+from shared.metrics import get_metrics
+from shared.rate_limiter import INTERACTIVE, get_limiter, request_tokens
+from shared.transport import api_base_url
+
+_clients = {}       # (api_key, base_url) -> AsyncOpenAI
+
+
+def get_async_client(api_key: str = None) -> AsyncOpenAI:
+    """
+    Return the shared AsyncOpenAI client for this key and base URL, creating it on first use.
+
+    Each client owns a connection pool bound to the event loop it is first
+    used on, so create one loop per process and reuse it.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = api_base_url()
+    client = _clients.get((api_key, base_url))
+    if client is None:
+        client = _clients[api_key, base_url] = AsyncOpenAI(api_key=api_key, base_url=base_url)
+    return client
+
+
+async def async_chat_completion(payload: dict, api_key: str = None, priority: int = INTERACTIVE) -> dict:
+    """
+    Send a chat completion request without blocking the event loop.
+
+    Args:
+        payload: Request body, e.g. {"model": ..., "messages": [...]}
+        api_key: Bearer token (defaults to OPENAI_API_KEY from the environment)
+        priority: INTERACTIVE or BATCH, for the rate limiter (LLM_RATE_LIMIT_RPM/TPM)
+
+    Returns:
+        The response as a plain dict, same shape as chat_completion()
+    """
+    cache = get_default_cache()
+    if cache is not None:
+        cached = cache.get(payload)
+        if cached is not None:
+            return cached
+
+    # Post the raw dict: skips the SDK's typed request transform and response
+    # model parsing, which cost more CPU per call than the HTTP round trip
+    async def post(options=None):
+        with get_metrics().track("async_chat_completion") as timer:
+            result = await get_async_client(api_key).post("/chat/completions", body=payload, cast_to=object,
+                                                         options=options or {})
+            timer.usage(result.get("usage"))
+        return result
+
+    limiter = get_limiter()
+    if limiter is None:
+        result = await post()
+    else:
+        # Queue for RPM/TPM headroom without blocking the loop; the limiter retries 429s itself
+        result = await limiter.acall(lambda: post({"max_retries": 0}), request_tokens(payload), priority,
+                                     usage=lambda result: (result.get("usage") or {}).get("total_tokens"))
+    if cache is not None:
+        cache.put(payload, result)
+    return result
+
+
+async def async_chat_completion_stream(payload: dict, api_key: str = None, priority: int = INTERACTIVE):
+    """
+    Stream a chat completion, yielding content pieces as they arrive.
+
+    Args:
+        payload: Request body, e.g. {"model": ..., "messages": [...]}
+        api_key: Bearer token (defaults to OPENAI_API_KEY from the environment)
+        priority: INTERACTIVE or BATCH, for the rate limiter (LLM_RATE_LIMIT_RPM/TPM)
+
+    Yields:
+        Text deltas (strings), in order
+    """
+    limiter = get_limiter()
+    if limiter is not None:
+        # Usage only arrives at the end of a stream, so the estimate stands (the SDK retries 429s)
+        await limiter.acquire_async(request_tokens(payload), priority)
+    with get_metrics().track("async_chat_stream") as timer:
+        stream = await get_async_client(api_key).chat.completions.create(
+            **payload, stream=True, stream_options={"include_usage": True}
+        )
+        timer.headers()
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                timer.token()
+                yield chunk.choices[0].delta.content
+            elif chunk.usage is not None:
+                # With include_usage, the last chunk has no choices, only token counts
+                timer.usage(chunk.usage)
@@ -0,0 +1,53 @@
+"""
+Batch Experiment Runner
+=======================
+Runs many prompt variants concurrently over the shared pooled session, so a
+sweep takes about as long as its slowest call instead of the sum of all calls.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.rate_limiter import BATCH
+from shared.transport import DEFAULT_POOL_SIZE, chat_completion
+
+
+def run_variant(variant: dict, api_key: str = None) -> dict:
+    """
+    Run one prompt variant and never raise.
+
+    Args:
+        variant: Request body with "model", "messages" and optionally "temperature"
+        api_key: Bearer token (defaults to OPENAI_API_KEY from the environment)
+
+    Returns:
+        {"content": ...} on success or {"error": ...} on failure
+    """
+    try:
+        # Behind interactive chat when a rate limit is set
+        response = chat_completion(variant, api_key=api_key, priority=BATCH)
+        return {"content": response["choices"][0]["message"]["content"]}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def run_experiments(variants: list, max_concurrency: int = DEFAULT_POOL_SIZE, api_key: str = None) -> list:
+    """
+    Run prompt variants concurrently, at most max_concurrency at a time.
+
+    Keep max_concurrency at or below HTTP_POOL_SIZE so every worker gets a
+    kept-alive connection instead of opening a throwaway one.
+
+    Args:
+        variants: List of request bodies (model, messages, temperature, ...)
+        max_concurrency: Maximum number of requests in flight
+        api_key: Bearer token (defaults to OPENAI_API_KEY from the environment)
+
+    Returns:
+        One result dict per variant, in the same order as variants
+    """
+    if not variants:
+        return []
+
+    workers = min(max_concurrency, len(variants))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda variant: run_variant(variant, api_key), variants))
@@ -0,0 +1,216 @@
+"""
+Completion Cache
+================
+Opt-in cache for chat completions that are effectively deterministic (low
+temperature). Requests are keyed on a canonical hash of every field that can
+change the answer: everything except the few in IGNORED_FIELDS (streaming and
+bookkeeping options).
+
+Two tiers, each with a TTL and a size limit:
+- memory: an LRU dict, checked first
+- disk (optional): a SQLite file, shared across restarts
+
+Enable it for every call site with COMPLETION_CACHE=memory or
+COMPLETION_CACHE=/path/to/cache.db (see get_default_cache()).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from shared.messages import encode_message
+
+# Request fields that never change the answer; every other field (max_tokens,
+# response_format, seed, stop, top_p, ...) is part of the key, including ones
+# the API adds later
+IGNORED_FIELDS = ("stream", "stream_options", "user", "metadata", "store", "service_tier")
+
+# The API default when a request has no "temperature"
+API_DEFAULT_TEMPERATURE = 1.0
+
+# How many disk writes between size-limit sweeps
+DISK_SWEEP_EVERY = 100
+
+
+def cache_key(payload: dict) -> str:
+    """Canonical SHA-256 of the parts of a request that determine the answer"""
+    canonical = {field: value for field, value in payload.items() if field not in IGNORED_FIELDS}
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"), default=encode_message)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class CompletionCache:
+    """Two-tier (memory LRU + optional SQLite) cache of chat completion responses"""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600, disk_path: str = None,
+                 disk_max_entries: int = 100_000, disk_ttl: float = 7 * 24 * 3600,
+                 max_temperature: float = 0.3):
+        """
+        Args:
+            max_entries: Memory tier size; least recently used entries are evicted
+            ttl: Seconds a memory entry stays valid
+            disk_path: SQLite file for the disk tier (None disables it)
+            disk_max_entries: Disk tier size
+            disk_ttl: Seconds a disk entry stays valid
+            max_temperature: Requests above this temperature are never cached
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_max_entries = disk_max_entries
+        self.disk_ttl = disk_ttl
+        self.max_temperature = max_temperature
+
+        self._memory = OrderedDict()    # key -> (expires_at, response)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "skipped": 0}
+
+        self._disk = None
+        self._disk_writes = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute("PRAGMA synchronous=NORMAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS completions "
+                "(key TEXT PRIMARY KEY, expires_at REAL, last_used REAL, response TEXT)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)")
+
+    def cacheable(self, payload: dict) -> bool:
+        """Only low-temperature, non-streaming requests are cached"""
+        if payload.get("stream"):
+            return False
+        temperature = payload.get("temperature")
+        if temperature is None:
+            temperature = API_DEFAULT_TEMPERATURE
+        return temperature <= self.max_temperature
+
+    def get(self, payload: dict, key: str = None):
+        """
+        Look up a cached response.
+
+        Args:
+            payload: The request
+            key: Precomputed key (e.g. a hash of an already-serialized body);
+                default cache_key(payload)
+
+        Returns:
+            The cached response dict, or None on a miss or an uncacheable request
+        """
+        if not self.cacheable(payload):
+            with self._lock:
+                self.stats["skipped"] += 1
+            return None
+
+        key = key or cache_key(payload)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, response = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return response
+                del self._memory[key]
+                self.stats["evictions"] += 1
+
+            if self._disk is not None:
+                row = self._disk.execute(
+                    "SELECT response FROM completions WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._disk.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+                    response = json.loads(row[0])
+                    self._remember(key, response, now)
+                    self.stats["disk_hits"] += 1
+                    return response
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, payload: dict, response: dict, key: str = None):
+        """Store a response for a cacheable request (others are ignored); key as in get()"""
+        if not self.cacheable(payload):
+            return
+        key = key or cache_key(payload)
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)",
+                    (key, now + self.disk_ttl, now, json.dumps(response))
+                )
+                self._disk_writes += 1
+                if self._disk_writes % DISK_SWEEP_EVERY == 0:
+                    self._sweep_disk(now)
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._disk is not None:
+                self._disk.execute("DELETE FROM completions")
+
+    def _remember(self, key: str, response: dict, now: float):
+        """Insert into the memory tier and evict the LRU entries over the limit (lock held)"""
+        self._memory[key] = (now + self.ttl, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _sweep_disk(self, now: float):
+        """Remove expired rows, then the least recently used rows over the limit (lock held)"""
+        expired = self._disk.execute("DELETE FROM completions WHERE expires_at <= ?", (now,)).rowcount
+        overflow = self._disk.execute(
+            "DELETE FROM completions WHERE key IN "
+            "(SELECT key FROM completions ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.disk_max_entries,)
+        ).rowcount
+        self.stats["evictions"] += expired + overflow
+
+
+_default_cache = None
+_default_cache_configured = False
+_default_cache_lock = threading.Lock()
+
+
+def set_default_cache(cache):
+    """Use this cache (or None to disable caching) instead of the environment setting"""
+    global _default_cache, _default_cache_configured
+    with _default_cache_lock:
+        _default_cache = cache
+        _default_cache_configured = True
+
+
+def get_default_cache():
+    """
+    Return the process-wide cache, or None when caching is off.
+
+    Unless set_default_cache() was called, it is configured from the environment:
+    COMPLETION_CACHE=memory           memory tier only
+    COMPLETION_CACHE=path/to/file.db  memory tier plus a disk tier in that file
+    COMPLETION_CACHE_MAX_TEMPERATURE  highest temperature that is cached (default 0.3)
+    """
+    global _default_cache, _default_cache_configured
+    if _default_cache_configured:
+        return _default_cache
+
+    setting = os.getenv("COMPLETION_CACHE")
+    if not setting or setting.lower() in ("0", "off", "false"):
+        return None
+    with _default_cache_lock:
+        if not _default_cache_configured:
+            _default_cache = CompletionCache(
+                disk_path=None if setting.lower() == "memory" else setting,
+                max_temperature=float(os.getenv("COMPLETION_CACHE_MAX_TEMPERATURE", 0.3))
+            )
+            _default_cache_configured = True
+    return _default_cache
+
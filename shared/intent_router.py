@@ -0,0 +1,208 @@
+"""
+Local Intent Router
+===================
+Fills the extract_meeting_intent / extract_email_intent structures with
+regular expressions instead of an LLM round trip.
+
+Those two tools only echo their arguments back, so when a message already
+contains everything (who, what, when) the agent can record the extraction
+itself and let the model go straight to trigger_n8n_webhook. When the rules
+are not confident, route() returns None and the model handles it as before.
+A wrong extraction would go straight into the webhook payload, so the rules
+give up on anything suspect: negated requests ("don't book ..."), topics cut
+down to a filler word, several different days or clock times, and dates or
+offsets the rules cannot read ("March 3", "12/03", "the 14th", "in two
+weeks"), which would otherwise leave only the clock time and book the
+wrong day.
+
+classify_intents() is a looser check, used to pick which tools a turn needs.
+"""
+
+import re
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+_DAY = r"(?:today|tomorrow|tonight|next week|(?:next |this )?(?:mon|tues|wednes|thurs|fri|satur|sun)day)"
+_CLOCK = r"(?:\d{1,2}(?::\d{2})?\s?(?:am|pm)|\d{1,2}:\d{2}|noon)"
+# After a day, "at 9" is a clock time too ("tomorrow at 9")
+_DAY_CLOCK = rf"(?:at\s+(?:{_CLOCK}|\d{{1,2}}(?![\d:]))|{_CLOCK})"
+TIME = re.compile(
+    rf"\b(?:{_DAY}(?:,?\s+{_DAY_CLOCK})?|(?:at\s+)?{_CLOCK}(?:\s+(?:on\s+)?{_DAY})?)(?!\w)",
+    re.IGNORECASE
+)
+DAY = re.compile(rf"\b{_DAY}\b", re.IGNORECASE)
+# Calendar dates and relative offsets that TIME does not understand
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_NUMBER = r"(?:a|an|one|two|three|four|five|six|couple of|few|\d+)"
+DATE = re.compile(
+    rf"\b(?:{_MONTH}\s+\d{{1,2}}(?!\d)|\d{{1,2}}(?:st|nd|rd|th)?\s+(?:of\s+)?{_MONTH}(?!\w)"
+    r"|(?:january|february|march|april|june|july|august|september|october|november|december)"
+    r"|\d{1,2}(?:st|nd|rd|th)|\d{1,2}/\d{1,2}(?:/\d{2,4})?|\d{4}-\d{2}-\d{2}"
+    rf"|in\s+(?:a\s+)?{_NUMBER}\s+(?:minute|hour|day|week|month)s?|{_NUMBER}\s+(?:day|week|month)s?\s+from"
+    r"|day after tomorrow|next month|(?:this |next )?weekend|end of (?:the )?(?:day|week|month))\b",
+    re.IGNORECASE
+)
+DURATION = re.compile(
+    r"\b(?:(\d+)\s?-?\s?(min|mins|minute|minutes|h|hr|hrs|hour|hours)|(half an hour)|(an hour))\b",
+    re.IGNORECASE
+)
+NAME = re.compile(r"\bwith\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)")
+# A "." only ends the topic at the end of a sentence, not inside an email address
+TOPIC = re.compile(r"\b(?:about|to discuss|regarding|re:)\s+(.+?)(?=[,;!?]|\.(?:\s|$)|$)", re.IGNORECASE)
+SUBJECT = re.compile(r"\bsubject(?:\s+line)?\s*(?:is|:)?\s*[\"“]([^\"”]+)[\"”]", re.IGNORECASE)
+BODY = re.compile(
+    r"\b(?:saying|that says|message(?:\s+is)?|body(?:\s+is)?)\s*:?\s*[\"“]([^\"”]+)[\"”]",
+    re.IGNORECASE
+)
+
+# "don't book", "no need to send", "cancel the meeting": not a request to act on
+NEGATION = re.compile(
+    r"\b(?:don'?t|do not|doesn'?t|does not|never|no need to|not to|shouldn'?t|cancel|stop)\b",
+    re.IGNORECASE
+)
+
+# A topic made only of these words was cut short (e.g. "the" in "about the 2pm standup")
+_FILLER = frozenset("the a an my our your his her their this that these those some".split())
+
+# A meeting needs a booking verb and a meeting noun; an email needs a sending verb and an email noun
+MEETING_REQUEST = re.compile(
+    r"\b(?:book|schedule|set up|arrange|organi[sz]e|plan)\b.*\b(?:meeting|call|sync|catch-up|1:1)\b"
+    r"|\bmeet with\b",
+    re.IGNORECASE
+)
+EMAIL_REQUEST = re.compile(
+    r"\b(?:send|write|draft)\b.*\b(?:e-?mail|message|note)\b|\be-?mail\s+(?:to\s+)?[\w.+-]+@",
+    re.IGNORECASE
+)
+
+# Looser than *_REQUEST: enough to choose the tools for a turn, not to skip the LLM.
+# "his email is ..." names an address, so a noun "email" does not count as an email request.
+MEETING_HINT = re.compile(
+    r"\b(?:meet|meets|meeting|meetings|call|sync|catch-up|1:1|calendar|invite|appointment"
+    r"|book\w*|schedul\w*|reschedul\w*)\b",
+    re.IGNORECASE
+)
+EMAIL_HINT = re.compile(
+    r"\b(?:send|write|draft|reply|forward|inbox|subject)\b"
+    r"|(?<!\bhis )(?<!\bher )(?<!\bmy )(?<!\byour )(?<!\btheir )\be-?mail\b(?!\s+(?:is|address)\b)",
+    re.IGNORECASE
+)
+
+# Words left dangling at the end of a topic once time and email phrases are cut off
+_TRAILING = re.compile(r"(?:\s+(?:on|at|for|with|and|his|her|their|email|is|next))+\s*$", re.IGNORECASE)
+
+
+def extract_time(text: str):
+    """
+    The meeting time, or None when there is none or it is ambiguous.
+
+    A day and a clock time mentioned apart ("the 2pm standup on Friday") are
+    joined ("Friday 2pm"); two different days or clock times give None, and
+    so does a date or offset TIME cannot read ("on March 3 at 3pm").
+    """
+    if DATE.search(text):
+        return None
+    phrases = [re.sub(r"^at\s+", "", match.group(0), flags=re.IGNORECASE) for match in TIME.finditer(text)]
+    full, days, clocks = set(), set(), set()
+    for phrase in phrases:
+        has_day = DAY.search(phrase) is not None
+        has_clock = re.search(r"\d|noon", phrase, re.IGNORECASE) is not None
+        (full if has_day and has_clock else days if has_day else clocks).add(phrase)
+    if full:
+        # One complete "day + time" phrase, and nothing that contradicts it
+        return next(iter(full)) if len(full) == 1 and not days and not clocks else None
+    if len({day.lower() for day in days}) > 1 or len({clock.lower() for clock in clocks}) > 1:
+        return None
+    return " ".join(sorted(days) + sorted(clocks)) or None
+
+
+def extract_duration(text: str):
+    """Duration in minutes, or None"""
+    match = DURATION.search(text)
+    if match is None:
+        return None
+    if match.group(3):
+        return 30
+    if match.group(4):
+        return 60
+    amount, unit = int(match.group(1)), match.group(2).lower()
+    return amount * 60 if unit.startswith("h") else amount
+
+
+def extract_topic(text: str):
+    match = TOPIC.search(text)
+    if match is None:
+        return None
+    topic = match.group(1)
+    # Stop at the first time, duration or email address inside the phrase
+    for pattern in (TIME, DURATION, EMAIL):
+        found = pattern.search(topic)
+        if found:
+            topic = topic[:found.start()]
+    topic = _TRAILING.sub("", topic).strip(" \"'")
+    # Only filler words left: the real topic was cut off, so do not guess
+    if not topic or all(word.lower() in _FILLER for word in topic.split()):
+        return None
+    return topic
+
+
+def classify_intents(text: str) -> list:
+    """The intents a message mentions: any of "meeting" and "email" (empty for small talk)"""
+    intents = []
+    if MEETING_HINT.search(text):
+        intents.append("meeting")
+    if EMAIL_HINT.search(text):
+        intents.append("email")
+    return intents
+
+
+class IntentRouter:
+    """Rule-based extractor for meeting and email requests"""
+
+    def __init__(self):
+        self.stats = {"routed": 0, "passed": 0}
+
+    def route(self, message: str):
+        """
+        Extract a complete meeting or email request.
+
+        Returns:
+            (tool_name, arguments) for extract_meeting_intent or
+            extract_email_intent, or None when the message is ambiguous or
+            missing required details (the LLM then handles it)
+        """
+        if NEGATION.search(message):
+            # "Please don't book ..." must never become a booking
+            self.stats["passed"] += 1
+            return None
+        meeting = self.meeting(message) if MEETING_REQUEST.search(message) else None
+        email = self.email(message) if EMAIL_REQUEST.search(message) else None
+        # Exactly one complete intent, or we are not confident
+        if (meeting is None) == (email is None):
+            self.stats["passed"] += 1
+            return None
+        self.stats["routed"] += 1
+        return ("extract_meeting_intent", meeting) if meeting else ("extract_email_intent", email)
+
+    def meeting(self, message: str):
+        """Meeting details, or None unless attendee email, topic and time are all present"""
+        emails = EMAIL.findall(message)
+        topic = extract_topic(message)
+        preferred_time = extract_time(message)
+        if len(emails) != 1 or not topic or not preferred_time:
+            return None
+        details = {"attendee_email": emails[0], "topic": topic, "preferred_time": preferred_time,
+                   "duration_minutes": extract_duration(message) or 30}
+        name = NAME.search(message)
+        if name:
+            details["attendee_name"] = name.group(1)
+        return details
+
+    def email(self, message: str):
+        """Email details, or None unless recipient, a quoted subject and a quoted message are present"""
+        emails = EMAIL.findall(message)
+        subject = SUBJECT.search(message)
+        body = BODY.search(message)
+        if len(emails) != 1 or subject is None or body is None:
+            return None
+        return {"recipient_email": emails[0], "subject": subject.group(1), "message": body.group(1)}
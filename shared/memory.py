@@ -0,0 +1,211 @@
+"""
+Conversation Memory Policies
+============================
+Keep the conversation history inside a token budget so every request stays
+roughly the same size, no matter how long the session runs.
+
+A memory policy has one method, ``apply(history) -> history``, which the
+chatbot calls after adding the user's message and before sending the request.
+
+- SlidingWindowMemory drops the oldest turns that do not fit the budget
+- SummarizingMemory folds the oldest turns into a summary in the background
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.messages import Message
+from shared.rate_limiter import BATCH
+from shared.transport import chat_completion
+
+try:
+    # Exact counts when tiktoken is installed (pip install tiktoken)
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _encoding = None
+
+# Rough average for English text when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+# Per-message overhead for role and separators in the chat format
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a string locally (no network calls)"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def message_tokens(message: dict) -> int:
+    """Estimate the tokens one chat message adds to a request"""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or []:
+        function = tool_call.get("function", {})
+        tokens += estimate_tokens(function.get("name", "")) + estimate_tokens(function.get("arguments", ""))
+    return tokens
+
+
+class SlidingWindowMemory:
+    """Keep the system prompt plus the most recent messages that fit the budget"""
+
+    def __init__(self, max_tokens: int = 2000):
+        """
+        Args:
+            max_tokens: Token budget for the whole history, system prompt included
+        """
+        self.max_tokens = max_tokens
+
+    def apply(self, history: list) -> list:
+        """
+        Trim history to the token budget.
+
+        Args:
+            history: Full conversation history, system message first
+
+        Returns:
+            The system message followed by the newest messages that fit.
+            The latest message is always kept, even if it alone is over budget.
+        """
+        if history and history[0]["role"] == "system":
+            system, messages = history[:1], history[1:]
+        else:
+            system, messages = [], history
+
+        budget = self.max_tokens - sum(message_tokens(m) for m in system)
+        kept = 0
+        for message in reversed(messages):
+            budget -= message_tokens(message)
+            if budget < 0 and kept:
+                break
+            kept += 1
+
+        window = messages[len(messages) - kept:]
+        # A tool result is meaningless without the assistant call before it
+        while len(window) > 1 and window[0]["role"] in ("tool", "function"):
+            window = window[1:]
+        return system + window
+
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+SUMMARIZE_INSTRUCTIONS = (
+    "Summarize this conversation so it can replace the original messages. "
+    "Keep names, facts, decisions, open questions and the user's goals. Be concise."
+)
+
+
+def summarize_with_llm(messages: list, model: str = "gpt-4o-mini", api_key: str = None) -> str:
+    """
+    Summarize messages with one chat completion call.
+
+    Args:
+        messages: The messages to compress
+        model: Model used for the summary
+        api_key: Bearer token (defaults to OPENAI_API_KEY from the environment)
+
+    Returns:
+        The summary text
+    """
+    transcript = "\n".join(f"{m['role'].capitalize()}: {m.get('content') or ''}" for m in messages)
+    response = chat_completion({
+        "model": model,
+        "messages": [
+            {"role": "system", "content": SUMMARIZE_INSTRUCTIONS},
+            {"role": "user", "content": transcript}
+        ]
+    }, api_key=api_key, priority=BATCH)     # background work: the chat itself goes first
+    return response["choices"][0]["message"]["content"]
+
+
+class SummarizingMemory:
+    """
+    Compress the oldest turns into one summary message in the background.
+
+    Once history passes max_turns, the oldest summarize_turns turns (plus any
+    earlier summary) are handed to a worker thread. The chat keeps going with
+    the full history meanwhile; the summary is swapped in on the first
+    apply() after it is ready, in a single list replacement.
+    """
+
+    def __init__(self, max_turns: int = 20, summarize_turns: int = 10, summarize=summarize_with_llm):
+        """
+        Args:
+            max_turns: Start compressing when history has more user/assistant turns than this
+            summarize_turns: How many of the oldest turns to fold into the summary
+            summarize: Function taking a list of messages and returning summary text
+        """
+        self.max_turns = max_turns
+        self.summarize_turns = summarize_turns
+        self.summarize = summarize
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="memory-summary")
+        self._pending = None        # (future, messages being summarized)
+
+    def apply(self, history: list) -> list:
+        """
+        Swap in a finished summary and start a new one if history is too long.
+
+        Args:
+            history: Full conversation history, system message first
+
+        Returns:
+            The history to keep; never waits for the summarizer
+        """
+        history = self._swap_in_summary(history)
+
+        if self._pending is None and self._count_turns(history) > self.max_turns:
+            chunk = self._oldest_chunk(history)
+            if chunk:
+                future = self._executor.submit(self.summarize, chunk)
+                self._pending = (future, chunk)
+        return history
+
+    def _swap_in_summary(self, history: list) -> list:
+        if self._pending is None or not self._pending[0].done():
+            return history
+
+        future, chunk = self._pending
+        self._pending = None
+        try:
+            summary = future.result()
+        except Exception as e:
+            print(f"⚠️  Warning: summarizing history failed: {e}")
+            return history
+
+        # Only swap if the summarized messages are still where we left them
+        # (clear_history may have reset the conversation meanwhile)
+        start = 1 if history and history[0]["role"] == "system" else 0
+        current = history[start:start + len(chunk)]
+        if len(current) != len(chunk) or any(a is not b for a, b in zip(current, chunk)):
+            return history
+
+        summary_message = Message("system", SUMMARY_PREFIX + summary)
+        return history[:start] + [summary_message] + history[start + len(chunk):]
+
+    def _count_turns(self, history: list) -> int:
+        return sum(1 for m in history if m["role"] == "user")
+
+    def _oldest_chunk(self, history: list) -> list:
+        """Oldest messages to summarize, ending right before a user message"""
+        start = 1 if history and history[0]["role"] == "system" else 0
+        end = start
+        if end < len(history) and self._is_summary(history[end]):
+            end += 1
+
+        turns = 0
+        while end < len(history):
+            if history[end]["role"] == "user":
+                if turns == self.summarize_turns:
+                    break
+                turns += 1
+            end += 1
+
+        # Never summarize the newest message, it has not been answered yet
+        end = min(end, len(history) - 1)
+        return history[start:end]
+
+    def _is_summary(self, message: dict) -> bool:
+        return message["role"] == "system" and (message.get("content") or "").startswith(SUMMARY_PREFIX)
@@ -0,0 +1,118 @@
+"""
+Compact Chat Messages
+=====================
+A slotted message type for conversation history. Each message is a small
+fixed-size object with an interned role instead of a fresh dict, and is only
+turned into the wire-format dict when a request is built (``to_wire``).
+
+Messages still support ``message["role"]`` and ``message.get("content")``,
+so code written against plain dicts keeps working.
+"""
+
+import sys
+
+
+class ToolCall:
+    """One tool/function call requested by the model"""
+
+    __slots__ = ("id", "name", "arguments")
+
+    def __init__(self, name: str, arguments: str, id: str = None):
+        self.id = id
+        self.name = sys.intern(name)
+        self.arguments = arguments
+
+    def to_dict(self) -> dict:
+        """Tools API format: {"id", "type", "function": {"name", "arguments"}}"""
+        return {
+            "id": self.id,
+            "type": "function",
+            "function": {"name": self.name, "arguments": self.arguments}
+        }
+
+    def to_function_call(self) -> dict:
+        """Legacy functions API format: {"name", "arguments"}"""
+        return {"name": self.name, "arguments": self.arguments}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ToolCall":
+        function = data.get("function", data)
+        return cls(function["name"], function["arguments"], data.get("id"))
+
+    def __repr__(self):
+        return f"ToolCall({self.name!r}, {self.arguments!r}, id={self.id!r})"
+
+
+class Message:
+    """One chat message: role, content and optional tool-call fields"""
+
+    __slots__ = ("role", "content", "name", "tool_calls", "tool_call_id", "function_call", "seq")
+
+    def __init__(self, role: str, content: str = None, name: str = None, tool_calls: list = None,
+                 tool_call_id: str = None, function_call: ToolCall = None):
+        self.role = sys.intern(role)
+        self.content = content
+        self.name = sys.intern(name) if name else None
+        self.tool_calls = tool_calls
+        self.tool_call_id = tool_call_id
+        self.function_call = function_call
+        self.seq = None         # position in a stored session once saved (shared/session_store.py)
+
+    def to_dict(self) -> dict:
+        """Wire-format dict for the chat completions API"""
+        data = {"role": self.role, "content": self.content}
+        if self.name is not None:
+            data["name"] = self.name
+        if self.tool_calls:
+            data["tool_calls"] = [tool_call.to_dict() for tool_call in self.tool_calls]
+        if self.tool_call_id is not None:
+            data["tool_call_id"] = self.tool_call_id
+        if self.function_call is not None:
+            data["function_call"] = self.function_call.to_function_call()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Message":
+        tool_calls = data.get("tool_calls")
+        function_call = data.get("function_call")
+        return cls(
+            data["role"],
+            data.get("content"),
+            name=data.get("name"),
+            tool_calls=[ToolCall.from_dict(tc) for tc in tool_calls] if tool_calls else None,
+            tool_call_id=data.get("tool_call_id"),
+            function_call=ToolCall.from_dict(function_call) if function_call else None
+        )
+
+    # Dict-style read access, so history code written for dicts still works
+    def __getitem__(self, key: str):
+        if key not in self.__slots__ or key == "seq":
+            raise KeyError(key)
+        value = getattr(self, key)
+        if key == "tool_calls" and value:
+            return [tool_call.to_dict() for tool_call in value]
+        if key == "function_call" and value is not None:
+            return value.to_function_call()
+        return value
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"Message({self.role!r}, {self.content!r})"
+
+
+def to_wire(messages: list) -> list:
+    """Convert a history (Message objects or plain dicts) to wire-format dicts"""
+    return [m.to_dict() if isinstance(m, Message) else m for m in messages]
+
+
+def encode_message(obj):
+    """json.dumps default= hook for Message objects"""
+    if isinstance(obj, (Message, ToolCall)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
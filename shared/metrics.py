@@ -0,0 +1,276 @@
+"""
+LLM Call Metrics
+================
+Timing for every completion call, so model slowness can be told apart from
+our own overhead:
+
+- time_to_headers: request sent -> response headers (connect + queueing +
+  model start; the SDKs expose no separate connect hook)
+- ttft: time to first token (streaming calls)
+- inter_token: gap between consecutive streamed tokens
+- total: the whole call
+- prompt / completion token counters
+
+Latencies go into HDR-style log-linear histograms (fixed relative error,
+O(1) record, a few KB each). Export them as Prometheus text (metrics
+endpoint or ``prometheus_text()``) or append one JSON line per call by
+setting LLM_METRICS_JSONL=path/to/calls.jsonl.
+
+    with get_metrics().track("chat") as timer:
+        stream = client.chat.completions.create(..., stream=True)
+        timer.headers()
+        for chunk in stream:
+            timer.token()
+        timer.usage(chunk.usage)
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HISTOGRAMS = {
+    "time_to_headers": "Seconds from sending the request to the response headers",
+    "ttft": "Seconds to the first streamed token",
+    "inter_token": "Seconds between consecutive streamed tokens",
+    "total": "Seconds for the whole completion call",
+}
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of durations, HdrHistogram style.
+
+    Values are stored in microseconds. Every power-of-two range is split
+    into 2**SUB_BUCKET_BITS buckets, so any reported value is within
+    1/2**SUB_BUCKET_BITS (under 1%) of the recorded one.
+    """
+
+    SUB_BUCKET_BITS = 7
+
+    def __init__(self):
+        self._counts = {}       # bucket index -> count
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        micros = max(1, int(seconds * 1_000_000))
+        shift = max(0, micros.bit_length() - self.SUB_BUCKET_BITS - 1)
+        index = (shift << self.SUB_BUCKET_BITS) + (micros >> shift)
+        self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Value (seconds) at quantile q in [0, 1]; 0.0 when empty"""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(q * self.count))
+        seen = 0
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen >= rank:
+                return min(self._bucket_upper(index) / 1_000_000, self.max)
+        return self.max
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else 0.0,
+            **{f"p{round(q * 100)}": self.percentile(q) for q in QUANTILES},
+            "max": self.max,
+        }
+
+    def _bucket_upper(self, index: int) -> int:
+        bits = self.SUB_BUCKET_BITS
+        if index < 1 << (bits + 1):
+            return index
+        shift = (index >> bits) - 1
+        top = index - (shift << bits)
+        return ((top + 1) << shift) - 1
+
+
+class CompletionTimer:
+    """Timestamps for one completion call; create it with LLMMetrics.track()"""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self.start = time.perf_counter()
+        self.time_to_headers = None
+        self.ttft = None
+        self.gaps = []
+        self.tokens = 0
+        self.prompt_tokens = None
+        self.completion_tokens = None
+        self._last_token = None
+
+    def headers(self, elapsed: float = None):
+        """Mark the response headers as received (or pass requests' response.elapsed)"""
+        self.time_to_headers = elapsed if elapsed is not None else time.perf_counter() - self.start
+
+    def token(self):
+        """Mark one streamed token/chunk as received"""
+        now = time.perf_counter()
+        if self._last_token is None:
+            self.ttft = now - self.start
+        else:
+            self.gaps.append(now - self._last_token)
+        self._last_token = now
+        self.tokens += 1
+
+    def usage(self, usage):
+        """Record token counts from a response's usage (dict or SDK object; None is ignored)"""
+        if usage is None:
+            return
+        if isinstance(usage, dict):
+            self.prompt_tokens = usage.get("prompt_tokens")
+            self.completion_tokens = usage.get("completion_tokens")
+        else:
+            self.prompt_tokens = getattr(usage, "prompt_tokens", None)
+            self.completion_tokens = getattr(usage, "completion_tokens", None)
+
+
+class LLMMetrics:
+    """Histograms and counters per operation (e.g. "chat_completion", "streaming_chatbot")"""
+
+    def __init__(self, jsonl_path: str = None):
+        """
+        Args:
+            jsonl_path: Optional file to append one JSON line per finished call
+        """
+        self.jsonl_path = jsonl_path
+        self.last = None            # record of the most recent call
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, operation: str):
+        """Time the calls inside the block; exceptions are counted as errors and re-raised"""
+        timer = CompletionTimer(operation)
+        try:
+            yield timer
+        except Exception as e:
+            self.record(timer, error=type(e).__name__)
+            raise
+        self.record(timer)
+
+    def record(self, timer: CompletionTimer, error: str = None):
+        total = time.perf_counter() - timer.start
+        with self._lock:
+            stats = self._operations.get(timer.operation)
+            if stats is None:
+                stats = self._operations[timer.operation] = {
+                    "histograms": {name: LatencyHistogram() for name in HISTOGRAMS},
+                    "requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                }
+            histograms = stats["histograms"]
+            stats["requests"] += 1
+            if error is not None:
+                stats["errors"] += 1
+            else:
+                histograms["total"].record(total)
+                if timer.time_to_headers is not None:
+                    histograms["time_to_headers"].record(timer.time_to_headers)
+                if timer.ttft is not None:
+                    histograms["ttft"].record(timer.ttft)
+                for gap in timer.gaps:
+                    histograms["inter_token"].record(gap)
+            stats["prompt_tokens"] += timer.prompt_tokens or 0
+            stats["completion_tokens"] += timer.completion_tokens or 0
+
+            self.last = {
+                "ts": time.time(),
+                "operation": timer.operation,
+                "error": error,
+                "total": total,
+                "time_to_headers": timer.time_to_headers,
+                "ttft": timer.ttft,
+                "mean_inter_token": sum(timer.gaps) / len(timer.gaps) if timer.gaps else None,
+                "tokens": timer.tokens,
+                "prompt_tokens": timer.prompt_tokens,
+                "completion_tokens": timer.completion_tokens,
+            }
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a") as f:
+                    f.write(json.dumps(self.last) + "\n")
+
+    def snapshot(self) -> dict:
+        """{operation: {"requests", "errors", tokens..., histogram name: summary dict}}"""
+        with self._lock:
+            return {
+                operation: {
+                    **{key: value for key, value in stats.items() if key != "histograms"},
+                    **{name: histogram.snapshot() for name, histogram in stats["histograms"].items()},
+                }
+                for operation, stats in self._operations.items()
+            }
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format (histograms as summaries)"""
+        lines = []
+        with self._lock:
+            operations = sorted(self._operations.items())
+            for name, help_text in HISTOGRAMS.items():
+                metric = f"llm_{name}_seconds"
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+                for operation, stats in operations:
+                    histogram = stats["histograms"][name]
+                    for q in QUANTILES:
+                        lines.append(f'{metric}{{operation="{operation}",quantile="{q}"}} '
+                                     f'{histogram.percentile(q):.6f}')
+                    lines.append(f'{metric}_sum{{operation="{operation}"}} {histogram.sum:.6f}')
+                    lines.append(f'{metric}_count{{operation="{operation}"}} {histogram.count}')
+            for counter in ("requests", "errors", "prompt_tokens", "completion_tokens"):
+                metric = f"llm_{counter}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for operation, stats in operations:
+                    lines.append(f'{metric}{{operation="{operation}"}} {stats[counter]}')
+        return "\n".join(lines) + "\n"
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> LLMMetrics:
+    """Return the process-wide metrics registry (JSON lines go to LLM_METRICS_JSONL if set)"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = LLMMetrics(jsonl_path=os.getenv("LLM_METRICS_JSONL"))
+    return _metrics
+
+
+def start_metrics_server(port: int = 9100, metrics: LLMMetrics = None):
+    """
+    Serve metrics at http://localhost:<port>/metrics for Prometheus to scrape.
+
+    Returns:
+        The server (call server.shutdown() to stop it)
+    """
+    metrics = metrics or get_metrics()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
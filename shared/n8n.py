@@ -0,0 +1,120 @@
+"""
+n8n Action Delivery
+===================
+How the day 3 agents hand an action (book a meeting, send an email) to the
+n8n workflow, written once for both agent versions.
+
+Nothing is built when this module is imported: the webhook client, and the
+optional queue and batcher, are created from the environment on the first
+action, so importing an agent starts no threads and opens no files.
+
+N8N_WEBHOOK_URL      the workflow's webhook (pooled connections, timeouts,
+                     retries and a circuit breaker, see shared/webhook.py)
+N8N_ACTION_QUEUE     optional SQLite file, e.g. actions.db: actions are queued
+                     on disk and the user is answered right away; background
+                     workers deliver them (see shared/action_queue.py)
+N8N_BATCH_WINDOW_MS  optional, e.g. 50: send_email actions made within 50 ms of
+                     each other go out as one send_email_batch call
+                     (see shared/webhook_batch.py)
+"""
+
+import json
+import os
+import threading
+
+from shared.action_queue import ActionQueue
+from shared.webhook import WebhookClient, WebhookError
+from shared.webhook_batch import WebhookBatcher
+
+DEFAULT_WEBHOOK_URL = "https://your-n8n-instance.com/webhook/personal-assistant"
+
+
+class N8nActions:
+    """The webhook client, plus the optional action queue and batcher in front of it"""
+
+    def __init__(self, url: str, queue_path: str = None, batch_window: float = None):
+        """
+        Args:
+            url: n8n webhook URL
+            queue_path: SQLite file for a durable action queue (None: call n8n directly)
+            batch_window: Seconds to collect send_email actions into one batch (None: no batching)
+        """
+        self.webhook = WebhookClient(url)
+        self.queue = ActionQueue(queue_path, self.webhook) if queue_path else None
+        self.batcher = WebhookBatcher(self.webhook, window=batch_window) if batch_window else None
+
+    def send(self, payload: dict) -> dict:
+        """
+        Deliver one action payload ({"action": ..., **fields}).
+
+        Returns:
+            n8n's response, or {"status": "accepted", "ticket": ...} when queued
+
+        Raises:
+            WebhookError: n8n could not be called (see WebhookClient.post)
+        """
+        if self.queue is not None:
+            # Queued on disk; the user gets a ticket instead of waiting for n8n
+            return self.queue.enqueue(payload)
+        if self.batcher is not None and payload["action"] in self.batcher.batch_actions:
+            # Waits for the batch this email joined; returns this email's result
+            return self.batcher.post(payload)
+        return self.webhook.post(payload)
+
+
+_n8n = None
+_n8n_lock = threading.Lock()
+
+
+def set_n8n(actions):
+    """Use this N8nActions (or None to rebuild from the environment on next use)"""
+    global _n8n
+    with _n8n_lock:
+        _n8n = actions
+
+
+def get_n8n() -> N8nActions:
+    """Return the process-wide N8nActions, built from the environment on first use"""
+    global _n8n
+    if _n8n is None:
+        with _n8n_lock:
+            if _n8n is None:
+                window = os.getenv("N8N_BATCH_WINDOW_MS")
+                _n8n = N8nActions(
+                    os.getenv("N8N_WEBHOOK_URL", DEFAULT_WEBHOOK_URL),
+                    queue_path=os.getenv("N8N_ACTION_QUEUE") or None,
+                    batch_window=float(window) / 1000 if window else None
+                )
+    return _n8n
+
+
+def trigger_n8n_webhook(action: str, data: dict) -> str:
+    """
+    Trigger an n8n workflow via webhook.
+
+    Args:
+        action: The action type ("book_meeting" or "send_email")
+        data: Structured data for the action
+
+    Returns:
+        JSON string with the result from n8n
+    """
+    try:
+        # Combine action and data into flat payload
+        payload = {
+            "action": action,
+            **data  # Spread data fields at top level
+        }
+
+        print(f"📤 Sending to n8n: {json.dumps(payload, indent=2)}")
+        result = get_n8n().send(payload)
+        print(f"📥 Response from n8n: {json.dumps(result, indent=2)}")
+        return json.dumps(result)
+    except WebhookError as e:
+        error_msg = str(e)
+        print(f"❌ Error: {error_msg}")
+        return json.dumps({"status": "error", "message": error_msg})
+    except Exception as e:
+        error_msg = str(e)
+        print(f"❌ Error: {error_msg}")
+        return json.dumps({"status": "error", "message": error_msg})
@@ -0,0 +1,173 @@
+"""
+Prompt-Prefix Request Builder
+=============================
+Builds chat completion request bodies whose static part - model, tool
+schemas and system prompt - is serialized once and stays byte-identical
+at the front of every request.
+
+Providers cache prompts by prefix: OpenAI (and most OpenRouter models)
+automatically bill the repeated part of a prompt as cached tokens once it
+is 1024 tokens or longer; Anthropic and Gemini models on OpenRouter need an
+explicit ``cache_control`` marker, which is added to the system prompt for
+those models. Either way the prefix must not change between requests.
+
+The SDK would re-encode the tools and the whole history on every call. Here
+the prefix is encoded at construction and each history message is encoded
+once, the first time it is sent, so a request costs one join of bytes.
+
+    request = PromptPrefixRequest(model, system_prompt, tools=tools, tool_choice="auto")
+    response = request.create(client, conversation_history)
+"""
+
+import hashlib
+import json
+
+from openai import Stream
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+from shared.messages import Message
+from shared.metrics import get_metrics
+from shared.rate_limiter import INTERACTIVE, body_tokens, get_limiter
+
+# OpenRouter models that only cache prompts marked with cache_control
+CACHE_HINT_PREFIXES = ("anthropic/", "google/gemini")
+
+# Compact and stable: the same input always gives the same bytes
+SEPARATORS = (",", ":")
+
+
+def supports_cache_hints(model: str) -> bool:
+    """True for models that need an explicit cache_control breakpoint"""
+    return model.startswith(CACHE_HINT_PREFIXES)
+
+
+def encode(obj) -> bytes:
+    return json.dumps(obj, separators=SEPARATORS).encode()
+
+
+class PromptPrefixRequest:
+    """Request bodies for one model, system prompt and tool set"""
+
+    def __init__(self, model: str, system_prompt: str, tools: list = None, tool_choice=None,
+                 functions: list = None, function_call=None, cache_hint: bool = None):
+        """
+        Args:
+            model: Model name
+            system_prompt: The system message; it is always the first message
+            tools: Tool schemas (tools API)
+            tool_choice: e.g. "auto"
+            functions: Function schemas (legacy functions API)
+            function_call: e.g. "auto"
+            cache_hint: Mark the prefix with cache_control (default: only for models that need it)
+        """
+        if cache_hint is None:
+            cache_hint = supports_cache_hints(model)
+
+        # Key order follows the order providers build the prompt in: tools, then messages
+        self.static = {"model": model}
+        for field, value in (("tools", tools), ("tool_choice", tool_choice),
+                             ("functions", functions), ("function_call", function_call)):
+            if value is not None:
+                self.static[field] = value
+
+        system = {"role": "system", "content": system_prompt}
+        if cache_hint:
+            # Breakpoint at the end of the system prompt: tools + system prompt are cached
+            system["content"] = [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+        # '{"model":...,"tools":[...],"messages":[{system}' - serialized once
+        self.prefix = encode(self.static)[:-1] + b',"messages":[' + encode(system)
+        self._encoded = []      # (message, its JSON) for the messages sent so far
+
+    def encode_messages(self, messages: list) -> list:
+        """
+        JSON for each message, reusing the encoding of messages already sent.
+
+        The history is expected to grow by appending; if an earlier message
+        was replaced (e.g. by a memory policy), everything from there on is
+        encoded again.
+        """
+        encoded = self._encoded
+        reused = 0
+        for message, (seen, _) in zip(messages, encoded):
+            if message is not seen:
+                break
+            reused += 1
+        del encoded[reused:]
+        for message in messages[reused:]:
+            encoded.append((message, encode(message.to_dict() if isinstance(message, Message) else message)))
+        return [data for _, data in encoded]
+
+    def body(self, history: list, **extra) -> bytes:
+        """
+        The request body for a conversation.
+
+        Args:
+            history: The conversation; history[0] is the system message and is
+                replaced by the pre-serialized prefix
+            **extra: Other request fields (e.g. stream=True), added after the messages
+        """
+        parts = [self.prefix]
+        for data in self.encode_messages(history[1:]):
+            parts.append(b"," + data)
+        parts.append(b"]")
+        if extra:
+            parts.append(b"," + encode(extra)[1:-1])
+        parts.append(b"}")
+        return b"".join(parts)
+
+    def create(self, client, history: list, cache=None, stream: bool = False, priority: int = INTERACTIVE,
+               **extra):
+        """
+        Send the request through an OpenAI SDK client (same auth, retries and typed responses).
+
+        Args:
+            client: OpenAI client
+            history: The conversation, system message first
+            cache: Optional CompletionCache (keyed on the body bytes)
+            stream: Return a stream of ChatCompletionChunk instead of a ChatCompletion
+            priority: INTERACTIVE or BATCH, for the rate limiter (LLM_RATE_LIMIT_RPM/TPM)
+            **extra: Other request fields, e.g. temperature or stream_options
+
+        Returns:
+            ChatCompletion, or Stream[ChatCompletionChunk] when stream=True
+        """
+        options = {"headers": {"Content-Type": "application/json"}}
+        limiter = get_limiter()
+        if limiter is not None:
+            # The limiter retries 429s itself, after pausing every caller
+            options["max_retries"] = 0
+
+        if stream:
+            body = self.body(history, stream=True, **extra)
+
+            def open_stream():
+                return client.post("/chat/completions", content=body, cast_to=ChatCompletion, options=options,
+                                   stream=True, stream_cls=Stream[ChatCompletionChunk])
+
+            if limiter is None:
+                return open_stream()
+            # Usage only arrives at the end of a stream, so the estimate stands
+            return limiter.call(open_stream, body_tokens(body, extra.get("max_tokens")), priority)
+
+        body = self.body(history, **extra)
+        payload = dict(self.static, **extra)        # what the cache needs to decide cacheability
+        key = hashlib.sha256(body).hexdigest() if cache is not None else None
+        cached = cache.get(payload, key=key) if cache is not None else None
+        if cached is not None:
+            return ChatCompletion.model_validate(cached)
+
+        def post():
+            with get_metrics().track("chat_completion") as timer:
+                response = client.post("/chat/completions", content=body, cast_to=ChatCompletion, options=options)
+                timer.usage(response.usage)
+            return response
+
+        if limiter is None:
+            response = post()
+        else:
+            response = limiter.call(post, body_tokens(body, extra.get("max_tokens")), priority,
+                                    usage=lambda response: response.usage.total_tokens if response.usage else None)
+        if cache is not None:
+            cache.put(payload, response.to_dict(), key=key)
+        return response
@@ -0,0 +1,303 @@
+"""
+LLM Providers and Latency-Aware Routing
+=======================================
+One layer for every OpenAI-compatible backend (OpenAI, OpenRouter, a local
+stub), so a request can go to whichever configured backend and model is
+answering best right now.
+
+- every backend keeps an exponentially weighted moving average (EWMA) of its
+  latency, the latency's deviation and its error rate, updated by every call
+- requests go to the backend with the lowest latency, penalised by its error
+  rate; a backend that has not been tried, or not for PROBE_AFTER seconds,
+  goes first so its numbers stay current
+- hedging: if the chosen backend has not answered after its usual latency
+  plus 4 deviations (the TCP retransmit-timer formula), the same request is
+  also sent to the next backend and the first answer wins. Only slow
+  outliers are duplicated, which cuts tail latency for a few percent extra
+  requests
+- failover: an error moves the request to the next backend straight away.
+  A request the API rejects as invalid (400, 401, 403, 404, 422) is raised
+  at once instead: every backend would reject it, and it says nothing about
+  the backend's health
+
+Only the synchronous client goes through the router: shared.async_client
+talks to OPENROUTER_BASE_URL (or api.openai.com) directly, whatever
+LLM_BACKENDS says.
+
+Configure backends with LLM_BACKENDS (a JSON list), e.g.
+
+    LLM_BACKENDS=[{"name": "openrouter", "base_url": "https://openrouter.ai/api/v1",
+                   "api_key_env": "OPENROUTER_API_KEY", "model": "openai/gpt-4o-mini"},
+                  {"name": "openai", "base_url": "https://api.openai.com/v1",
+                   "api_key_env": "OPENAI_API_KEY", "model": "gpt-4o-mini"}]
+
+Each entry may also set "timeout" (seconds per request, default 60) and
+"max_retries". LLM_HEDGE_AFTER_MS sets a fixed hedge delay (0 turns hedging off).
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from openai import OpenAI
+
+# EWMA weight of the newest sample
+EWMA_ALPHA = 0.2
+
+# Each unit of error rate (0..1) counts as this many times the latency
+ERROR_PENALTY = 10
+
+# Seconds after which an idle backend is tried again to refresh its numbers
+PROBE_AFTER = 30
+
+# Hedge delay = latency + HEDGE_DEVIATIONS * deviation, but at least MIN_HEDGE_DELAY
+HEDGE_DEVIATIONS = 4
+MIN_HEDGE_DELAY = 0.01
+
+# 4xx statuses that mean "try again" rather than "this request is wrong"
+RETRYABLE_CLIENT_ERRORS = (408, 409, 429)
+
+
+def retryable(error: Exception) -> bool:
+    """False for an API error that another backend would answer the same way (a bad request)"""
+    status = getattr(error, "status_code", None)
+    return status is None or not 400 <= status < 500 or status in RETRYABLE_CLIENT_ERRORS
+
+
+class Backend:
+    """One OpenAI-compatible endpoint and model, with live latency and error statistics"""
+
+    def __init__(self, name: str, base_url: str, api_key: str, model: str, max_retries: int = 2,
+                 timeout: float = 60):
+        """
+        Args:
+            name: Label for stats and logs
+            base_url: API base URL, e.g. https://openrouter.ai/api/v1
+            api_key: Bearer token
+            model: Model used for requests sent to this backend
+            max_retries: The SDK's own retries (the router fails over instead, so 0 when routing)
+            timeout: Seconds per request
+        """
+        self.name = name
+        self.base_url = base_url
+        self.model = model
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=max_retries, timeout=timeout)
+
+        self.latency = None         # EWMA seconds, None until the first answer
+        self.deviation = 0.0        # EWMA of |sample - latency|
+        self.error_rate = 0.0       # EWMA of 0 (success) / 1 (error)
+        self.last_used = None
+        self.stats = {"requests": 0, "errors": 0, "wins": 0, "hedges": 0}
+
+    def record(self, seconds: float = None, error: bool = False):
+        """Fold one finished call into the averages (caller holds the router lock)"""
+        self.stats["requests"] += 1
+        self.last_used = time.monotonic()
+        self.error_rate += EWMA_ALPHA * ((1.0 if error else 0.0) - self.error_rate)
+        if error:
+            self.stats["errors"] += 1
+            return
+        if self.latency is None:
+            self.latency, self.deviation = seconds, seconds / 2
+        else:
+            self.deviation += EWMA_ALPHA * (abs(seconds - self.latency) - self.deviation)
+            self.latency += EWMA_ALPHA * (seconds - self.latency)
+
+    def score(self, now: float) -> float:
+        """Lower is better; 0 for a backend that needs a (new) sample"""
+        if self.last_used is None or now - self.last_used > PROBE_AFTER:
+            return 0.0
+        if self.latency is None:
+            return float("inf")     # only errors so far
+        return self.latency * (1 + ERROR_PENALTY * self.error_rate)
+
+    def hedge_delay(self) -> float:
+        if self.latency is None:
+            return None
+        return max(MIN_HEDGE_DELAY, self.latency + HEDGE_DEVIATIONS * self.deviation)
+
+    def __repr__(self):
+        latency = f"{self.latency * 1000:.0f} ms" if self.latency is not None else "untried"
+        return f"Backend({self.name!r}, {self.model!r}, {latency}, errors {self.error_rate:.0%})"
+
+
+class ProviderRouter:
+    """Sends each request to the best backend, with hedging and failover"""
+
+    def __init__(self, backends: list, hedge_after: float = None, hedging: bool = True, max_workers: int = 32):
+        """
+        Args:
+            backends: Backend objects, in order of preference for ties
+            hedge_after: Fixed hedge delay in seconds (default: from each backend's latency EWMA)
+            hedging: Send a duplicate to the next backend when the first one is slow
+            max_workers: Most requests in flight at once (hedges included)
+        """
+        if not backends:
+            raise ValueError("ProviderRouter needs at least one backend")
+        self.backends = list(backends)
+        self.hedge_after = hedge_after
+        self.hedging = hedging and len(self.backends) > 1
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm") \
+            if len(self.backends) > 1 else None
+
+    def ranked(self) -> list:
+        """Backends from best to worst right now"""
+        now = time.monotonic()
+        with self._lock:
+            return sorted(self.backends, key=lambda backend: backend.score(now))
+
+    def call(self, request):
+        """
+        Run request(backend) on the best backend, hedging and failing over as needed.
+
+        Args:
+            request: Function (backend) -> result, e.g. a completion call on
+                backend.client with model=backend.model. It returns once the
+                response (or, for streams, its headers) has arrived.
+
+        Returns:
+            The first successful result. A losing stream is closed.
+
+        Raises:
+            The last backend's exception when every backend failed, or at
+            once a non-retryable API error (see retryable())
+        """
+        if self._executor is None:
+            # One backend: nothing to choose, just keep its numbers
+            return self._attempt(request, self.backends[0], None)
+
+        ranked = self.ranked()
+        race = {"winner": None}
+        pending = {}
+        error = None
+
+        def start(backend):
+            pending[self._executor.submit(self._attempt, request, backend, race)] = backend
+
+        start(ranked.pop(0))
+        hedged = False
+        while pending:
+            timeout = None
+            if self.hedging and not hedged and ranked:
+                first = next(iter(pending.values()))
+                timeout = self.hedge_after if self.hedge_after is not None else first.hedge_delay()
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The request is slower than this backend usually is: hedge
+                hedged = True
+                backend = ranked.pop(0)
+                with self._lock:
+                    backend.stats["hedges"] += 1
+                start(backend)
+                continue
+            for future in done:
+                backend = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if not retryable(e):
+                        if race["winner"] is backend:
+                            raise
+                        continue    # another backend already answered
+                    error = e
+                    # The winner may be in this same batch (or about to be): no failover then
+                    if ranked and race["winner"] is None:
+                        start(ranked.pop(0))
+                    continue
+                if race["winner"] is backend:
+                    return result
+        raise error
+
+    def _attempt(self, request, backend: Backend, race: dict):
+        """One call on one backend; records its latency or error"""
+        start = time.perf_counter()
+        try:
+            result = request(backend)
+        except Exception as e:
+            with self._lock:
+                if retryable(e):
+                    backend.record(error=True)
+                elif race is not None and race["winner"] is None:
+                    # The request itself is bad: end the race so a duplicate still running is closed
+                    race["winner"] = backend
+            raise
+        with self._lock:
+            backend.record(time.perf_counter() - start)
+            if race is None or race["winner"] is None:
+                if race is not None:
+                    race["winner"] = backend
+                backend.stats["wins"] += 1
+                return result
+        # Lost the race: nobody will read this result
+        close = getattr(result, "close", None)
+        if close is not None:
+            close()
+        return result
+
+    def create(self, **request):
+        """client.chat.completions.create(**request) on the best backend (model set per backend)"""
+        return self.call(lambda backend: backend.client.chat.completions.create(**dict(request, model=backend.model)))
+
+    def chat_completion(self, payload: dict) -> dict:
+        """Like shared.transport.chat_completion: a request dict in, the response dict out"""
+        return self.create(**payload).to_dict()
+
+    def snapshot(self) -> list:
+        """Per-backend averages and counters"""
+        with self._lock:
+            return [
+                {"name": b.name, "model": b.model, "latency": b.latency, "deviation": b.deviation,
+                 "error_rate": b.error_rate, **b.stats}
+                for b in self.backends
+            ]
+
+
+def backends_from_config(config: list, max_retries: int = 0) -> list:
+    """Backend objects from LLM_BACKENDS-style dicts (api_key or api_key_env; optional timeout, max_retries)"""
+    return [
+        Backend(
+            item.get("name") or item["model"],
+            item["base_url"],
+            item.get("api_key") or os.getenv(item.get("api_key_env", "OPENAI_API_KEY")),
+            item["model"],
+            max_retries=item.get("max_retries", max_retries),
+            timeout=item.get("timeout", 60)
+        )
+        for item in config
+    ]
+
+
+_router = None
+_router_configured = False
+_router_lock = threading.Lock()
+
+
+def get_router():
+    """
+    Return the process-wide router built from LLM_BACKENDS, or None when it is not set.
+
+    LLM_HEDGE_AFTER_MS  fixed hedge delay in milliseconds (0 turns hedging off)
+    """
+    global _router, _router_configured
+    if _router_configured:
+        return _router
+    with _router_lock:
+        if not _router_configured:
+            config = os.getenv("LLM_BACKENDS")
+            if config:
+                hedge_after = os.getenv("LLM_HEDGE_AFTER_MS")
+                _router = ProviderRouter(
+                    backends_from_config(json.loads(config)),
+                    hedge_after=float(hedge_after) / 1000 if hedge_after else None,
+                    hedging=hedge_after != "0"
+                )
+            _router_configured = True
+    return _router
+
+
+def router_or_default(name: str, base_url: str, api_key: str, model: str) -> ProviderRouter:
+    """The LLM_BACKENDS router if configured, else a router over this single backend"""
+    return get_router() or ProviderRouter([Backend(name, base_url, api_key, model)])
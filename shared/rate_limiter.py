@@ -0,0 +1,365 @@
+"""
+Client-Side Rate Limiter
+========================
+Keeps LLM calls under the provider's requests-per-minute (RPM) and
+tokens-per-minute (TPM) limits, so many chatbot, agent and batch sessions in
+one process queue briefly on our side instead of bouncing off 429 errors.
+
+- two token buckets: one request, and the request's estimated tokens
+  (prompt + max_tokens, estimated locally before sending), must fit before
+  a call goes out; a response that used more than estimated is charged the rest
+- a 429 pauses every caller for the server's Retry-After, then the call is
+  retried (the SDK's own retries are turned off while the limiter is on)
+- waiting callers form a priority queue: interactive chat (INTERACTIVE)
+  goes ahead of batch jobs and background summaries (BATCH); equal
+  priorities are served first come, first served
+
+The buckets hold BURST_SECONDS of the per-minute rate, since providers
+enforce their limits over windows shorter than a minute.
+
+Enable it with LLM_RATE_LIMIT_RPM and/or LLM_RATE_LIMIT_TPM (the limits of
+your provider account, e.g. from its rate-limit headers or dashboard).
+The limits cover the whole process, whichever backend a call goes to.
+"""
+
+import asyncio
+import email.utils
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+
+# Lower runs first
+INTERACTIVE = 0
+BATCH = 10
+
+# Seconds of the per-minute rate a bucket can hold (the largest burst)
+BURST_SECONDS = 1.0
+
+# Reserved for the reply when a request has no max_tokens
+DEFAULT_COMPLETION_TOKENS = 256
+
+# Pause after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+# Retries of one call after 429s before the error is raised
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class RateLimitTimeout(Exception):
+    """A call waited longer than its timeout for rate-limit headroom"""
+
+
+def request_tokens(payload: dict) -> int:
+    """Estimate the tokens a request counts against TPM: its prompt plus the reply it may get"""
+    # Imported here: shared.memory imports shared.transport, which imports this module
+    from shared.memory import estimate_tokens, message_tokens
+
+    tokens = sum(message_tokens(message) for message in payload.get("messages") or [])
+    for field in ("tools", "functions"):
+        if payload.get(field):
+            tokens += estimate_tokens(json.dumps(payload[field], separators=(",", ":")))
+    return tokens + (payload.get("max_tokens") or payload.get("max_completion_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+def body_tokens(body: bytes, max_tokens: int = None) -> int:
+    """request_tokens() for a request that is already serialized (JSON bytes)"""
+    from shared.memory import CHARS_PER_TOKEN
+
+    return len(body) // CHARS_PER_TOKEN + (max_tokens or DEFAULT_COMPLETION_TOKENS)
+
+
+def retry_after(headers) -> float:
+    """
+    The server's requested pause in seconds, or None.
+
+    Reads retry-after-ms (OpenAI) and Retry-After, in seconds or as an HTTP date.
+    """
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def rate_limit_delay(error: Exception) -> float:
+    """Seconds to pause if error is an HTTP 429 (SDK or requests exception), else None"""
+    response = getattr(error, "response", None)
+    if response is None or getattr(response, "status_code", None) != 429:
+        return None
+    delay = retry_after(response.headers)
+    return DEFAULT_RETRY_AFTER if delay is None else delay
+
+
+class TokenBucket:
+    """Refills at per_minute / 60 units a second, up to BURST_SECONDS worth"""
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount fits (an amount above capacity only needs a full bucket)"""
+        self.refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        # May go below zero: a large request is paid back before the next one goes
+        self.level -= amount
+
+
+class RateLimiter:
+    """RPM and TPM token buckets in front of every LLM call, with a priority queue"""
+
+    def __init__(self, requests_per_minute: float = None, tokens_per_minute: float = None,
+                 burst_seconds: float = BURST_SECONDS, max_retries: int = MAX_RATE_LIMIT_RETRIES):
+        """
+        Args:
+            requests_per_minute: RPM limit (None: unlimited)
+            tokens_per_minute: TPM limit (None: unlimited)
+            burst_seconds: Seconds of each rate the buckets can hold
+            max_retries: Retries of one call after 429s
+        """
+        self.requests = TokenBucket(requests_per_minute, burst_seconds) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.stats = {"requests": 0, "tokens": 0, "waited": 0, "wait_seconds": 0.0, "rate_limited": 0}
+        self._cond = threading.Condition()
+        self._queue = []                # heap of (priority, arrival) entries
+        self._events = {}               # async waiter's entry -> (its event loop, asyncio.Event)
+        self._arrivals = itertools.count()
+        self._paused_until = 0.0
+
+    def _grant(self, entry: tuple, tokens: int, now: float):
+        """
+        Take capacity for entry if it is at the front and everything fits (caller holds the lock).
+
+        Returns:
+            0 when granted, seconds to wait when entry is at the front, None when it is not
+        """
+        if self._queue[0] is not entry:
+            return None
+        wait = self._paused_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        if wait > 0:
+            return wait
+        heapq.heappop(self._queue)
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+        self.stats["requests"] += 1
+        self.stats["tokens"] += tokens
+        self._cond.notify_all()
+        self._wake_head()
+        return 0
+
+    def _leave(self, entry: tuple):
+        """Drop a waiter that gave up (timeout, Ctrl+C, cancelled task)"""
+        if entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+            self._cond.notify_all()
+            self._wake_head()
+
+    def _wake_head(self):
+        """If an async waiter is now at the front, wake it to check again (caller holds the lock)"""
+        if self._queue:
+            waiter = self._events.get(self._queue[0])
+            if waiter is not None:
+                loop, event = waiter
+                loop.call_soon_threadsafe(event.set)
+
+    def _waited(self, start: float):
+        waited = time.monotonic() - start
+        if waited > 0.001:
+            with self._cond:
+                self.stats["waited"] += 1
+                self.stats["wait_seconds"] += waited
+
+    def acquire(self, tokens: int = 1, priority: int = INTERACTIVE, timeout: float = None) -> int:
+        """
+        Block until one request of this many tokens may be sent.
+
+        Args:
+            tokens: Estimated tokens of the request (see request_tokens)
+            priority: INTERACTIVE or BATCH (lower goes first)
+            timeout: Most seconds to wait (None: as long as it takes)
+
+        Returns:
+            The tokens reserved, to pass to settle() once the real usage is known
+
+        Raises:
+            RateLimitTimeout: if the timeout passed first
+        """
+        start = time.monotonic()
+        entry = (priority, next(self._arrivals))
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            try:
+                wait = self._grant(entry, tokens, start)
+                while wait != 0:
+                    if timeout is not None:
+                        left = start + timeout - time.monotonic()
+                        if left <= 0:
+                            raise RateLimitTimeout(f"No rate-limit headroom within {timeout}s")
+                        wait = left if wait is None else min(wait, left)
+                    self._cond.wait(wait)
+                    wait = self._grant(entry, tokens, time.monotonic())
+            except BaseException:
+                self._leave(entry)
+                raise
+        self._waited(start)
+        return tokens
+
+    async def acquire_async(self, tokens: int = 1, priority: int = INTERACTIVE) -> int:
+        """Like acquire(), but waits without blocking the event loop"""
+        start = time.monotonic()
+        entry = (priority, next(self._arrivals))
+        event = asyncio.Event()
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            self._events[entry] = (asyncio.get_running_loop(), event)
+        try:
+            while True:
+                event.clear()
+                with self._cond:
+                    wait = self._grant(entry, tokens, time.monotonic())
+                if wait == 0:
+                    break
+                # At the front: sleep until the buckets have room. Behind: sleep until
+                # _grant() or _leave() makes this entry the front and sets the event
+                try:
+                    await asyncio.wait_for(event.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._cond:
+                self._leave(entry)
+            raise
+        finally:
+            with self._cond:
+                del self._events[entry]
+        self._waited(start)
+        return tokens
+
+    def settle(self, reserved: int, used: int):
+        """
+        Charge a finished call's real usage beyond its estimate (None keeps the estimate).
+
+        Nothing is refunded when it used less: providers count max_tokens
+        when the request arrives.
+        """
+        if used is None or used <= reserved or self.tokens is None:
+            return
+        with self._cond:
+            self.tokens.refill(time.monotonic())
+            self.tokens.take(used - reserved)
+            self.stats["tokens"] += used - reserved
+
+    def backoff(self, seconds: float):
+        """The provider answered 429: hold every queued call for seconds"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self.stats["rate_limited"] += 1
+
+    def call(self, send, tokens: int = 1, priority: int = INTERACTIVE, usage=None):
+        """
+        send() once there is headroom, pausing and retrying after 429s.
+
+        Args:
+            send: Function that makes the request and raises on a 429
+            tokens: Estimated tokens of the request
+            priority: INTERACTIVE or BATCH
+            usage: Optional function (result) -> total tokens used, to settle the estimate
+
+        Returns:
+            What send() returned
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, priority)
+            try:
+                result = send()
+            except Exception as e:
+                delay = rate_limit_delay(e)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                self.backoff(delay)
+                continue
+            if usage is not None:
+                self.settle(tokens, usage(result))
+            return result
+
+    async def acall(self, send, tokens: int = 1, priority: int = INTERACTIVE, usage=None):
+        """call() for a coroutine function send"""
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async(tokens, priority)
+            try:
+                result = await send()
+            except Exception as e:
+                delay = rate_limit_delay(e)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                self.backoff(delay)
+                continue
+            if usage is not None:
+                self.settle(tokens, usage(result))
+            return result
+
+
+_limiter = None
+_limiter_configured = False
+_limiter_lock = threading.Lock()
+
+
+def set_limiter(limiter):
+    """Use this limiter (or None for no limit) instead of the environment setting"""
+    global _limiter, _limiter_configured
+    with _limiter_lock:
+        _limiter = limiter
+        _limiter_configured = True
+
+
+def get_limiter():
+    """
+    Return the process-wide limiter, or None when no limit is set.
+
+    Unless set_limiter() was called, it is configured from the environment:
+    LLM_RATE_LIMIT_RPM  requests per minute
+    LLM_RATE_LIMIT_TPM  tokens per minute
+    """
+    global _limiter, _limiter_configured
+    if _limiter_configured:
+        return _limiter
+    with _limiter_lock:
+        if not _limiter_configured:
+            rpm = os.getenv("LLM_RATE_LIMIT_RPM")
+            tpm = os.getenv("LLM_RATE_LIMIT_TPM")
+            if rpm or tpm:
+                _limiter = RateLimiter(float(rpm) if rpm else None, float(tpm) if tpm else None)
+            _limiter_configured = True
+    return _limiter
@@ -0,0 +1,225 @@
+"""
+Semantic Cache
+==============
+Answers near-duplicate questions ("what is a variable?" / "explain
+variables") from earlier answers instead of calling the LLM again.
+
+Questions are embedded as vectors, stored in a fixed-size NumPy matrix and
+matched by cosine similarity. The default embedding is a local hashed n-gram
+vectorizer; its word pairs keep word order, so "convert int to string" does
+not match "convert string to int". Any other embed function can be passed
+in, e.g. a sentence-transformers model.
+
+Similar words can still mean the opposite ("install numpy" / "uninstall
+numpy"), so a match is rejected when one question negates the other.
+
+Requires numpy (pip install numpy).
+"""
+
+import hashlib
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# Words that carry no meaning for matching questions
+STOPWORDS = frozenset(
+    "a an the is are was were be do does did what whats how why when which who can could "
+    "would should please me my i you your to of in on for and or it this that explain tell "
+    "about describe mean means meaning".split()
+)
+
+_WORD = re.compile(r"[a-z0-9_]+")
+
+# How many nearest entries lookup() checks for a matching namespace
+CANDIDATES = 8
+
+# Earlier messages a question's answer may depend on ("give me an example" of what?)
+CONTEXT_MESSAGES = 2
+
+# Words that turn a question around ("why is my loop not working")
+NEGATIONS = frozenset(
+    "not no never without dont doesnt didnt cant cannot isnt arent wasnt wont shouldnt".split()
+)
+
+# Prefixes that turn a word around: install/uninstall, connect/disconnect, increase/decrease
+NEGATING_PREFIXES = ("un", "dis", "de", "non", "in", "im")
+
+# Opposites that share no prefix
+ANTONYMS = {
+    frozenset(pair) for pair in [
+        ("add", "remove"), ("start", "stop"), ("open", "close"), ("show", "hide"),
+        ("push", "pop"), ("min", "max"), ("before", "after"), ("import", "export"),
+        ("upload", "download"), ("enable", "disable"), ("encode", "decode"), ("encrypt", "decrypt"),
+        ("true", "false"), ("first", "last"),
+    ]
+}
+
+
+def _root(word: str):
+    """(prefix, rest) for a word starting with a negating prefix, else ("", word)"""
+    for prefix in NEGATING_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= 3:
+            return prefix, word[len(prefix):]
+    return "", word
+
+
+def contradicts(a: str, b: str) -> bool:
+    """
+    True when two similar questions ask opposite things: only one has a
+    negation word, or a word in one is the other's word with a negating
+    prefix or an antonym ("install" / "uninstall", "add" / "remove").
+    """
+    words_a = set(_WORD.findall(a.lower().replace("'", "")))
+    words_b = set(_WORD.findall(b.lower().replace("'", "")))
+    if bool(words_a & NEGATIONS) != bool(words_b & NEGATIONS):
+        return True
+    for x in words_a - words_b:
+        for y in words_b - words_a:
+            if frozenset((x, y)) in ANTONYMS:
+                return True
+            (prefix_x, rest_x), (prefix_y, rest_y) = _root(x), _root(y)
+            # "uninstall" vs "install", or "increase" vs "decrease"
+            if prefix_x != prefix_y and (rest_x == rest_y or rest_x == y or rest_y == x):
+                return True
+    return False
+
+
+class HashedNgramVectorizer:
+    """Embed text as hashed word, word-pair and character n-gram counts (no model, no network)"""
+
+    def __init__(self, dim: int = 256, char_ngram: int = 3, pair_weight: float = 3.0):
+        """
+        Args:
+            dim: Vector size; collisions go down as it goes up
+            char_ngram: Character n-gram length, which makes "variable" and "variables" match
+            pair_weight: Weight of each pair of neighbouring words, which makes word order count
+        """
+        self.dim = dim
+        self.char_ngram = char_ngram
+        self.pair_weight = pair_weight
+
+    def features(self, text: str) -> list:
+        """(feature, weight) pairs: words, character n-grams and neighbouring word pairs"""
+        words = [w for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+        features = [(word, 1.0) for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend((padded[i:i + self.char_ngram], 1.0)
+                            for i in range(len(padded) - self.char_ngram + 1))
+        # Plurals folded, so "for loops" still pairs like "for loop"
+        stems = [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words]
+        features.extend((f"{a} {b}", self.pair_weight) for a, b in zip(stems, stems[1:]))
+        return features
+
+    def __call__(self, text: str) -> np.ndarray:
+        """Return an L2-normalized float32 vector"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self.features(text):
+            h = zlib.crc32(feature.encode())
+            # The top bit picks a sign, so collisions cancel out instead of adding up
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Bounded vector index of past questions and their answers"""
+
+    def __init__(self, threshold: float = 0.75, max_entries: int = 10_000, embed=None):
+        """
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Index size; once full, the oldest entries are overwritten
+            embed: Function text -> normalized 1-D vector (default: HashedNgramVectorizer())
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.embed = embed or HashedNgramVectorizer()
+
+        dim = len(self.embed("probe"))
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._questions = [None] * max_entries
+        self._answers = [None] * max_entries
+        self._namespaces = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def __len__(self):
+        return self._size
+
+    @staticmethod
+    def context_namespace(system_prompt: str, history: list) -> str:
+        """
+        Namespace for a question asked after history (the messages before it, system first).
+
+        The same question only shares an answer when the system prompt and the
+        last CONTEXT_MESSAGES messages before it are the same too, so a
+        follow-up is never answered from another conversation.
+        """
+        context = [m for m in history if m["role"] != "system"][-CONTEXT_MESSAGES:]
+        if not context:
+            return system_prompt
+        digest = hashlib.sha256()
+        for message in context:
+            digest.update(f"{message['role']}\0{message.get('content') or ''}\0".encode())
+        return f"{system_prompt}\n#{digest.hexdigest()[:16]}"
+
+    def lookup(self, question: str, namespace: str = None):
+        """
+        Find a cached answer to a similar question.
+
+        Args:
+            question: The user's message
+            namespace: Only match entries stored under the same namespace
+                (e.g. the chatbot's system prompt)
+
+        Returns:
+            (answer, similarity) on a hit, or None
+        """
+        vector = self.embed(question)
+        with self._lock:
+            size = self._size
+            # A view, not a copy: the O(n) matmul below runs without the lock, so
+            # inserts are not held up. Rows overwritten meanwhile are re-scored below
+            vectors = self._vectors[:size]
+        top = []
+        if size:
+            similarities = vectors @ vector
+            # The best few candidates (partial sort, O(n)), best first
+            k = min(CANDIDATES, size)
+            top = np.argpartition(similarities, -k)[-k:]
+            top = top[np.argsort(similarities[top])[::-1]]
+        with self._lock:
+            for index in top:
+                similarity = float(self._vectors[index] @ vector)
+                if similarity < self.threshold:
+                    continue
+                if self._namespaces[index] == namespace and not contradicts(question, self._questions[index]):
+                    self.stats["hits"] += 1
+                    return self._answers[index], similarity
+            self.stats["misses"] += 1
+            return None
+
+    def insert(self, question: str, answer: str, namespace: str = None, vector: np.ndarray = None):
+        """
+        Add a question/answer pair, overwriting the oldest entry when full.
+
+        Pass vector to reuse an embedding you already have for question.
+        """
+        if vector is None:
+            vector = self.embed(question)
+        with self._lock:
+            index = self._next
+            if self._size == self.max_entries:
+                self.stats["evictions"] += 1
+            else:
+                self._size += 1
+            self._vectors[index] = vector
+            self._questions[index] = question
+            self._answers[index] = answer
+            self._namespaces[index] = namespace
+            self._next = (index + 1) % self.max_entries
@@ -0,0 +1,189 @@
+"""
+Persistent Session Store
+========================
+Keeps chatbot conversations on disk so they survive a restart, and so a
+server only needs RAM for the sessions that are active right now.
+
+Backed by SQLite in WAL mode with a memory-mapped read path. Messages are
+stored one row per message, clustered by (session_id, seq), so loading a
+session is a single range scan.
+"""
+
+import json
+import sqlite3
+import threading
+
+from shared.messages import Message, encode_message
+
+MMAP_SIZE = 256 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID
+"""
+
+
+class SessionStore:
+    """Append-only message log for many chat sessions"""
+
+    def __init__(self, path: str = "sessions.db"):
+        """
+        Args:
+            path: SQLite database file (created if missing)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL keeps commits durable across crashes without an fsync per write
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Serve reads from a memory-mapped view of the file instead of copying pages
+        self._conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self._conn.execute(SCHEMA)
+
+    def open(self, session_id: str) -> "StoredSession":
+        """Return a handle for one session (nothing is loaded yet)"""
+        return StoredSession(self, session_id)
+
+    def append(self, session_id: str, messages: list):
+        """Append messages (Message objects or dicts) to the end of a session"""
+        if not messages:
+            return
+        with self._lock:
+            (last_seq,) = self._conn.execute(
+                "SELECT COALESCE(MAX(seq), -1) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            rows = [
+                (session_id, last_seq + 1 + i, json.dumps(message, separators=(",", ":"), default=encode_message))
+                for i, message in enumerate(messages)
+            ]
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT INTO messages VALUES (?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+
+    def load(self, session_id: str, last: int = None) -> list:
+        """
+        Load a session's messages.
+
+        Args:
+            session_id: Session to load
+            last: Only load the first message (the system prompt) plus the
+                newest `last` messages. None loads everything.
+
+        Returns:
+            List of message dicts, oldest first
+        """
+        with self._lock:
+            if last is None:
+                rows = self._conn.execute(
+                    "SELECT message FROM messages WHERE session_id = ? ORDER BY seq", (session_id,)
+                ).fetchall()
+            else:
+                first = self._conn.execute(
+                    "SELECT seq, message FROM messages WHERE session_id = ? ORDER BY seq LIMIT 1", (session_id,)
+                ).fetchall()
+                newest = self._conn.execute(
+                    "SELECT seq, message FROM messages WHERE session_id = ? ORDER BY seq DESC LIMIT ?",
+                    (session_id, last)
+                ).fetchall()
+                newest.reverse()
+                if first and newest and newest[0][0] == first[0][0]:
+                    first = []
+                rows = [(message,) for _, message in first + newest]
+        return [json.loads(message) for (message,) in rows]
+
+    def delete(self, session_id: str):
+        """Remove a session and all its messages"""
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+    def sessions(self) -> list:
+        """Return the ids of all stored sessions"""
+        with self._lock:
+            rows = self._conn.execute("SELECT DISTINCT session_id FROM messages").fetchall()
+        return [session_id for (session_id,) in rows]
+
+    def compact(self, keep_last: int = 200) -> int:
+        """
+        Drop old messages and reclaim disk space.
+
+        Every session keeps its first message (the system prompt) and its
+        newest keep_last messages.
+
+        Returns:
+            Number of messages removed
+        """
+        with self._lock:
+            self._conn.execute("BEGIN")
+            removed = self._conn.execute(
+                """
+                DELETE FROM messages WHERE (session_id, seq) IN (
+                    SELECT session_id, seq FROM (
+                        SELECT session_id, seq,
+                               ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY seq DESC) AS newest_rank,
+                               ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY seq) AS oldest_rank
+                        FROM messages
+                    )
+                    WHERE newest_rank > ? AND oldest_rank > 1
+                )
+                """,
+                (keep_last,)
+            ).rowcount
+            self._conn.execute("COMMIT")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class StoredSession:
+    """
+    One session in a SessionStore, as seen by a chatbot.
+
+    Counts the messages it has saved and stamps each saved Message with its
+    number (Message.seq), so sync() only appends the messages the chatbot
+    added since: the unstamped ones at the end of the history. Memory
+    policies can trim or summarize the in-RAM history freely, even drop
+    every saved message; the store keeps the full log until compact() runs.
+    """
+
+    def __init__(self, store: SessionStore, session_id: str):
+        self.store = store
+        self.session_id = session_id
+        self.saved = 0          # messages saved since load() or clear()
+
+    def load(self, last: int = None) -> list:
+        """Load this session's history as Message objects (see SessionStore.load)"""
+        history = [Message.from_dict(m) for m in self.store.load(self.session_id, last)]
+        for seq, message in enumerate(history):
+            message.seq = seq
+        self.saved = len(history)
+        return history
+
+    def is_saved(self, message) -> bool:
+        seq = getattr(message, "seq", None)
+        return seq is not None and seq < self.saved
+
+    def sync(self, history: list):
+        """Append the messages added to the end of history (Message objects) since the last sync"""
+        start = len(history)
+        while start > 0 and not self.is_saved(history[start - 1]):
+            start -= 1
+        new = history[start:]
+        self.store.append(self.session_id, new)
+        for message in new:
+            if isinstance(message, Message):
+                message.seq = self.saved
+            self.saved += 1
+
+    def clear(self):
+        """Delete everything stored for this session"""
+        self.store.delete(self.session_id)
+        self.saved = 0
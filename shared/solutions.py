@@ -0,0 +1,30 @@
+"""
+Solution Script Loader
+======================
+Solution files start with a number (``03_chatbot_memory_solution.py``), so
+they cannot be imported with a plain ``import``. The API service and the
+benchmarks load them through here.
+"""
+
+import importlib.util
+import os
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def load_solution(relative_path: str):
+    """
+    Import a solution script by path.
+
+    Args:
+        relative_path: Path from the repository root, e.g. "day1/solutions/03_chatbot_memory_solution.py"
+
+    Returns:
+        The loaded module
+    """
+    path = os.path.join(REPO_ROOT, relative_path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,75 @@
+"""
+Token Streaming Sinks
+=====================
+Where a streamed reply goes while it is being generated.
+
+Writing and flushing every token costs one system call per token. A sink
+buffers tokens and writes them as one chunk at most every ``interval``
+seconds (or once ``max_chars`` are waiting), which still looks live to a
+reader but is far cheaper for long replies.
+
+The buffer is only flushed when a token arrives (or on close()), so a
+token can wait up to ``interval`` seconds plus the gap to the next token.
+"""
+
+import sys
+import time
+
+
+class StreamSink:
+    """Coalescing sink base class; subclasses implement write_chunk()"""
+
+    def __init__(self, interval: float = 0.05, max_chars: int = 4096):
+        """
+        Args:
+            interval: Most seconds between writes while tokens keep arriving
+            max_chars: Write early once this many characters are buffered
+        """
+        self.interval = interval
+        self.max_chars = max_chars
+        self._parts = []
+        self._chars = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, token: str):
+        self._parts.append(token)
+        self._chars += len(token)
+        if self._chars >= self.max_chars or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self._parts:
+            self.write_chunk("".join(self._parts))
+            self._parts = []
+            self._chars = 0
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """Write whatever is still buffered"""
+        self.flush()
+
+    def write_chunk(self, text: str):
+        raise NotImplementedError
+
+
+class StdoutSink(StreamSink):
+    """Prints the stream to a text stream (default: sys.stdout)"""
+
+    def __init__(self, stream=None, interval: float = 0.05, max_chars: int = 4096):
+        super().__init__(interval, max_chars)
+        self.stream = stream or sys.stdout
+
+    def write_chunk(self, text: str):
+        self.stream.write(text)
+        self.stream.flush()
+
+
+class CallbackSink(StreamSink):
+    """Hands each coalesced chunk to a function, e.g. a websocket send or a GUI update"""
+
+    def __init__(self, callback, interval: float = 0.05, max_chars: int = 4096):
+        super().__init__(interval, max_chars)
+        self.callback = callback
+
+    def write_chunk(self, text: str):
+        self.callback(text)
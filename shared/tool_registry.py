@@ -0,0 +1,324 @@
+"""
+Tool Registry
+=============
+The agent's tools: their implementations, their schemas, and which of them
+go out with each request.
+
+Tools are plain functions registered with a decorator. The schema is
+generated once, at registration, from the type hints and the Google-style
+docstring (summary = tool description, ``Args:`` = parameter descriptions),
+and can be emitted in the tools API or the legacy functions API format.
+Calls are dispatched with one dict lookup; sync and async tools both work.
+
+    registry = ToolRegistry()
+
+    @registry.tool
+    def send_email(recipient_email: str, subject: str, message: str) -> str:
+        '''Send an email.
+
+        Args:
+            recipient_email: Email address of the recipient
+        '''
+        ...
+
+    registry.call("send_email", {"recipient_email": ..., ...})
+
+Supported hints: str, int, float, bool, list[...], dict, Literal[...] (an
+enum), Optional[...], TypedDict (an object with those properties) and
+Annotated[type, "description"].
+
+Requests can send:
+- minified schemas: property descriptions, defaults and all but the first
+  sentence of each tool description are dropped (the system prompt already
+  explains the fields, with examples)
+- a per-turn selection (only with intents): a cheap local classifier
+  (regular expressions, see shared/intent_router.py) picks the intents a
+  message mentions, and only those intents' tools are sent; a follow-up
+  with no intent words (e.g. "Tuesday 2pm works") keeps the previous
+  turn's tools
+
+Every selection is built once and reused, so each tool subset has its own
+stable, byte-identical prompt prefix (see shared/prompt_prefix.py). But the
+tools come before the messages, so switching subsets mid-conversation makes
+the provider's prompt cache miss on the whole conversation. Sending every
+(minified) tool on every turn is usually cheaper overall; measure with
+benchmarks/bench_tool_selection.py before turning selection on.
+"""
+
+import asyncio
+import copy
+import inspect
+import json
+import re
+import types
+import typing
+
+from shared.intent_router import classify_intents
+from shared.memory import estimate_tokens
+
+_FIRST_SENTENCE = re.compile(r"^(.+?[.!?])(?:\s|$)", re.DOTALL)
+_ARG_LINE = re.compile(r"^\s*(\w+)(?:\s*\([^)]*\))?\s*:\s*(.*)$")
+
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", dict: "object", list: "array"}
+
+
+def schema_tokens(tools: list) -> int:
+    """Estimated prompt tokens of a list of tool schemas"""
+    return estimate_tokens(json.dumps(tools, separators=(",", ":")))
+
+
+def parse_docstring(doc: str):
+    """
+    Split a Google-style docstring.
+
+    Returns:
+        (description, {argument name: description})
+    """
+    doc = inspect.cleandoc(doc or "")
+    summary, args, current, section = [], {}, None, None
+    for line in doc.splitlines():
+        stripped = line.strip()
+        if stripped in ("Args:", "Arguments:", "Returns:", "Raises:", "Example:", "Examples:"):
+            section = stripped
+            continue
+        if section is None:
+            summary.append(stripped)
+        elif section in ("Args:", "Arguments:") and stripped:
+            match = _ARG_LINE.match(line)
+            if match and len(line) - len(line.lstrip()) <= 4:
+                current = match.group(1)
+                args[current] = match.group(2).strip()
+            elif current:
+                args[current] += " " + stripped
+    return " ".join(" ".join(summary).split()), args
+
+
+def json_schema(hint, description: str = None) -> dict:
+    """JSON schema for a Python type hint (raises TypeError for unsupported hints)"""
+    origin = typing.get_origin(hint)
+    if origin is typing.Annotated:
+        hint, *extras = typing.get_args(hint)
+        notes = [extra for extra in extras if isinstance(extra, str)]
+        return json_schema(hint, notes[0] if notes else description)
+
+    if origin in (typing.Union, types.UnionType):
+        options = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        if len(options) != 1:
+            raise TypeError(f"Unsupported union for a tool parameter: {hint}")
+        schema = json_schema(options[0], description)
+    elif origin is typing.Literal:
+        values = list(typing.get_args(hint))
+        schema = {"type": JSON_TYPES.get(type(values[0]), "string"), "enum": values}
+    elif origin in (list, tuple, set):
+        schema = {"type": "array"}
+        item_hints = typing.get_args(hint)
+        if item_hints:
+            schema["items"] = json_schema(item_hints[0])
+    elif origin is dict:
+        schema = {"type": "object"}
+    elif typing.is_typeddict(hint):
+        hints = typing.get_type_hints(hint, include_extras=True)
+        schema = {"type": "object", "properties": {name: json_schema(h) for name, h in hints.items()}}
+        if hint.__required_keys__:
+            schema["required"] = [name for name in hints if name in hint.__required_keys__]
+    elif hint in JSON_TYPES:
+        schema = {"type": JSON_TYPES[hint]}
+    else:
+        raise TypeError(f"Unsupported type for a tool parameter: {hint}")
+
+    if description:
+        # The description first, so it reads naturally in the prompt
+        schema = {"type": schema.pop("type"), "description": description, **schema}
+    return schema
+
+
+def function_schema(func, name: str = None, description: str = None) -> dict:
+    """Tools-API schema for a function, from its signature, type hints and docstring"""
+    summary, arg_docs = parse_docstring(func.__doc__)
+    hints = typing.get_type_hints(func, include_extras=True)
+    properties, required = {}, []
+    for param in inspect.signature(func).parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        schema = json_schema(hints.get(param.name, str), arg_docs.get(param.name))
+        if param.default is param.empty:
+            required.append(param.name)
+        elif param.default is not None:
+            schema["default"] = param.default
+        properties[param.name] = schema
+
+    parameters = {"type": "object", "properties": properties}
+    if required:
+        parameters["required"] = required
+    return {
+        "type": "function",
+        "function": {"name": name or func.__name__, "description": description or summary, "parameters": parameters}
+    }
+
+
+def minify_schema(tool: dict) -> dict:
+    """
+    A smaller copy of a tools-API schema: no property descriptions or
+    defaults, and the tool description cut to its first sentence.
+    """
+    tool = copy.deepcopy(tool)
+    function = tool["function"]
+    description = function.get("description")
+    if description:
+        match = _FIRST_SENTENCE.match(description)
+        function["description"] = match.group(1) if match else description
+
+    def strip(schema):
+        for prop in schema.get("properties", {}).values():
+            prop.pop("description", None)
+            prop.pop("default", None)
+            strip(prop)
+
+    strip(function.get("parameters", {}))
+    return tool
+
+
+class Tool:
+    """One registered tool: the function and its schema (generated once)"""
+
+    __slots__ = ("name", "func", "is_async", "schema", "parameters", "accepts_any")
+
+    def __init__(self, func, name: str = None, description: str = None):
+        self.func = func
+        self.is_async = inspect.iscoroutinefunction(func)
+        self.schema = function_schema(func, name, description)
+        self.name = self.schema["function"]["name"]
+        signature = inspect.signature(func).parameters.values()
+        self.parameters = frozenset(param.name for param in signature)
+        self.accepts_any = any(param.kind is param.VAR_KEYWORD for param in signature)
+
+    def arguments(self, arguments: dict) -> dict:
+        """The model's arguments minus any this function does not take (models sometimes add extras)"""
+        if self.accepts_any or arguments.keys() <= self.parameters:
+            return arguments
+        return {key: value for key, value in arguments.items() if key in self.parameters}
+
+
+class ToolSelection:
+    """The tools sent with one request, in both wire formats"""
+
+    __slots__ = ("names", "tools", "functions", "tokens", "tokens_saved")
+
+    def __init__(self, names: tuple, tools: list, full_tokens: int):
+        self.names = names
+        self.tools = tools                                      # tools API
+        self.functions = [tool["function"] for tool in tools]   # legacy functions API
+        self.tokens = schema_tokens(tools)
+        self.tokens_saved = full_tokens - self.tokens
+
+    def __repr__(self):
+        return f"ToolSelection({', '.join(self.names)}, {self.tokens} tokens)"
+
+
+class ToolRegistry:
+    """Registered tools plus the intent -> tools mapping used to choose them per turn"""
+
+    def __init__(self, intents: dict = None, minify: bool = True, classify=classify_intents):
+        """
+        Args:
+            intents: {intent: [tool names]}; without it every turn gets every tool
+            minify: Send minified schemas
+            classify: function(message) -> list of intents
+        """
+        self.intents = intents or {}
+        self.minify = minify
+        self.classify = classify
+        self.full_tokens = 0        # all tools with full schemas, to report savings against
+        self.stats = {"requests": 0, "tokens_saved": 0}
+        self._tools = {}            # name -> Tool
+        self._schemas = {}          # name -> schema as sent (minified or not)
+        self._selections = {}       # tool names -> ToolSelection
+
+    def tool(self, func=None, *, name: str = None, description: str = None):
+        """
+        Decorator that registers a function as a tool (``@registry.tool`` or
+        ``@registry.tool(name=..., description=...)``). The function is returned unchanged.
+        """
+        def register(func):
+            self.register(func, name=name, description=description)
+            return func
+        return register(func) if func is not None else register
+
+    def register(self, func, name: str = None, description: str = None) -> Tool:
+        tool = Tool(func, name, description)
+        self._tools[tool.name] = tool
+        self._schemas[tool.name] = minify_schema(tool.schema) if self.minify else tool.schema
+        self.full_tokens = schema_tokens([t.schema for t in self._tools.values()])
+        self._selections.clear()
+        return tool
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def names(self) -> list:
+        return list(self._tools)
+
+    def get(self, name: str) -> Tool:
+        """The registered Tool (function and full schema), or None"""
+        return self._tools.get(name)
+
+    def schemas(self, format: str = "tools", minified: bool = None) -> list:
+        """Every tool's schema in the "tools" or "functions" wire format"""
+        if minified is None or minified == self.minify:
+            tools = list(self._schemas.values())
+        else:
+            tools = [minify_schema(tool.schema) if minified else tool.schema for tool in self._tools.values()]
+        return tools if format == "tools" else [tool["function"] for tool in tools]
+
+    def call(self, name: str, arguments: dict):
+        """
+        Run a tool from synchronous code (an async tool runs in its own event loop).
+
+        Raises:
+            KeyError: if no tool has this name
+        """
+        tool = self._tools[name]
+        if tool.is_async:
+            return asyncio.run(tool.func(**tool.arguments(arguments)))
+        return tool.func(**tool.arguments(arguments))
+
+    async def acall(self, name: str, arguments: dict):
+        """Run a tool from async code (a sync tool runs in a worker thread)"""
+        tool = self._tools[name]
+        if tool.is_async:
+            return await tool.func(**tool.arguments(arguments))
+        return await asyncio.to_thread(tool.func, **tool.arguments(arguments))
+
+    def selection(self, names=None) -> ToolSelection:
+        """The selection for these tool names (default: all), built once per subset"""
+        names = tuple(name for name in self._schemas if names is None or name in names)
+        selection = self._selections.get(names)
+        if selection is None:
+            selection = self._selections[names] = ToolSelection(
+                names, [self._schemas[name] for name in names], self.full_tokens
+            )
+        return selection
+
+    def select(self, message: str, previous: ToolSelection = None) -> ToolSelection:
+        """
+        Choose the tools for a user message.
+
+        Args:
+            message: The user's message
+            previous: The last turn's selection, kept when the message names no intent
+
+        Returns:
+            A ToolSelection (all tools when nothing matched and there is no previous one)
+        """
+        intents = [intent for intent in self.classify(message) if intent in self.intents]
+        if not intents:
+            return previous or self.selection()
+        names = set()
+        for intent in intents:
+            names.update(self.intents[intent])
+        return self.selection(names)
+
+    def record(self, selection: ToolSelection):
+        """Count one request sent with this selection"""
+        self.stats["requests"] += 1
+        self.stats["tokens_saved"] += selection.tokens_saved
@@ -0,0 +1,79 @@
+"""
+Parallel Tool Runner
+====================
+Runs the tool calls from one assistant message at the same time, each with
+its own timeout, and hands back the results in the original order.
+
+When the model asks to book a meeting and send an email in one turn, the
+two n8n webhooks now overlap instead of running back to back.
+
+A timeout only stops the wait: the tool keeps running in the background,
+and its webhook may still book the meeting. The model is told so, and told
+not to call the tool again, so a slow booking is not made twice.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# Seconds to wait for a tool before reporting a timeout to the model
+DEFAULT_TOOL_TIMEOUT = 30
+
+
+class ToolRunner:
+    """Execute tool calls on a shared thread pool with per-tool timeouts"""
+
+    def __init__(self, execute, max_workers: int = 8, timeouts: dict = None,
+                 default_timeout: float = DEFAULT_TOOL_TIMEOUT, executor=None):
+        """
+        Args:
+            execute: Function (name, arguments) -> result string, e.g. agent.execute_function
+            max_workers: Most tool calls running at once
+            timeouts: Optional {tool_name: seconds} overrides
+            default_timeout: Timeout for tools not listed in timeouts
+            executor: Optional ThreadPoolExecutor shared with other runners (max_workers is then
+                ignored), so a server with thousands of agents does not keep a pool per agent
+        """
+        self.execute = execute
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def timeout_for(self, name: str) -> float:
+        return self.timeouts.get(name, self.default_timeout)
+
+    def submit(self, name: str, arguments: dict):
+        """
+        Start one tool call in the background.
+
+        Returns:
+            A handle to pass to result()
+        """
+        return name, time.monotonic(), self._executor.submit(self.execute, name, arguments)
+
+    def result(self, handle) -> str:
+        """Wait for a submitted call; a timeout or exception becomes a status JSON string for the model"""
+        name, started, future = handle
+        remaining = max(0.0, started + self.timeout_for(name) - time.monotonic())
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeoutError:
+            return json.dumps({
+                "status": "timeout",
+                "message": f"{name} did not answer within {self.timeout_for(name)}s. It may still complete, "
+                           f"so do not call it again: tell the user it is unconfirmed and to check later."
+            })
+        except Exception as e:
+            return json.dumps({"status": "error", "message": str(e)})
+
+    def run_all(self, calls: list) -> list:
+        """
+        Run (name, arguments) pairs concurrently.
+
+        Returns:
+            Result strings in the same order as calls
+        """
+        handles = [self.submit(name, arguments) for name, arguments in calls]
+        return [self.result(handle) for handle in handles]
+
@@ -0,0 +1,81 @@
+"""
+Streamed Tool Calls
+===================
+Rebuilds tool calls from streamed chat completion deltas.
+
+With stream=True the model sends each tool call in pieces: first its id and
+name, then its arguments JSON a few characters at a time. StreamedToolCalls
+reports every call the moment its arguments parse as complete JSON, so the
+agent can start that tool while the model is still writing the next one.
+"""
+
+import json
+
+from shared.messages import ToolCall
+
+
+class StreamedToolCalls:
+    """Collects tool-call deltas from one streamed response"""
+
+    def __init__(self):
+        self._calls = {}        # index -> {"id", "name", "parts", "done"}
+
+    def feed(self, deltas) -> list:
+        """
+        Add the tool-call deltas of one chunk (chunk.choices[0].delta.tool_calls).
+
+        Returns:
+            (ToolCall, arguments dict) for every call whose arguments just became complete
+        """
+        completed = []
+        for delta in deltas:
+            call = self._calls.get(delta.index)
+            if call is None:
+                call = self._calls[delta.index] = {"id": None, "name": "", "parts": [], "done": False}
+            if delta.id:
+                call["id"] = delta.id
+            function = delta.function
+            if function is not None:
+                if function.name:
+                    call["name"] += function.name
+                if function.arguments:
+                    call["parts"].append(function.arguments)
+
+            # A JSON object can only be complete once it ends with "}"; only then try to parse
+            if call["done"] or not call["parts"] or not call["parts"][-1].rstrip().endswith("}"):
+                continue
+            try:
+                arguments = json.loads("".join(call["parts"]))
+            except ValueError:
+                continue
+            completed.append(self._complete(call, arguments))
+        return completed
+
+    def finish(self) -> list:
+        """
+        Call when the stream has ended.
+
+        Returns:
+            (ToolCall, arguments dict) for calls not reported by feed() yet
+            (arguments that never became valid JSON are passed on as {})
+        """
+        completed = []
+        for index in sorted(self._calls):
+            call = self._calls[index]
+            if call["done"]:
+                continue
+            try:
+                arguments = json.loads("".join(call["parts"]) or "{}")
+            except ValueError:
+                arguments = {}
+            completed.append(self._complete(call, arguments))
+        return completed
+
+    def tool_calls(self) -> list:
+        """Every ToolCall of the response, in the order the model produced them"""
+        return [self._calls[index]["tool_call"] for index in sorted(self._calls) if self._calls[index]["done"]]
+
+    def _complete(self, call: dict, arguments: dict):
+        call["done"] = True
+        call["tool_call"] = ToolCall(call["name"], "".join(call["parts"]), id=call["id"])
+        return call["tool_call"], arguments
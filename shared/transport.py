@@ -0,0 +1,139 @@
+"""
+Shared HTTP Transport
+=====================
+One pooled, keep-alive ``requests.Session`` shared by every OpenRouter call,
+so only the first request to a host pays for the TCP + TLS handshake.
+(The n8n webhook has its own pool in shared/webhook.py.)
+
+With LLM_BACKENDS set, chat_completion() goes through the provider router
+(shared/providers.py) instead, which picks the backend and model per request.
+With LLM_RATE_LIMIT_RPM/TPM set, every call first waits for headroom in the
+client-side rate limiter (shared/rate_limiter.py).
+
+Note: ``requests`` speaks HTTP/1.1 only. Connection reuse gives most of the
+latency win that HTTP/2 would, without adding a new dependency.
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from shared.cache import get_default_cache
+from shared.metrics import get_metrics
+from shared.providers import get_router
+from shared.rate_limiter import INTERACTIVE, get_limiter, request_tokens
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Number of connections kept alive per host (override with HTTP_POOL_SIZE)
+DEFAULT_POOL_SIZE = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    Create a session with a connection pool of the given size.
+
+    Args:
+        pool_size: Maximum number of keep-alive connections per host
+
+    Returns:
+        A configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide shared session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                pool_size = int(os.getenv("HTTP_POOL_SIZE", DEFAULT_POOL_SIZE))
+                _session = create_session(pool_size)
+    return _session
+
+
+def api_base_url() -> str:
+    """OpenRouter API base URL (override with OPENROUTER_BASE_URL, e.g. for a local stub)"""
+    return os.getenv("OPENROUTER_BASE_URL", OPENROUTER_BASE_URL)
+
+
+def chat_completions_url() -> str:
+    """Chat completions endpoint under the API base URL"""
+    return f"{api_base_url()}/chat/completions"
+
+
+def chat_completion(payload: dict, api_key: str = None, timeout: float = 60, priority: int = INTERACTIVE) -> dict:
+    """
+    Send a chat completion request over the shared session.
+
+    Args:
+        payload: Request body, e.g. {"model": ..., "messages": [...]}
+        api_key: Bearer token (defaults to OPENAI_API_KEY from the environment)
+        timeout: Seconds to wait for the response
+        (with LLM_BACKENDS set, each backend uses its own key, model and timeout)
+        priority: INTERACTIVE or BATCH; with a rate limit set, interactive calls are sent first
+
+    Returns:
+        The decoded JSON response
+    """
+    # Opt-in response cache (COMPLETION_CACHE); only low-temperature requests are served from it
+    cache = get_default_cache()
+    if cache is not None:
+        cached = cache.get(payload)
+        if cached is not None:
+            return cached
+
+    limiter = get_limiter()
+    if limiter is None:
+        result, ok = _send(payload, api_key, timeout)
+    else:
+        # Wait for RPM/TPM headroom first; a 429 pauses every caller for its Retry-After
+        result, ok = limiter.call(
+            lambda: _send(payload, api_key, timeout, raise_rate_limit=True),
+            request_tokens(payload), priority,
+            usage=lambda sent: (sent[0].get("usage") or {}).get("total_tokens")
+        )
+    if cache is not None and ok:
+        cache.put(payload, result)
+    return result
+
+
+def _send(payload: dict, api_key: str, timeout: float, raise_rate_limit: bool = False):
+    """One request through the provider router or the shared session; returns (result, ok)"""
+    router = get_router()
+    if router is not None:
+        # Backend and model chosen per request by live latency and error rate
+        with get_metrics().track("chat_completion") as timer:
+            result = router.chat_completion(payload)
+            # The SDK hands the response over whole, so headers and body count as one arrival
+            timer.headers()
+            timer.usage(result.get("usage"))
+        return result, True
+
+    if api_key is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+
+    with get_metrics().track("chat_completion") as timer:
+        response = get_session().post(
+            chat_completions_url(),
+            headers={"Authorization": f"Bearer {api_key}"},
+            json=payload,
+            timeout=timeout
+        )
+        timer.headers(response.elapsed.total_seconds())
+        if raise_rate_limit and response.status_code == 429:
+            # Let the rate limiter pause and retry
+            raise requests.HTTPError("429 Too Many Requests", response=response)
+        result = response.json()
+        timer.usage(result.get("usage"))
+    return result, response.ok
@@ -0,0 +1,234 @@
+"""
+Resilient Webhook Client
+========================
+Calls the n8n webhook with the failure handling a plain requests.post lacks:
+
+- its own keep-alive connection pool, so a slow n8n cannot use up the
+  connections the LLM calls need
+- separate connect and read timeouts, plus a total time budget per call
+- retries with jittered exponential backoff, only when n8n cannot have run
+  the action: the connection could not be made, or n8n answered 429 or 503.
+  Anything else (a read timeout, a connection dropped after the request was
+  sent, a 500/502/504) may come after the email went out, so it is raised
+  instead of sent again
+- an Idempotency-Key header that stays the same across retries
+- a circuit breaker that fails fast while n8n is down instead of tying up
+  a thread for the whole timeout on every call (a 4xx answer means n8n is
+  up, so it does not count as a failure)
+- counters in ``stats``
+"""
+
+import random
+import threading
+import time
+import uuid
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from shared.transport import DEFAULT_POOL_SIZE, create_session
+
+# Statuses that mean "not processed, try again later"
+RETRY_STATUSES = frozenset({429, 503})
+
+
+class WebhookError(Exception):
+    """The webhook call failed (after any retries)"""
+
+
+class WebhookTimeoutError(WebhookError):
+    """n8n did not answer in time; it may still have run the action, so do not send it again"""
+
+
+class WebhookNotSentError(WebhookError):
+    """n8n did not run the action (no connection, or it answered 429/503); safe to send again"""
+
+
+class CircuitOpenError(WebhookNotSentError):
+    """The circuit breaker is open; the call was not attempted"""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold failures in a row. While open, calls are
+    rejected immediately; after reset_timeout seconds one trial call is let
+    through (half-open), and its result closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """May a call go through now?"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            # Open, or half-open with the trial call still in flight
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class WebhookClient:
+    """POST JSON payloads to one webhook URL with timeouts, retries and a circuit breaker"""
+
+    def __init__(self, url: str, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 total_timeout: float = 30, max_retries: int = 3, backoff_base: float = 0.25,
+                 backoff_max: float = 4, breaker: CircuitBreaker = None,
+                 pool_size: int = DEFAULT_POOL_SIZE):
+        """
+        Args:
+            url: Webhook URL
+            connect_timeout: Seconds to wait for the TCP connection
+            read_timeout: Seconds to wait for the response once connected
+            total_timeout: Budget for all attempts and backoff sleeps together
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff in seconds; doubles every retry
+            backoff_max: Longest backoff in seconds
+            breaker: Circuit breaker (default: open after 5 failures, retry after 30s)
+            pool_size: Keep-alive connections kept for this webhook
+        """
+        self.url = url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.total_timeout = total_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.session = create_session(pool_size)
+
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "attempts": 0, "retries": 0,
+                      "timeouts": 0, "short_circuited": 0, "total_latency": 0.0}
+
+    def post(self, payload: dict, idempotency_key: str = None) -> dict:
+        """
+        Send one payload.
+
+        Args:
+            payload: JSON body
+            idempotency_key: Sent as the Idempotency-Key header on every attempt
+                (default: a new random key per call)
+
+        Returns:
+            The decoded JSON response
+
+        Raises:
+            CircuitOpenError: n8n has been failing; the call was not attempted
+            WebhookNotSentError: n8n never ran the action (still failing after the retries)
+            WebhookTimeoutError: n8n did not answer in time and may still have run the action
+            WebhookError: any other failure; n8n may have run the action
+        """
+        self._count("calls")
+        if not self.breaker.allow():
+            self._count("short_circuited")
+            raise CircuitOpenError(f"circuit open for {self.url}; not calling it for now")
+
+        headers = {"Idempotency-Key": idempotency_key or uuid.uuid4().hex}
+        start = time.monotonic()
+        answered = {"up": False}    # did n8n answer (even with a 4xx)? for the circuit breaker
+        try:
+            result = self._send(payload, headers, start + self.total_timeout, answered)
+        except BaseException:
+            # Always record a result, or a half-open breaker would wait for its trial call forever
+            self._finish(start, success=False, n8n_up=answered["up"])
+            raise
+        self._finish(start, success=True, n8n_up=True)
+        return result
+
+    def _send(self, payload: dict, headers: dict, deadline: float, answered: dict) -> dict:
+        """The attempts of one post(); sets answered["up"] when n8n answers below 500 (except 429)"""
+        attempt = 0
+        while True:
+            attempt += 1
+            self._count("attempts")
+            retry_after = None
+            try:
+                response = self.session.post(
+                    self.url,
+                    json=payload,
+                    headers=headers,
+                    timeout=(self.connect_timeout, min(self.read_timeout, max(0.1, deadline - time.monotonic())))
+                )
+                answered["up"] = response.status_code < 500 and response.status_code != 429
+                if response.ok:
+                    return response.json()
+                if response.status_code in RETRY_STATUSES:
+                    error = WebhookNotSentError(f"n8n returned HTTP {response.status_code}")
+                else:
+                    error = WebhookError(f"n8n returned HTTP {response.status_code}")
+                retry_after = _retry_after_seconds(response)
+            except requests.exceptions.ConnectionError as e:
+                if _not_connected(e):
+                    error = WebhookNotSentError(f"Failed to reach n8n: {e}")
+                else:
+                    # Dropped after the request went out: n8n may have run it
+                    error = WebhookError(f"Connection to n8n lost: {e}")
+            except requests.exceptions.ReadTimeout as e:
+                self._count("timeouts")
+                error = WebhookTimeoutError(f"n8n did not answer in time: {e}")
+            except (requests.exceptions.RequestException, ValueError) as e:
+                error = WebhookError(f"Failed to call n8n: {e}")
+
+            delay = self._backoff(attempt, retry_after)
+            if (not isinstance(error, WebhookNotSentError) or attempt > self.max_retries
+                    or time.monotonic() + delay >= deadline):
+                raise error
+            self._count("retries")
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After if it gave one"""
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def _finish(self, start: float, success: bool, n8n_up: bool):
+        if n8n_up:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        with self._lock:
+            self.stats["successes" if success else "failures"] += 1
+            self.stats["total_latency"] += time.monotonic() - start
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+
+def _not_connected(error: requests.exceptions.ConnectionError) -> bool:
+    """True if the connection was never made, so the request cannot have reached n8n"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    # NewConnectionError: refused or unresolvable (a ConnectTimeoutError subclass in urllib3 2)
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def _retry_after_seconds(response):
+    """Retry-After in seconds, if the header is present and numeric"""
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
@@ -0,0 +1,111 @@
+"""
+Batched Webhook Dispatch
+========================
+Coalesces actions sent within a short window into one webhook call.
+
+A script that notifies 200 people makes 200 send_email calls. With a
+WebhookBatcher in front of the WebhookClient, the calls made within
+``window`` seconds of each other go out as one payload:
+
+    {"action": "send_email_batch", "items": [{"recipient_email": ...}, ...],
+     "idempotency_keys": ["...", null, ...]}
+
+The n8n workflow iterates the items and answers with one result per item,
+which is handed back to the caller that sent it. A batch of one is sent as
+the plain action, so the workflow's single-item path is unchanged.
+
+Idempotency keys are delivery metadata, not email fields: they travel in
+idempotency_keys (one per item, in item order, null when the caller gave
+none), and the workflow's batch branch skips items whose key it has
+already sent. A batch of one sends its key as the Idempotency-Key header.
+"""
+
+import threading
+from concurrent.futures import Future
+
+# Actions that may be batched, and the batch action they turn into
+BATCH_ACTIONS = {"send_email": "send_email_batch"}
+
+
+class WebhookBatcher:
+    """Collects payloads per action and sends each group as one batch payload"""
+
+    def __init__(self, client, window: float = 0.05, max_items: int = 100, batch_actions: dict = None):
+        """
+        Args:
+            client: Object with post(payload, idempotency_key=...), e.g. a WebhookClient
+            window: Seconds to wait for more payloads after the first one of a batch
+            max_items: Send a batch as soon as it has this many items
+            batch_actions: {action: batch action} (default: BATCH_ACTIONS)
+        """
+        self.client = client
+        self.window = window
+        self.max_items = max_items
+        self.batch_actions = batch_actions or BATCH_ACTIONS
+        self._pending = {}          # action -> [(item, idempotency key, future)]
+        self._lock = threading.Lock()
+        self.stats = {"items": 0, "batches": 0}
+
+    def submit(self, payload: dict, idempotency_key: str = None) -> Future:
+        """
+        Queue one payload ({"action": ..., **fields}) for the next batch.
+
+        Args:
+            payload: The action and its fields
+            idempotency_key: Lets the workflow skip an item it has already sent
+
+        Returns:
+            A Future resolving to this payload's result (or raising the webhook error)
+        """
+        action = payload["action"]
+        if action not in self.batch_actions:
+            raise ValueError(f"{action} cannot be batched")
+        item = {key: value for key, value in payload.items() if key != "action"}
+        future = Future()
+        with self._lock:
+            batch = self._pending.setdefault(action, [])
+            batch.append((item, idempotency_key, future))
+            if len(batch) == 1:
+                timer = threading.Timer(self.window, self._flush, args=(action, batch))
+                timer.daemon = True
+                timer.start()
+            full = len(batch) >= self.max_items
+        if full:
+            self._flush(action, batch)
+        return future
+
+    def post(self, payload: dict, idempotency_key: str = None) -> dict:
+        """Same call as WebhookClient.post: wait for this payload's result"""
+        return self.submit(payload, idempotency_key).result()
+
+    def _flush(self, action: str, batch: list):
+        """Send one batch; called by its timer, or early when the batch is full"""
+        with self._lock:
+            # The timer and a full batch can both try to send the same batch
+            if self._pending.get(action) is not batch:
+                return
+            del self._pending[action]
+            self.stats["items"] += len(batch)
+            self.stats["batches"] += 1
+
+        try:
+            if len(batch) == 1:
+                item, key, future = batch[0]
+                future.set_result(self.client.post({"action": action, **item}, idempotency_key=key))
+                return
+            response = self.client.post({
+                "action": self.batch_actions[action],
+                "items": [item for item, _, _ in batch],
+                "idempotency_keys": [key for _, key, _ in batch]
+            })
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        results = response.get("results") if isinstance(response, dict) else None
+        if not isinstance(results, list) or len(results) != len(batch):
+            # No per-item results: every caller gets the whole response
+            results = [response] * len(batch)
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)